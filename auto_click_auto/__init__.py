@@ -1,6 +1,55 @@
-from .core import (
-    enable_click_shell_completion as enable_click_shell_completion,
-)
-from .core import (
-    enable_click_shell_completion_option as enable_click_shell_completion_option,
-)
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .core import (
+        enable_click_shell_completion as enable_click_shell_completion,
+    )
+    from .core import (
+        enable_click_shell_completion_in_background as enable_click_shell_completion_in_background,
+    )
+    from .core import (
+        enable_click_shell_completion_option as enable_click_shell_completion_option,
+    )
+    from .core import (
+        enable_click_shell_completions as enable_click_shell_completions,
+    )
+    from .instrumentation import InstrumentationEvent as InstrumentationEvent
+    from .instrumentation import (
+        add_instrumentation_hook as add_instrumentation_hook,
+    )
+    from .instrumentation import (
+        remove_instrumentation_hook as remove_instrumentation_hook,
+    )
+
+# The public API and the modules that define it. The modules are imported on
+# first use, so that importing the package at the top of a program, which runs
+# on every tab press, is nearly free.
+_LAZY_ATTRIBUTES = {
+    "enable_click_shell_completion": "core",
+    "enable_click_shell_completion_in_background": "core",
+    "enable_click_shell_completion_option": "core",
+    "enable_click_shell_completions": "core",
+    "InstrumentationEvent": "instrumentation",
+    "add_instrumentation_hook": "instrumentation",
+    "remove_instrumentation_hook": "instrumentation",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(f".{module_name}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,155 @@
+from typing import Optional, Tuple
+
+import click
+
+from .completion import load_command
+from .constants import InstallStrategy, ShellType
+from .daemon import DEFAULT_IDLE_TIMEOUT, run_daemon
+from .provision import PROVISION_STRATEGIES, provision_completions
+
+
+@click.group()
+def main() -> None:
+    """Tab autocompletion tools for Click CLI applications."""
+    pass
+
+
+@main.command()
+@click.argument("socket_path", required=False)
+@click.option(
+    "--idle-timeout",
+    type=float,
+    default=DEFAULT_IDLE_TIMEOUT,
+    show_default=True,
+    help="Seconds without completion requests after which the daemon exits.",
+)
+def daemon(socket_path: Optional[str], idle_timeout: float) -> None:
+    """Run the completion daemon of the registered programs."""
+    run_daemon(socket_path=socket_path, idle_timeout=idle_timeout)
+
+
+@main.command()
+@click.argument("program_name")
+@click.argument("command_import_path")
+def index(program_name: str, command_import_path: str) -> None:
+    """
+    Build the command tree index of a program from the import path of its
+    root command, e.g., `my_program.cli:main`.
+    """
+    from .index import write_command_index
+
+    write_command_index(load_command(command_import_path), program_name)
+
+
+@main.command()
+@click.argument("program_name")
+@click.argument("command_import_path")
+@click.argument("directory")
+def build(program_name: str, command_import_path: str, directory: str) -> None:
+    """
+    Write the completion scripts and the command tree index of a program in
+    a directory, e.g., of its package while it is built.
+    """
+    from .prebuilt import build_completion_artifacts
+
+    for file_path in build_completion_artifacts(
+        load_command(command_import_path), program_name, directory
+    ):
+        click.echo(file_path)
+
+
+@main.command()
+@click.argument("targets", nargs=-1, required=True)
+@click.option(
+    "-p",
+    "--program",
+    "program_names",
+    multiple=True,
+    required=True,
+    help="A program to provision. Can be given multiple times.",
+)
+@click.option(
+    "-s",
+    "--shell",
+    "shells",
+    type=click.Choice(ShellType.get_all_values()),
+    multiple=True,
+    help="A shell to provision. Defaults to all the supported shells.",
+)
+@click.option(
+    "--strategy",
+    type=click.Choice(
+        [strategy.value for strategy in PROVISION_STRATEGIES]
+    ),
+    default=InstallStrategy.CACHED.value,
+    show_default=True,
+    help="The way the completion is installed.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    help="The number of worker processes. Defaults to the number of CPUs.",
+)
+def provision(
+    targets: Tuple[str, ...],
+    program_names: Tuple[str, ...],
+    shells: Tuple[str, ...],
+    strategy: str,
+    jobs: Optional[int],
+) -> None:
+    """
+    Provision the tab completion of programs in many home directories, e.g.,
+    the homes of a build host or of a container image root filesystem.
+    """
+    results = provision_completions(
+        targets=targets,
+        program_names=program_names,
+        shells={ShellType(shell) for shell in shells} or None,
+        strategy=InstallStrategy(strategy),
+        processes=jobs,
+    )
+
+    for result in results:
+        if result.error is not None:
+            click.echo(f"{result.target}: {result.error}", err=True)
+            continue
+
+        added = sum(
+            shell_result.added for shell_result in result.results
+        )
+        removed = sum(
+            shell_result.removed for shell_result in result.results
+        )
+        click.echo(f"{result.target}: {added} added, {removed} removed")
+
+    if any(result.error is not None for result in results):
+        raise SystemExit(1)
+
+
+@main.command()
+@click.argument("program_name", required=False)
+def stats(program_name: Optional[str]) -> None:
+    """
+    Summarize the latency of the recorded completion requests per command
+    path, optionally of a single program.
+    """
+    from .stats import (
+        format_latency_summaries,
+        read_completion_records,
+        summarize_completion_records,
+    )
+
+    summaries = summarize_completion_records(
+        read_completion_records(), program_name=program_name
+    )
+
+    if not summaries:
+        click.echo("No completion requests were recorded.")
+        return None
+
+    click.echo(format_latency_summaries(summaries))
+
+
+if __name__ == "__main__":
+    main()
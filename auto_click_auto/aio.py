@@ -0,0 +1,236 @@
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, Set, TypeVar
+
+import click
+from click import Command, Context, Parameter
+
+from .constants import InstallStrategy, ShellType
+from .core import FC, _Decorator, _enable_shell, _plan_enabling
+from .instrumentation import phase
+from .stamps import write_stamp
+
+R = TypeVar("R")
+
+
+def _is_asyncclick_object(obj: Any) -> bool:
+    """Check whether the object is an instance of an asyncclick class, e.g.,
+    a command, parameter or context."""
+
+    return type(obj).__module__.partition(".")[0] == "asyncclick"
+
+
+def _uses_asyncclick(f: Any) -> bool:
+    """Check whether the decorated command, or the function a command is
+    created from, is an asyncclick one. Functions are detected from the
+    parameters already attached to them, or from being coroutine functions,
+    which only asyncclick runs."""
+
+    if _is_asyncclick_object(f):
+        return True
+
+    params = getattr(f, "params", None) or getattr(f, "__click_params__", [])
+    if any(_is_asyncclick_object(param) for param in params):
+        return True
+
+    return asyncio.iscoroutinefunction(f)
+
+
+async def _run_in_executor(
+    executor: Optional[Executor], function: Callable[..., R], *args: Any
+) -> R:
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(
+        executor, functools.partial(function, *args)
+    )
+
+
+async def enable_click_shell_completion_async(
+    program_name: str,
+    shells: Optional[Set[ShellType]] = None,
+    verbose: Optional[bool] = False,
+    strategy: InstallStrategy = InstallStrategy.EVAL,
+    command_import_path: Optional[str] = None,
+    command: Optional[Command] = None,
+    zcompile: bool = False,
+    executor: Optional[Executor] = None,
+    prebuilt_directory: Optional[str] = None,
+    budget: Optional[float] = None,
+) -> None:
+    """
+    Enable tab completion like :func:`enable_click_shell_completion`, without
+    blocking the event loop. The file operations run in an executor, and the
+    shells are configured concurrently, each in its own configuration file.
+
+    :param program_name: The program name for which we enable shell completion,
+    also described as the executable name.
+    :param shells: The shell types for which we want to add tab completion
+    support.
+    :param verbose: `True` to print more details regarding the enabling,
+    `False` otherwise.
+    :param strategy: How the tab completion is installed in the shell
+    configuration.
+    :param command_import_path: The import path of the program's root command
+    in the `module:attribute` format. Required by the `daemon` strategy.
+    :param command: The root command of the program. Required by the `static`
+    strategy.
+    :param zcompile: `True` to compile the zsh completion function of the
+    `native` strategy with `zcompile`, `False` otherwise.
+    :param executor: The executor the file operations run in. Defaults to the
+    default executor of the event loop.
+    :param prebuilt_directory: The directory of the completion artifacts
+    built with the program, see :func:`enable_click_shell_completion`.
+    :param budget: The number of seconds the program has to answer a tab
+    press, see :func:`enable_click_shell_completion`.
+    :raise NotImplementedError: When ``shells`` option is not supported.
+    :raise ValueError: When ``command_import_path`` or ``command`` is required
+    by the ``strategy`` but not provided.
+    """
+
+    plan = await _run_in_executor(
+        executor,
+        functools.partial(
+            _plan_enabling,
+            program_name=program_name,
+            shells=shells,
+            verbose=verbose,
+            strategy=strategy,
+            command_import_path=command_import_path,
+            command=command,
+            zcompile=zcompile,
+            prebuilt_directory=prebuilt_directory,
+            budget=budget,
+        ),
+    )
+
+    if plan is None:
+        return None
+
+    shells_added = await asyncio.gather(
+        *(
+            _run_in_executor(
+                executor, _enable_shell, program_name, shell, plan, verbose
+            )
+            for shell in plan.shells
+        )
+    )
+
+    for added in shells_added:
+        if added:
+            print(
+                "Restart or create a new shell session for the changes to "
+                "take effect."
+            )
+
+    def finish() -> None:
+        with phase("write_stamp"):
+            write_stamp(plan.stamp_key, plan.stamp_file_paths)
+
+    await _run_in_executor(executor, finish)
+
+
+def enable_click_shell_completion_option_async(
+    *param_decls: str,
+    program_name: Optional[str] = None,
+    shells: Optional[Set[ShellType]] = None,
+    strategy: InstallStrategy = InstallStrategy.EVAL,
+    command_import_path: Optional[str] = None,
+    use_asyncclick: Optional[bool] = None,
+    **kwargs: Any,
+) -> _Decorator[FC]:
+    """
+    Add a ``--autocomplete`` option like
+    :func:`enable_click_shell_completion_option`, which enables tab completion
+    with :func:`enable_click_shell_completion_async` and exits the program.
+
+    The option is created with asyncclick for asyncclick commands, which
+    await the option's callback in the running event loop. For Click
+    commands, the callback runs the enabling in a new event loop, in a
+    separate thread if the command is invoked in a running event loop.
+
+    :param param_decls: One or more option names. Defaults to the single value
+    ``"--autocomplete"``.
+    :param program_name: The program name for which we enable shell completion,
+    also described as the executable name.
+    :param shells: The shell types for which we want to add tab completion
+    support.
+    :param strategy: How the tab completion is installed in the shell
+    configuration.
+    :param command_import_path: The import path of the program's root command
+    in the `module:attribute` format. Required by the `daemon` strategy.
+    :param use_asyncclick: `True` to create the option with asyncclick,
+    `False` with Click. Defaults to detecting it from the decorated command,
+    its other parameters, or whether the decorated function is a coroutine
+    function.
+    :param kwargs: Extra arguments are passed to :func:`option`.
+    """
+
+    async def enable(ctx: Context, program_name: str) -> None:
+        await enable_click_shell_completion_async(
+            program_name=program_name,
+            shells=shells,
+            verbose=True,
+            strategy=strategy,
+            command_import_path=command_import_path,
+            command=ctx.find_root().command,
+        )
+
+    async def enable_and_exit(ctx: Context, program_name: str) -> None:
+        await enable(ctx, program_name)
+        ctx.exit()
+
+    def callback(
+        ctx: Context, param: Parameter, value: bool
+    ) -> Optional[Awaitable[None]]:
+        if not value or ctx.resilient_parsing:
+            return None
+
+        nonlocal program_name
+
+        if program_name is None:
+            program_name = ctx.find_root().info_name
+
+        assert program_name is not None
+
+        if _is_asyncclick_object(ctx):
+            # asyncclick awaits the callback.
+            return enable_and_exit(ctx, program_name)
+
+        try:
+            asyncio.get_running_loop()
+
+        except RuntimeError:
+            asyncio.run(enable(ctx, program_name))
+
+        else:
+            # Click was invoked in a running event loop, e.g., in Jupyter,
+            # which cannot run another one in the same thread.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(
+                    asyncio.run, enable(ctx, program_name)
+                ).result()
+
+        ctx.exit()
+
+    if not param_decls:
+        param_decls = ("--autocomplete",)
+
+    kwargs.setdefault("is_flag", True)
+    kwargs.setdefault("expose_value", False)
+    kwargs.setdefault("is_eager", True)
+    kwargs.setdefault("help", "Enable tab autocompletion and exit.")
+    kwargs["callback"] = callback
+
+    def decorator(f: FC) -> FC:
+        option = click.option
+
+        if use_asyncclick or (use_asyncclick is None and _uses_asyncclick(f)):
+            import asyncclick
+
+            option = asyncclick.option
+
+        return option(*param_decls, **kwargs)(f)
+
+    return decorator
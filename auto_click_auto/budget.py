@@ -0,0 +1,86 @@
+"""
+Run a completion request of a program within a time budget.
+
+The completion scripts generated with a latency budget run this file
+directly, with `python -S -E`, in place of the program. It only uses the
+standard library and does not import `auto_click_auto`, so that it starts as
+fast as the interpreter does. If the program does not answer within the
+budget, a response that makes the shell fall back to its default file
+completion is printed, and the program keeps running in the background, e.g.,
+to warm the caches of its completion, for the next tab press.
+
+Usage: python -S -E budget.py SECONDS PROGRAM [ARGUMENTS ...]
+"""
+
+import os
+import subprocess
+import sys
+from typing import List, Optional
+
+
+def get_fallback_response(program_name: str) -> str:
+    """
+    Return the response to a completion request of the program that makes
+    the shell complete file paths, in the format of the instruction Click
+    received from the shell, e.g., `bash_complete`.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    """
+
+    complete_var = f"_{program_name.upper().replace('-', '_')}_COMPLETE"
+    shell = os.environ.get(complete_var, "").partition("_")[0]
+
+    if shell == "bash":
+        return "file,\n"
+
+    if shell == "zsh":
+        return "file\n\n_\n"
+
+    if shell == "fish":
+        return f"file,{os.environ.get('COMP_CWORD', '')}\n"
+
+    return ""
+
+
+def run_within_budget(program: List[str], budget: float) -> Optional[str]:
+    """
+    Run the program and return its output, unless it takes longer than the
+    budget, in which case it keeps running in the background, detached from
+    the shell.
+
+    :param program: The program and its arguments.
+    :param budget: The number of seconds to wait for the program.
+    :return: The output of the program, or `None` if it is over the budget.
+    """
+
+    process = subprocess.Popen(
+        program,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    try:
+        output, _ = process.communicate(timeout=max(budget, 0))
+    except subprocess.TimeoutExpired:
+        return None
+
+    return output.decode()
+
+
+def main(argv: List[str]) -> None:
+    budget, program = float(argv[1]), argv[2:]
+
+    response = run_within_budget(program, budget)
+
+    if response is None:
+        response = get_fallback_response(os.path.basename(program[0]))
+
+    sys.stdout.write(response)
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,115 @@
+import hashlib
+import os
+from typing import List, Optional
+
+from .constants import FINGERPRINT_PREFIX, ShellType
+from .exceptions import CompletionScriptGenerationError
+from .registry import load_registry, register_program
+from .scripts import read_script_fingerprint, write_cached_completion_script
+from .utils import file_lock, get_cache_directory, write_file_atomically
+
+
+def get_bundle_path(shell: ShellType) -> str:
+    """
+    Return the path of the bundle of the completion scripts of the given
+    shell, `~/.cache/auto-click-auto/bundle.{shell}` by default.
+
+    :param shell: The shell type of the bundle, bash or zsh.
+    """
+
+    return os.path.join(get_cache_directory(), f"bundle.{shell.value}")
+
+
+def _get_registry_key(shell: ShellType) -> str:
+    return f"bundle_{shell.value}"
+
+
+def get_bundled_programs(shell: ShellType) -> List[str]:
+    """
+    Return the programs in the bundle of the given shell, from the registry.
+
+    :param shell: The shell type of the bundle.
+    """
+
+    key = _get_registry_key(shell)
+
+    return sorted(
+        program_name
+        for program_name, details in load_registry().items()
+        if details.get(key) is True
+    )
+
+
+def update_bundle(
+    shell: ShellType,
+    add: Optional[str] = None,
+    remove: Optional[str] = None,
+    verbose: Optional[bool] = False,
+) -> None:
+    """
+    Update the registry of the bundled programs and regenerate the bundle of
+    the given shell, if a program was added or removed or the fingerprint of
+    a program changed.
+
+    The bundle concatenates the cached completion scripts of the programs,
+    see :func:`auto_click_auto.scripts.write_cached_completion_script`, which
+    are only regenerated for the programs that changed. Its first line
+    carries a fingerprint of the fingerprints of the programs, so an
+    unchanged bundle is not rewritten.
+
+    :param shell: The shell type of the bundle, bash or zsh.
+    :param add: A program to add to the bundle.
+    :param remove: A program to remove from the bundle.
+    :param verbose: `True` to print whether the scripts are up to date,
+    `False` otherwise.
+    """
+
+    bundle_path = get_bundle_path(shell)
+
+    # Concurrent updates must not lose each other's programs.
+    with file_lock(f"{bundle_path}.lock"):
+        if add is not None:
+            register_program(add, **{_get_registry_key(shell): True})
+
+        if remove is not None:
+            register_program(remove, **{_get_registry_key(shell): False})
+
+        scripts = []
+        for program_name in get_bundled_programs(shell):
+            try:
+                script_path = write_cached_completion_script(
+                    program_name=program_name, shell=shell, verbose=verbose
+                )
+            except CompletionScriptGenerationError as err:
+                if verbose is True:
+                    print(err)
+
+                continue
+
+            scripts.append(
+                (
+                    program_name,
+                    read_script_fingerprint(script_path),
+                    script_path,
+                )
+            )
+
+        fingerprint = hashlib.sha256(
+            "\0".join(
+                f"{program_name}\0{script_fingerprint}"
+                for program_name, script_fingerprint, _ in scripts
+            ).encode()
+        ).hexdigest()[:16]
+
+        if read_script_fingerprint(bundle_path) == fingerprint:
+            return None
+
+        parts = [f"{FINGERPRINT_PREFIX}{fingerprint}\n"]
+        for program_name, _, script_path in scripts:
+            with open(script_path) as file:
+                parts.append(f"# {program_name}\n{file.read()}\n")
+
+        if verbose is True:
+            print(f"Generating completion bundle in {bundle_path} ...")
+
+        write_file_atomically(bundle_path, "".join(parts))
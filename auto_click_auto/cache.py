@@ -0,0 +1,127 @@
+import hashlib
+import os
+import time
+from typing import NamedTuple, Optional
+
+from .utils import write_file_atomically
+
+
+class CacheEntry(NamedTuple):
+    """A value read from the cache, along with its age in seconds."""
+
+    value: str
+    age: float
+
+
+class DiskCache:
+    """
+    A size-bounded, least recently used cache of strings stored on disk.
+
+    Every entry is a separate file in the cache directory, named after the
+    hash of its key. Entries are written to a temporary file which then
+    replaces the entry, so that several processes can safely read and write
+    the cache at the same time. The first line of an entry is its creation
+    time, which is used to expire it, while the modification time of the file
+    is updated on every read and is used to evict the least recently used
+    entries.
+    """
+
+    def __init__(
+        self, directory: str, ttl: float, max_entries: int = 256
+    ) -> None:
+        """
+        :param directory: The directory where the entries are stored.
+        :param ttl: The number of seconds an entry is considered fresh.
+        :param max_entries: The maximum number of entries kept in the cache.
+        """
+
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def get_path(self, key: str) -> str:
+        """Return the path of the file of the entry with the given key."""
+
+        return os.path.join(
+            self.directory, hashlib.sha256(key.encode()).hexdigest()[:32]
+        )
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """
+        Read the entry with the given key, whether it is fresh or not.
+
+        :param key: The key of the entry.
+        :return: The entry, or `None` if there is no readable entry.
+        """
+
+        path = self.get_path(key)
+
+        try:
+            with open(path) as file:
+                created = float(file.readline())
+                value = file.read()
+
+            # Mark the entry as recently used.
+            os.utime(path)
+
+        # The entry may be missing, removed by another process in the meantime
+        # or, in case of an unexpected crash, corrupted.
+        except (OSError, ValueError):
+            return None
+
+        return CacheEntry(value=value, age=time.time() - created)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the value of the entry with the given key, if it is fresh.
+
+        :param key: The key of the entry.
+        :return: The value, or `None` if there is no fresh entry.
+        """
+
+        entry = self.get_entry(key)
+
+        if entry is None or entry.age > self.ttl:
+            return None
+
+        return entry.value
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store the value under the given key and evict the least recently used
+        entries if the cache holds too many entries.
+
+        :param key: The key of the entry.
+        :param value: The value of the entry.
+        """
+
+        write_file_atomically(self.get_path(key), f"{time.time()}\n{value}")
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries over ``max_entries``."""
+
+        entries = []
+
+        with os.scandir(self.directory) as directory_entries:
+            for directory_entry in directory_entries:
+                # Skip temporary files of writes in progress.
+                if directory_entry.name.startswith("."):
+                    continue
+
+                try:
+                    entries.append(
+                        (directory_entry.stat().st_mtime, directory_entry.path)
+                    )
+                except FileNotFoundError:
+                    pass
+
+        if len(entries) <= self.max_entries:
+            return None
+
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
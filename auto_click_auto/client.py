@@ -0,0 +1,153 @@
+"""
+Minimal client of the `auto-click-auto` completion daemon.
+
+The completion scripts generated for the `daemon` install strategy run this
+file directly, with `python -S -E`, in place of the program. It only uses the
+standard library and does not import `auto_click_auto`, so that it starts as
+fast as the interpreter does. If the daemon does not answer the completion
+request, the daemon is started in the background and the program is run
+instead, as the normal completion script would do.
+
+With a budget, the daemon and then the program have to answer within the
+given number of seconds, see the `budget` module next to this file.
+
+Usage: python -S -E client.py [--budget SECONDS] SOCKET_PATH PROGRAM
+[ARGUMENTS ...]
+"""
+
+import importlib
+import json
+import os
+import socket
+import sys
+import time
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+# The seconds to wait for the daemon to answer, before running the program.
+TIMEOUT = 10
+
+
+def request_completion(
+    socket_path: str, request: Dict[str, Any], timeout: float = TIMEOUT
+) -> Optional[str]:
+    """
+    Send the completion request to the daemon.
+
+    :param socket_path: The path of the Unix socket the daemon listens to.
+    :param request: The completion request.
+    :param timeout: The seconds to wait for the daemon to answer.
+    :return: The completion response, or `None` if the daemon could not
+    answer the request.
+    :raise OSError: When the daemon is not running.
+    """
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode())
+        client.shutdown(socket.SHUT_WR)
+
+        chunks = []
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    status, _, response = b"".join(chunks).decode().partition("\n")
+
+    return response if status == "ok" else None
+
+
+def start_daemon(socket_path: str) -> None:
+    """Start the daemon in the background, detached from the shell."""
+
+    import subprocess
+
+    subprocess.Popen(
+        [sys.executable, "-m", "auto_click_auto", "daemon", socket_path],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=os.path.expanduser("~"),
+        start_new_session=True,
+    )
+
+
+def _load_budget_module() -> ModuleType:
+    if __package__:
+        return importlib.import_module(".budget", __package__)
+
+    # Run as a script, next to the module.
+    return importlib.import_module("budget")
+
+
+def main(argv: List[str]) -> None:
+    budget = None
+    if argv[1] == "--budget":
+        budget = float(argv[2])
+        argv = argv[:1] + argv[3:]
+
+    deadline = time.monotonic() + (TIMEOUT if budget is None else budget)
+    socket_path, program = argv[1], argv[2:]
+    program_name = os.path.basename(program[0])
+    complete_var = f"_{program_name.upper().replace('-', '_')}_COMPLETE"
+
+    request = {
+        "program": program_name,
+        "instruction": os.environ.get(complete_var, ""),
+        "words": os.environ.get("COMP_WORDS", ""),
+        "cword": os.environ.get("COMP_CWORD", ""),
+        # The custom completion functions of the program may depend on the
+        # working directory and the environment of the shell.
+        "cwd": os.getcwd(),
+        "env": dict(os.environ),
+    }
+
+    # Whether the daemon is still working on the request, which then does not
+    # have to run the program.
+    timed_out = False
+
+    try:
+        response = request_completion(
+            socket_path, request, timeout=deadline - time.monotonic()
+        )
+
+    except socket.timeout:
+        response = None
+        timed_out = True
+
+    except (FileNotFoundError, ConnectionRefusedError):
+        response = None
+
+        if os.environ.get("AUTO_CLICK_AUTO_DAEMON_AUTOSTART") != "0":
+            start_daemon(socket_path)
+
+    except OSError:
+        response = None
+
+    if response is not None:
+        sys.stdout.write(response)
+        sys.stdout.flush()
+        return None
+
+    if budget is None:
+        # Fall back to the normal completion of the program.
+        os.execvp(program[0], program)
+
+    budget_module = _load_budget_module()
+    if not timed_out:
+        response = budget_module.run_within_budget(
+            program, deadline - time.monotonic()
+        )
+
+    if response is None:
+        response = budget_module.get_fallback_response(program_name)
+
+    sys.stdout.write(response)
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,382 @@
+import importlib
+import os
+import re
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Optional, Union
+
+from .cache import DiskCache
+from .constants import ShellType
+from .fingerprint import get_program_fingerprint
+from .utils import get_cache_directory, get_click_env_var
+
+if TYPE_CHECKING:
+    from click import Command
+
+CommandLoader = Union[str, Callable[[], "Command"]]
+
+
+class ImportSavings(NamedTuple):
+    """The import times of the completion path and of the full program."""
+
+    completion_seconds: float
+    full_seconds: float
+
+    @property
+    def saved_seconds(self) -> float:
+        """The import time a completion request saves."""
+
+        return self.full_seconds - self.completion_seconds
+
+
+def load_command(loader: CommandLoader) -> "Command":
+    """
+    Load the root command of the program.
+
+    :param loader: Either a function that builds and returns the root command,
+    or the import path of the root command in the `module:attribute` format,
+    e.g., `my_program.cli:main`. If the attribute is not a command, it is
+    called to build the command.
+    :return: The root command.
+    """
+
+    if not isinstance(loader, str):
+        return loader()
+
+    from click import Command
+
+    module_name, _, attribute_path = loader.partition(":")
+    command: Any = importlib.import_module(module_name)
+    for attribute in attribute_path.split("."):
+        command = getattr(command, attribute)
+
+    if not isinstance(command, Command):
+        command = command()
+
+    return command
+
+
+def _get_import_seconds(python: str, module: str) -> float:
+    """
+    Return the cumulative import time of the given module, including the
+    modules it imports, that Python reports with `-X importtime` when
+    importing it in a new interpreter. Modules the interpreter already
+    imported at startup take no time.
+    """
+
+    import subprocess
+
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    # e.g. "import time:       120 |        450 | json"
+    match = re.search(
+        rf"^import time:\s*\d+ \|\s*(\d+) \| *{re.escape(module)}$",
+        result.stderr,
+        re.MULTILINE,
+    )
+
+    return int(match.group(1)) / 1e6 if match is not None else 0.0
+
+
+def measure_import_savings(
+    completion_loader: str,
+    program_module: str,
+    python: Optional[str] = None,
+) -> ImportSavings:
+    """
+    Measure how much import time the completion path saves, compared to the
+    full program. Each module is imported in a new interpreter, and only the
+    cumulative import time of the module itself is counted.
+
+    :param completion_loader: The import path of the command used for tab
+    completion, in the `module:attribute` format, as passed to
+    :func:`handle_completion_request`.
+    :param program_module: The module the program's entry point imports on a
+    normal run, e.g., `my_program.cli`.
+    :param python: The Python interpreter to use. Defaults to the current one.
+    """
+
+    python = python or sys.executable
+
+    return ImportSavings(
+        completion_seconds=_get_import_seconds(
+            python, completion_loader.partition(":")[0]
+        ),
+        full_seconds=_get_import_seconds(python, program_module),
+    )
+
+
+def get_completion_instruction(program_name: str) -> Optional[str]:
+    """
+    Return the shell completion instruction Click received from the shell,
+    e.g., `bash_complete`, if the program is run for tab completion.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :return: The instruction, or `None` if the program is not run for tab
+    completion.
+    """
+
+    return os.environ.get(get_click_env_var(program_name)) or None
+
+
+def get_completion_response(
+    command: "Command", program_name: str, shell: str
+) -> str:
+    """
+    Return the completions of the current completion request, formatted for
+    the given shell, as Click's `{shell}_complete` instruction would output
+    them.
+
+    :param command: The root command of the program.
+    :param program_name: The program name, also described as the executable
+    name.
+    :param shell: The shell name of the completion request.
+    """
+
+    from click.shell_completion import get_completion_class
+
+    completion_class = get_completion_class(shell)
+    assert completion_class is not None
+
+    return completion_class(
+        command, {}, program_name, get_click_env_var(program_name)
+    ).complete()
+
+
+class CompletionResult(NamedTuple):
+    """The response of a completion request, with what was completed."""
+
+    response: str
+    # The path of the command whose parameters were completed.
+    command_path: str
+    # The number of completion candidates of the response.
+    candidates: int
+
+
+def get_completion_result(
+    command: "Command", program_name: str, shell: str
+) -> CompletionResult:
+    """
+    Return the completions of the current completion request like
+    :func:`get_completion_response`, along with the completed command path and
+    the number of candidates, resolved as Click's completion does.
+
+    :param command: The root command of the program.
+    :param program_name: The program name, also described as the executable
+    name.
+    :param shell: The shell name of the completion request.
+    """
+
+    from click.shell_completion import (
+        _resolve_context,
+        _resolve_incomplete,
+        get_completion_class,
+    )
+
+    completion_class = get_completion_class(shell)
+    assert completion_class is not None
+
+    completion = completion_class(
+        command, {}, program_name, get_click_env_var(program_name)
+    )
+    args, incomplete = completion.get_completion_args()
+    ctx = _resolve_context(command, {}, program_name, args)
+    obj, incomplete = _resolve_incomplete(ctx, args, incomplete)
+    items = obj.shell_complete(ctx, incomplete)
+
+    return CompletionResult(
+        response="\n".join(
+            completion.format_completion(item) for item in items
+        ),
+        command_path=ctx.command_path,
+        candidates=len(items),
+    )
+
+
+def get_response_cache(
+    program_name: str, ttl: float, max_entries: int = 256
+) -> DiskCache:
+    """
+    Return the cache of the completion responses of the given program, stored
+    in `~/.cache/auto-click-auto/responses/{program_name}` by default.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param ttl: The number of seconds a response is considered fresh.
+    :param max_entries: The maximum number of responses kept in the cache.
+    """
+
+    return DiskCache(
+        directory=os.path.join(
+            get_cache_directory(), "responses", program_name
+        ),
+        ttl=ttl,
+        max_entries=max_entries,
+    )
+
+
+def get_response_cache_key(program_name: str, instruction: str) -> str:
+    """
+    Return the key of the current completion request in the response cache.
+    Click passes the words of the command line and the index of the word that
+    is completed in the `COMP_WORDS` and `COMP_CWORD` environment variables
+    for every supported shell.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param instruction: The shell completion instruction, e.g.,
+    `bash_complete`.
+    """
+
+    return "\0".join(
+        (
+            program_name,
+            get_program_fingerprint(program_name, include_metadata=False),
+            instruction,
+            os.environ.get("COMP_WORDS", ""),
+            os.environ.get("COMP_CWORD", ""),
+        )
+    )
+
+
+def handle_completion_request(
+    program_name: str,
+    get_command: CommandLoader,
+    cache_ttl: Optional[float] = None,
+    cache_max_entries: int = 256,
+    use_index: bool = False,
+    record_stats: bool = False,
+) -> None:
+    """
+    Answer the tab completion request of the shell, if the program is run for
+    one, and exit. Otherwise, return without doing anything, so that the
+    program continues with its normal run.
+
+    This function is meant to be called at the very top of the program's entry
+    point, before the Click command tree is built and before any heavy
+    imports. The command used for tab completion can be a lightweight or
+    lazily built version of the program's command tree, which is only imported
+    for completion requests. If the response cache is enabled, repeated
+    completion requests are answered from the cache without building the
+    command tree at all. Use :func:`measure_import_savings` to see how much
+    import time the completion path saves.
+
+    With the command tree index, completion requests are resolved against a
+    serialized description of the command tree, stored in the cache and
+    rebuilt when the program changes. Only the command whose custom completion
+    function has to run is imported, so the subcommands of lazily loaded
+    groups are not imported at all.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param get_command: A function that builds and returns the root command of
+    the program, or its import path in the `module:attribute` format. It is
+    only loaded if the response is not cached.
+    :param cache_ttl: The number of seconds a cached completion response is
+    considered fresh. `None` disables the response cache.
+    :param cache_max_entries: The maximum number of responses kept in the
+    cache of the program.
+    :param use_index: `True` to answer completion requests from the command
+    tree index of the program.
+    :param record_stats: `True` to record the latency, the command path, the
+    number of candidates and the cache outcome of every completion request in
+    `~/.cache/auto-click-auto/stats.log`, which `auto-click-auto stats`
+    summarizes.
+    """
+
+    instruction = get_completion_instruction(program_name)
+
+    if instruction is None:
+        return None
+
+    shell, _, action = instruction.partition("_")
+
+    # Other instructions, e.g., `bash_source`, and shells are left to Click.
+    if action != "complete" or shell not in ShellType.get_all_values():
+        return None
+
+    start = time.perf_counter()
+
+    cache = None
+    cache_key = ""
+    if cache_ttl is not None:
+        cache = get_response_cache(program_name, cache_ttl, cache_max_entries)
+        cache_key = get_response_cache_key(program_name, instruction)
+
+        # The cached responses carry the command path and the number of
+        # candidates of the request for its record.
+        if record_stats:
+            cache_key = f"{cache_key}\0stats"
+
+        response = cache.get(cache_key)
+
+        if response is not None:
+            if record_stats:
+                command_path, candidates, response = response.split("\0", 2)
+                _record_completion(
+                    program_name,
+                    shell,
+                    CompletionResult(response, command_path, int(candidates)),
+                    "hit",
+                    start,
+                )
+
+            print(response)
+            sys.exit(0)
+
+    if use_index:
+        from .index import load_indexed_command
+
+        command = load_indexed_command(program_name, get_command)
+    else:
+        command = load_command(get_command)
+
+    if not record_stats:
+        response = get_completion_response(command, program_name, shell)
+
+        if cache is not None:
+            cache.set(cache_key, response)
+
+        print(response)
+        sys.exit(0)
+
+    result = get_completion_result(command, program_name, shell)
+
+    if cache is not None:
+        cache.set(
+            cache_key,
+            f"{result.command_path}\0{result.candidates}\0{result.response}",
+        )
+
+    _record_completion(
+        program_name, shell, result, "-" if cache is None else "miss", start
+    )
+
+    print(result.response)
+    sys.exit(0)
+
+
+def _record_completion(
+    program_name: str,
+    shell: str,
+    result: CompletionResult,
+    cache: str,
+    start: float,
+) -> None:
+    from .stats import record_completion
+
+    record_completion(
+        program_name=program_name,
+        shell=shell,
+        command_path=result.command_path,
+        candidates=result.candidates,
+        cache=cache,
+        seconds=time.perf_counter() - start,
+    )
@@ -20,3 +20,49 @@ class ShellType(str, Enum):
         """Return a list with all the enum members' values, the shell names."""
 
         return [e.value for e in cls]
+
+
+class InstallStrategy(str, Enum):
+    """
+    An enum with the supported ways of installing tab autocompletion in the
+    shell configuration.
+    """
+
+    # `eval` the output of the program's `*_source` instruction on every new
+    # shell session.
+    EVAL = "eval"
+    # Generate the completion script once, store it in the cache directory
+    # and `source` it on every new shell session.
+    CACHED = "cached"
+    # Only define a small shell function that loads the cached completion
+    # script on the first tab press of the program.
+    LAZY = "lazy"
+    # `source` a cached completion script that asks a per-user completion
+    # daemon, which keeps the program loaded, for the completions.
+    DAEMON = "daemon"
+    # `source` a completion script compiled from the command tree, which only
+    # runs the program for parameters with custom completion functions.
+    STATIC = "static"
+    # Write the completion script where the shell loads it on demand, in
+    # bash-completion's user directory and in a directory of the zsh `fpath`,
+    # instead of editing the shell configuration files.
+    NATIVE = "native"
+    # `source` a single bundle of the completion scripts of all the programs
+    # enabled with this strategy, shared by all of them.
+    BUNDLE = "bundle"
+
+    @classmethod
+    def get_all_values(cls) -> List[str]:
+        """Return a list with all the enum members' values."""
+
+        return [e.value for e in cls]
+
+
+# The comment line `auto-click-auto` writes above every configuration block.
+SHELL_CONFIGURATION_COMMENT = (
+    "# Shell completion configuration for the Click Python package"
+)
+
+# The prefix of the line that carries the fingerprint of the program in the
+# completion scripts generated by `auto-click-auto`.
+FINGERPRINT_PREFIX = "# auto-click-auto fingerprint: "
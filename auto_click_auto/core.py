@@ -1,16 +1,60 @@
+import contextlib
+import hashlib
+import io
 import os
-import platform
-from typing import TYPE_CHECKING, Any, Callable, Optional, Set, TypeVar, Union
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from click import Command, Context, Parameter, option
 
-from .constants import ShellType
-from .exceptions import ShellEnvVarNotFoundError, ShellTypeNotSupportedError
+from .bundle import get_bundle_path, get_bundled_programs, update_bundle
+from .constants import SHELL_CONFIGURATION_COMMENT, InstallStrategy, ShellType
+from .daemon import get_daemon_client_command
+from .exceptions import (
+    CompletionScriptGenerationError,
+    ShellEnvVarNotFoundError,
+    ShellTypeNotSupportedError,
+)
+from .fingerprint import get_program_path
+from .instrumentation import phase
+from .native import compile_zsh_function, get_native_script_path
+from .prebuilt import (
+    get_prebuilt_index_path,
+    get_prebuilt_script_path,
+    install_prebuilt_index,
+)
+from .registry import register_program
+from .scripts import (
+    get_budget_command,
+    get_cached_script_path,
+    read_script_fingerprint,
+    render_lazy_completion_stub,
+    write_cached_completion_script,
+    write_rendered_script,
+)
+from .stamps import check_stamp, write_stamp
 from .utils import (
-    add_shell_configuration,
+    ConfigurationEdit,
     create_file,
     detect_shell,
-    remove_shell_configuration,
+    edit_shell_configuration,
+    get_cache_directory,
+    get_click_env_var,
+    get_shell_path,
+    run_detached,
 )
 
 if TYPE_CHECKING:
@@ -23,10 +67,52 @@ _Decorator: "te.TypeAlias" = Callable[[T], T]
 FC = TypeVar("FC", bound=Union[_AnyCallable, Command])
 
 
+class ShellConfigurationResult(NamedTuple):
+    """What changed in a shell configuration file for a program."""
+
+    program_name: str
+    shell: ShellType
+    shell_config_file: str
+    # The number of old configuration strings removed from the file.
+    removed: int
+    # Whether the configuration string was added in the file, `False` if it
+    # was already present or the file does not exist.
+    added: bool
+
+
+def _check_supported_os(verbose: Optional[bool] = False) -> bool:
+    """Check that the program is run on one of the supported Operating
+    Systems."""
+
+    import platform
+
+    supported_os = ("Linux", "MacOS", "Darwin")
+    with phase("check_os") as os_phase:
+        os_name = platform.system()
+        os_phase.record(outcome=os_name)
+
+    if os_name not in supported_os:
+        if verbose is True:
+            print(
+                f"{os_name} is not one of the supported Operating Systems "
+                f"({supported_os}) of `auto-click-auto`."
+            )
+
+        return False
+
+    return True
+
+
 def enable_click_shell_completion(
     program_name: str,
     shells: Optional[Set[ShellType]] = None,
     verbose: Optional[bool] = False,
+    strategy: InstallStrategy = InstallStrategy.EVAL,
+    command_import_path: Optional[str] = None,
+    command: Optional[Command] = None,
+    zcompile: bool = False,
+    prebuilt_directory: Optional[str] = None,
+    budget: Optional[float] = None,
 ) -> None:
     """
     Enable tab completion for Click's supported shell types.
@@ -35,8 +121,51 @@ def enable_click_shell_completion(
     shell type the user is currently running the program on.
 
     See https://click.palletsprojects.com/en/latest/shell-completion.
-    `auto-click-auto` is using the `eval` command implementation suggested from
-    Click.
+    By default, `auto-click-auto` is using the `eval` command implementation
+    suggested from Click. With the `cached` strategy, the completion script is
+    generated once in `~/.cache/auto-click-auto` and the bash and zsh
+    configuration files only `source` it, so that new shell sessions do not
+    start the program. With the `lazy` strategy, the configuration files only
+    define a small function that sources the cached script on the first tab
+    press.
+
+    fish loads the completion file of the program only when it is first
+    needed, so it gets the whole completion script in it with every strategy.
+    The script checks the path and modification time of the program with fish
+    builtins, and falls back to the script the program generates if the
+    program has changed, until the completion file is written again. A
+    completion file with completions that were not written by
+    `auto-click-auto` is left unchanged.
+
+    With the `daemon` strategy, the cached completion scripts, and the fish
+    completion file, run a minimal client of a per-user completion daemon
+    instead of the program. The daemon keeps the command trees of the
+    registered programs loaded and exits when it is idle. If the daemon is not
+    running, the client starts it in the background and runs the program
+    instead.
+
+    With the `static` strategy, the completion scripts, and the fish completion
+    file, are compiled from the command tree of the program. They complete
+    subcommands, options, choices and paths without running the program, which
+    only runs for parameters with custom completion functions. With a
+    ``prebuilt_directory``, the scripts compiled when the program was built
+    are copied instead, without the command.
+
+    With the `native` strategy, the completion script is written where the
+    shell loads it on demand: bash-completion's user directory,
+    `~/.local/share/bash-completion/completions`, for bash, and a directory of
+    the user in the `fpath` for zsh, where compinit autoloads it. The shell
+    configuration files are not edited, so new shell sessions do not load
+    anything. When bash-completion 2.x is not installed, or zsh has no
+    directory of the user in its `fpath` or does not use compinit, the
+    `cached` strategy is used instead.
+
+    With a ``budget``, the completion scripts, and the fish completion file,
+    give the program, or the daemon, that many seconds to answer a tab press.
+    Past the budget, the shell falls back to completing file paths, while the
+    program finishes in the background, e.g., warming the caches of its
+    completion for the next tab press. The `eval` and `bundle` strategies do
+    not support a budget.
 
     :param program_name: The program name for which we enable shell completion,
     also described as the executable name.
@@ -45,26 +174,188 @@ def enable_click_shell_completion(
     :param verbose: `True` to print more details regarding the enabling,
     `False` otherwise. If this function is called on every run of the CLI
     program it might be better to set to `False`.
+    :param strategy: How the tab completion is installed in the shell
+    configuration.
+    :param command_import_path: The import path of the program's root command
+    in the `module:attribute` format, e.g., `my_program.cli:main`. Required
+    by the `daemon` strategy, which imports the command in the daemon.
+    :param command: The root command of the program. Required by the `static`
+    strategy, which compiles the completion scripts from the command tree.
+    :param zcompile: `True` to compile the zsh completion function of the
+    `native` strategy with `zcompile`, `False` otherwise.
+    :param prebuilt_directory: The directory of the completion artifacts
+    built with the program, see
+    :func:`auto_click_auto.prebuilt.build_completion_artifacts`, e.g., a
+    directory of the program's package. Its command tree index is installed
+    for :func:`auto_click_auto.completion.handle_completion_request`, and its
+    completion scripts are used by the `static` strategy.
+    :param budget: The number of seconds the program has to answer a tab
+    press, after which the shell falls back to file completion. `None` for no
+    budget.
     :raise NotImplementedError: When ``shells`` option is not supported.
+    :raise ValueError: When ``command_import_path`` or ``command`` is required
+    by the ``strategy`` but not provided, or the ``strategy`` does not support
+    a ``budget``.
     """
 
-    # Check that the program is run on one of the supported Operating Systems
-    supported_os = ("Linux", "MacOS", "Darwin")
-    os_name = platform.system()
-    if os_name not in supported_os:
-        if verbose is True:
+    plan = _plan_enabling(
+        program_name=program_name,
+        shells=shells,
+        verbose=verbose,
+        strategy=strategy,
+        command_import_path=command_import_path,
+        command=command,
+        zcompile=zcompile,
+        prebuilt_directory=prebuilt_directory,
+        budget=budget,
+    )
+
+    if plan is None:
+        return None
+
+    for shell in plan.shells:
+        if _enable_shell(program_name, shell, plan, verbose=verbose):
             print(
-                f"{os_name} is not one of the supported Operating Systems "
-                f"({supported_os}) of `auto-click-auto`."
+                "Restart or create a new shell session for the changes to "
+                "take effect."
             )
 
-        return None
+    with phase("write_stamp"):
+        write_stamp(plan.stamp_key, plan.stamp_file_paths)
+
+
+def enable_click_shell_completion_in_background(
+    program_name: str,
+    shells: Optional[Set[ShellType]] = None,
+    strategy: InstallStrategy = InstallStrategy.EVAL,
+    command_import_path: Optional[str] = None,
+    command: Optional[Command] = None,
+    zcompile: bool = False,
+    interval: float = 24 * 60 * 60,
+    prebuilt_directory: Optional[str] = None,
+    budget: Optional[float] = None,
+) -> bool:
+    """
+    Enable tab completion like :func:`enable_click_shell_completion`, in a
+    detached background process, at most once per ``interval``. This function
+    is meant to be called on every run of the program: it returns right away,
+    after checking the modification time of a stamp file in
+    `~/.cache/auto-click-auto/throttle`, so the program is not slowed down by
+    the check and the fix of the shell configuration.
+
+    On Operating Systems without `os.fork`, the completion is enabled in the
+    current process.
+
+    :param program_name: The program name for which we enable shell completion,
+    also described as the executable name.
+    :param shells: The shell types for which we want to add tab completion
+    support.
+    :param strategy: How the tab completion is installed in the shell
+    configuration.
+    :param command_import_path: The import path of the program's root command
+    in the `module:attribute` format. Required by the `daemon` strategy.
+    :param command: The root command of the program. Required by the `static`
+    strategy.
+    :param zcompile: `True` to compile the zsh completion function of the
+    `native` strategy with `zcompile`, `False` otherwise.
+    :param interval: The minimum number of seconds between two checks of the
+    program's configuration with the same arguments.
+    :param prebuilt_directory: The directory of the completion artifacts
+    built with the program, see :func:`enable_click_shell_completion`.
+    :param budget: The number of seconds the program has to answer a tab
+    press, see :func:`enable_click_shell_completion`.
+    :return: `True` if the check was started, `False` if it was throttled.
+    """
+
+    throttle_key = "\0".join(
+        [program_name, strategy.value, command_import_path or ""]
+        + sorted(shell.value for shell in shells or ())
+        + ([f"budget={budget}"] if budget is not None else [])
+    )
+    throttle_path = os.path.join(
+        get_cache_directory(),
+        "throttle",
+        hashlib.sha256(throttle_key.encode()).hexdigest()[:16],
+    )
+
+    try:
+        if time.time() - os.stat(throttle_path).st_mtime < interval:
+            return False
+    except FileNotFoundError:
+        pass
+
+    # Record the check before it starts, so that concurrent runs do not start
+    # it as well.
+    create_file(throttle_path)
+    os.utime(throttle_path)
+
+    def enable() -> None:
+        enable_click_shell_completion(
+            program_name=program_name,
+            shells=shells,
+            strategy=strategy,
+            command_import_path=command_import_path,
+            command=command,
+            zcompile=zcompile,
+            prebuilt_directory=prebuilt_directory,
+            budget=budget,
+        )
 
-    click_env_var = f"_{program_name.upper().replace('-', '_')}_COMPLETE"
+    if hasattr(os, "fork"):
+        run_detached(enable)
+    else:
+        with contextlib.redirect_stdout(io.StringIO()):
+            enable()
+
+    return True
+
+
+class _EnablingPlan(NamedTuple):
+    """What :func:`enable_click_shell_completion` configures for a program."""
+
+    shells: Set[ShellType]
+    strategy: InstallStrategy
+    # The stamp written once every shell is configured.
+    stamp_key: str
+    stamp_file_paths: List[str]
+    # The shell command the completion requests run through, for the `daemon`
+    # strategy and the budget.
+    wrapper: Optional[str]
+    # The root command, for the `static` strategy.
+    command: Optional[Command]
+    zcompile: bool
+    # The directory of the prebuilt completion scripts, for the `static`
+    # strategy.
+    prebuilt_directory: Optional[str]
+
+
+def _plan_enabling(
+    program_name: str,
+    shells: Optional[Set[ShellType]],
+    verbose: Optional[bool],
+    strategy: InstallStrategy,
+    command_import_path: Optional[str],
+    command: Optional[Command],
+    zcompile: bool,
+    prebuilt_directory: Optional[str] = None,
+    budget: Optional[float] = None,
+) -> Optional[_EnablingPlan]:
+    """
+    Check what :func:`enable_click_shell_completion` has to configure, see its
+    parameters.
+
+    :return: The plan, or `None` if there is nothing to configure.
+    :raise ValueError: When ``command_import_path`` or ``command`` is required
+    by the ``strategy`` but not provided, or the ``strategy`` does not support
+    a ``budget``.
+    """
+
+    if not _check_supported_os(verbose=verbose):
+        return None
 
     if shells is None:
         try:
-            shells = {detect_shell()}
+            shells = {_detect_shell()}
 
         except (ShellTypeNotSupportedError, ShellEnvVarNotFoundError) as err:
             if verbose is True:
@@ -72,80 +363,605 @@ def enable_click_shell_completion(
 
             return None
 
-    for shell in shells:
+    if strategy == InstallStrategy.DAEMON and command_import_path is None:
+        raise ValueError(
+            "The daemon strategy requires the import path of the command."
+        )
+
+    if (
+        strategy == InstallStrategy.STATIC
+        and command is None
+        and prebuilt_directory is None
+    ):
+        raise ValueError(
+            "The static strategy requires the command or a prebuilt "
+            "directory."
+        )
+
+    if budget is not None and strategy in (
+        InstallStrategy.EVAL,
+        InstallStrategy.BUNDLE,
+    ):
+        raise ValueError(
+            f"The {strategy.value} strategy does not support a budget."
+        )
+
+    # Return early if nothing changed since the last time the completion was
+    # enabled, checking only the state of the files involved.
+    stamp_key = "\0".join(
+        [program_name, strategy.value, command_import_path or ""]
+        + sorted(shell.value for shell in shells)
+        + (["zcompile"] if zcompile else [])
+        + ([prebuilt_directory] if prebuilt_directory else [])
+        + ([f"budget={budget}"] if budget is not None else [])
+    )
+    stamp_file_paths = _get_configuration_file_paths(
+        program_name, shells, strategy, prebuilt_directory
+    )
+    with phase("check_stamp") as stamp_phase:
+        verified = check_stamp(stamp_key, stamp_file_paths)
+        stamp_phase.record(outcome="hit" if verified else "miss")
+
+    if verified:
+        if verbose is True:
+            print("Tab autocomplete configuration already setup.")
+
+        return None
+
+    wrapper = None
+    if strategy == InstallStrategy.DAEMON:
+        # Completion implementation: the completion script runs the daemon
+        # client, which falls back to running the program.
+        register_program(program_name, command=command_import_path)
+        wrapper = get_daemon_client_command(budget=budget)
+
+    elif budget is not None:
+        # Completion implementation: the completion script runs the program
+        # within the budget.
+        wrapper = get_budget_command(budget)
+
+    if prebuilt_directory is not None:
+        install_prebuilt_index(prebuilt_directory, program_name)
+
+    return _EnablingPlan(
+        shells=shells,
+        strategy=strategy,
+        stamp_key=stamp_key,
+        stamp_file_paths=stamp_file_paths,
+        wrapper=wrapper,
+        # Completion implementation: script compiled from the command tree
+        command=command if strategy == InstallStrategy.STATIC else None,
+        zcompile=zcompile,
+        prebuilt_directory=(
+            prebuilt_directory if strategy == InstallStrategy.STATIC else None
+        ),
+    )
 
+
+def _enable_shell(
+    program_name: str,
+    shell: ShellType,
+    plan: _EnablingPlan,
+    verbose: Optional[bool] = False,
+) -> bool:
+    """
+    Configure the tab completion of the program in the given shell.
+
+    :return: `True` if the configuration was added in the shell configuration
+    file, `False` otherwise.
+    """
+
+    configuration = _prepare_shell_configuration(
+        program_name=program_name,
+        shell=shell,
+        strategy=plan.strategy,
+        verbose=verbose,
+        wrapper=plan.wrapper,
+        command=plan.command,
+        zcompile=plan.zcompile,
+        prebuilt_directory=plan.prebuilt_directory,
+    )
+
+    if configuration is None:
+        return False
+
+    if isinstance(configuration, ShellConfigurationResult):
+        return configuration.added
+
+    shell_config_file, edit = configuration
+    [(_, added)] = edit_shell_configuration(
+        shell_config_file=shell_config_file, edits=[edit], verbose=verbose
+    )
+
+    return added
+
+
+def _detect_shell() -> ShellType:
+    """Detect the shell type, see :func:`auto_click_auto.utils.detect_shell`,
+    as an instrumented phase."""
+
+    with phase("detect_shell") as shell_phase:
+        shell = detect_shell()
+        shell_phase.record(outcome=shell.value)
+
+    return shell
+
+
+def _get_configuration_file_paths(
+    program_name: str,
+    shells: Set[ShellType],
+    strategy: InstallStrategy,
+    prebuilt_directory: Optional[str] = None,
+) -> List[str]:
+    """
+    Return the files the completion configuration of the program depends on:
+    the shell configuration and completion files, the program itself, its
+    prebuilt completion artifacts and `auto-click-auto`.
+    """
+
+    file_paths = [os.path.abspath(__file__), get_program_path(program_name)]
+
+    if prebuilt_directory is not None:
+        file_paths.append(
+            get_prebuilt_index_path(prebuilt_directory, program_name)
+        )
+        file_paths += [
+            get_prebuilt_script_path(prebuilt_directory, program_name, shell)
+            for shell in sorted(shells)
+        ]
+
+    for shell in sorted(shells):
         if shell in (ShellType.BASH, ShellType.ZSH):
-            shell_config_file = os.path.expanduser(f"~/.{shell.value}rc")
+            file_paths.append(os.path.expanduser(f"~/.{shell.value}rc"))
 
-            # Completion implementation: `eval` command in shell configuration
-            eval_command = (
-                f'eval \"$({click_env_var}={shell.value}_source '
-                f'{program_name})\"'
-            )
-            safe_eval_command =(
-                f"command -v {program_name} > /dev/null 2>&1 && "
-                f"{eval_command}"
-            )
+            native_script_path = None
+            if strategy == InstallStrategy.NATIVE:
+                native_script_path = get_native_script_path(
+                    program_name, shell, detect=False
+                )
 
-            old_config_string = (
-                "# Shell completion configuration for the Click Python " +
-                "package\n" + f"{eval_command}"
-            )
-            remove_shell_configuration(
-                shell_config_file=shell_config_file,
-                config_string=old_config_string,
-                verbose=verbose
-            )
+            if native_script_path is not None:
+                file_paths.append(native_script_path)
 
-            add_shell_configuration(
-                shell_config_file=shell_config_file,
-                config_string=safe_eval_command,
-                verbose=verbose,
-            )
+            elif strategy != InstallStrategy.EVAL:
+                file_paths.append(get_cached_script_path(program_name, shell))
+
+            if strategy == InstallStrategy.BUNDLE:
+                file_paths.append(get_bundle_path(shell))
 
         elif shell == ShellType.FISH:
-            completer_script_path = os.path.expanduser(
-                f"~/.config/fish/completions/{program_name}.{shell.value}"
+            file_paths.append(
+                os.path.expanduser(
+                    f"~/.config/fish/completions/{program_name}.{shell.value}"
+                )
             )
 
-            # bash and zsh config files are generic, so we can assume the user
-            # already has created them. fish's shell configuration file for
-            # custom completions is specific to the program name, so we will
-            # create it if it doesn't already exist.
-            create_file(file_path=completer_script_path)
+    return file_paths
 
-            command = (
-                f"{click_env_var}={shell.value}_source {program_name} | source"
-            )
-            safe_command = (
-                f"command -v {program_name} > /dev/null 2>&1 && "
-                f"{command}"
+
+def enable_click_shell_completions(
+    programs: Iterable[Tuple[str, Optional[Set[ShellType]]]],
+    verbose: Optional[bool] = False,
+    strategy: InstallStrategy = InstallStrategy.EVAL,
+) -> List[ShellConfigurationResult]:
+    """
+    Enable tab completion for many programs at once. All the changes are
+    planned first, and then every shell configuration file is read once and
+    written at most once, instead of a few times per program and shell.
+
+    The `daemon` and `static` strategies need the command of each program and
+    are only supported by :func:`enable_click_shell_completion`.
+
+    :param programs: The program names and the shell types for which we want
+    to add tab completion support. `None` shells are detected as in
+    :func:`enable_click_shell_completion`.
+    :param verbose: `True` to print more details regarding the installation,
+    `False` otherwise.
+    :param strategy: The way the completion is installed, see
+    :func:`enable_click_shell_completion`.
+    :return: What changed in the shell configuration files, for each program
+    and shell.
+    :raise NotImplementedError: When ``shells`` option is not supported.
+    :raise ValueError: When the ``strategy`` needs the command of each
+    program.
+    """
+
+    if strategy in (InstallStrategy.DAEMON, InstallStrategy.STATIC):
+        raise ValueError(
+            f"The {strategy.value} strategy is not supported for many "
+            "programs at once."
+        )
+
+    if not _check_supported_os(verbose=verbose):
+        return []
+
+    # The edits of each shell configuration file, in the order of the programs.
+    edits: Dict[str, List[Tuple[str, ShellType, ConfigurationEdit]]] = {}
+    # The results of the fish completion files, which are written directly.
+    fish_results: List[ShellConfigurationResult] = []
+    detected_shells: Optional[Set[ShellType]] = None
+
+    for program_name, shells in programs:
+        if shells is None:
+            if detected_shells is None:
+                try:
+                    detected_shells = {_detect_shell()}
+
+                except (
+                    ShellTypeNotSupportedError, ShellEnvVarNotFoundError
+                ) as err:
+                    if verbose is True:
+                        print(err)
+
+                    return []
+
+            shells = detected_shells
+
+        for shell in shells:
+            configuration = _prepare_shell_configuration(
+                program_name=program_name,
+                shell=shell,
+                strategy=strategy,
+                verbose=verbose,
             )
 
-            old_config_string = (
-                "# Shell completion configuration for the Click Python " +
-                "package\n" + f"{command}"
+            if isinstance(configuration, ShellConfigurationResult):
+                fish_results.append(configuration)
+
+            elif configuration is not None:
+                shell_config_file, edit = configuration
+                edits.setdefault(shell_config_file, []).append(
+                    (program_name, shell, edit)
+                )
+
+    results = _apply_configuration_edits(edits, verbose=verbose)
+    results += fish_results
+
+    if any(result.added for result in results):
+        print(
+            "Restart or create a new shell session for the changes to take "
+            "effect."
+        )
+
+    return results
+
+
+def _apply_configuration_edits(
+    edits: Dict[str, List[Tuple[str, ShellType, ConfigurationEdit]]],
+    verbose: Optional[bool] = False,
+) -> List[ShellConfigurationResult]:
+    """
+    Apply the planned edits of every shell configuration file, each with one
+    read and at most one write.
+
+    :param edits: The edits of each shell configuration file, with the program
+    and shell of each edit.
+    :param verbose: `True` to print more details regarding the installation,
+    `False` otherwise.
+    :return: What changed for each program and shell.
+    """
+
+    results = []
+    for shell_config_file, file_edits in edits.items():
+        file_results = edit_shell_configuration(
+            shell_config_file=shell_config_file,
+            edits=[edit for _, _, edit in file_edits],
+            verbose=verbose,
+        )
+
+        for (program_name, shell, _), (removed, added) in zip(
+            file_edits, file_results
+        ):
+            results.append(
+                ShellConfigurationResult(
+                    program_name=program_name,
+                    shell=shell,
+                    shell_config_file=shell_config_file,
+                    removed=removed,
+                    added=added,
+                )
             )
-            remove_shell_configuration(
-                shell_config_file=completer_script_path,
-                config_string=old_config_string,
-                verbose=verbose,
+
+    return results
+
+
+def _check_fish_completion_file(
+    completer_script_path: str, program_name: str
+) -> Optional[int]:
+    """
+    Check whether the fish completion file of the program can be replaced by
+    its whole completion script: when it does not exist or is empty, was
+    written by `auto-click-auto` with a fingerprint, or only holds the
+    configuration block that sources the script the program generates.
+
+    :param completer_script_path: The path of the fish completion file.
+    :param program_name: The program name, also described as the executable
+    name.
+    :return: The number of configuration blocks the file holds, or `None` if
+    the file holds other completions, e.g., written by the user.
+    """
+
+    try:
+        with open(completer_script_path) as file:
+            content = file.read()
+    except FileNotFoundError:
+        return 0
+
+    if read_script_fingerprint(completer_script_path) is not None:
+        return 0
+
+    source_command = (
+        f"{get_click_env_var(program_name)}=fish_source {program_name} "
+        "| source"
+    )
+    safe_command = (
+        f"command -v {program_name} > /dev/null 2>&1 && {source_command}"
+    )
+
+    removed = 0
+    for config_string in (safe_command, source_command):
+        block = f"{SHELL_CONFIGURATION_COMMENT}\n{config_string}"
+        removed += content.count(block)
+        content = content.replace(block, "")
+
+    if content.strip():
+        return None
+
+    return removed
+
+
+def _prepare_shell_configuration(
+    program_name: str,
+    shell: ShellType,
+    strategy: InstallStrategy,
+    verbose: Optional[bool] = False,
+    wrapper: Optional[str] = None,
+    command: Optional[Command] = None,
+    zcompile: bool = False,
+    script: Optional[str] = None,
+    prebuilt_directory: Optional[str] = None,
+) -> Optional[Union[Tuple[str, ConfigurationEdit], ShellConfigurationResult]]:
+    """
+    Write the completion files of the program for the given shell and return
+    the changes its shell configuration file needs, or, for fish, what
+    changed in the completion file of the program.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param shell: The shell type.
+    :param strategy: The way the completion is installed.
+    :param verbose: `True` to print more details regarding the installation,
+    `False` otherwise.
+    :param wrapper: The shell command the completion requests run through, for
+    the `daemon` strategy and the budget.
+    :param command: The root command of the program, for the `static`
+    strategy.
+    :param zcompile: `True` to compile the zsh completion function of the
+    `native` strategy, `False` otherwise.
+    :param script: The content of the cached completion script, rendered
+    ahead with :func:`auto_click_auto.scripts.render_cached_completion_script`,
+    for the `cached` and `lazy` strategies, and of the fish completion file.
+    :param prebuilt_directory: The directory of the prebuilt completion
+    scripts, for the `static` strategy.
+    :return: The shell configuration file and its changes, the result of the
+    fish completion file, or `None` if there is nothing to change.
+    :raise NotImplementedError: When ``shell`` is not supported.
+    """
+
+    click_env_var = get_click_env_var(program_name)
+
+    if shell in (ShellType.BASH, ShellType.ZSH):
+        shell_config_file = os.path.expanduser(f"~/.{shell.value}rc")
+
+        # Completion implementation: completion script loaded on demand by the
+        # shell
+        native_script_path = get_native_script_path(
+            program_name, shell, detect=strategy == InstallStrategy.NATIVE
+        )
+        if strategy == InstallStrategy.NATIVE and native_script_path is None:
+            if verbose is True:
+                print(
+                    f"{shell.value} cannot load completion scripts on "
+                    "demand, using the cached strategy instead."
+                )
+
+            strategy = InstallStrategy.CACHED
+
+        # Completion implementation: `eval` command in shell configuration
+        eval_command = (
+            f'eval \"$({click_env_var}={shell.value}_source '
+            f'{program_name})\"'
+        )
+        safe_eval_command =(
+            f"command -v {program_name} > /dev/null 2>&1 && "
+            f"{eval_command}"
+        )
+
+        # Completion implementation: `source` the cached completion script
+        script_path = get_shell_path(
+            get_cached_script_path(program_name, shell)
+        )
+        # The cached script may have been removed with the cache directory,
+        # until the program writes it again.
+        safe_source_command = (
+            f"command -v {program_name} > /dev/null 2>&1 && "
+            f'[ -r \"{script_path}\" ] && . \"{script_path}\"'
+        )
+        # The source command of older versions, without the check.
+        unchecked_source_command = (
+            f"command -v {program_name} > /dev/null 2>&1 && "
+            f'. \"{script_path}\"'
+        )
+
+        # Completion implementation: stub function that sources the cached
+        # completion script on the first tab press
+        lazy_stub = render_lazy_completion_stub(
+            program_name=program_name, shell=shell, script_path=script_path
+        )
+
+        # Completion implementation: `source` the bundle of the completion
+        # scripts of all the bundled programs
+        bundle_path = get_shell_path(get_bundle_path(shell))
+        bundle_source_command = (
+            f'[ -r \"{bundle_path}\" ] && . \"{bundle_path}\"'
+        )
+
+        if strategy == InstallStrategy.BUNDLE:
+            update_bundle(shell, add=program_name, verbose=verbose)
+
+        elif script is not None and strategy in (
+            InstallStrategy.CACHED,
+            InstallStrategy.LAZY,
+        ):
+            write_rendered_script(
+                get_cached_script_path(program_name, shell), script
             )
 
-            add_shell_configuration(
-                shell_config_file=completer_script_path,
-                config_string=safe_command,
-                verbose=verbose,
+        elif strategy != InstallStrategy.EVAL:
+            try:
+                write_cached_completion_script(
+                    program_name=program_name,
+                    shell=shell,
+                    verbose=verbose,
+                    wrapper=wrapper,
+                    script_path=(
+                        native_script_path
+                        if strategy == InstallStrategy.NATIVE
+                        else None
+                    ),
+                    command=command,
+                    prebuilt_directory=prebuilt_directory,
+                )
+            except CompletionScriptGenerationError as err:
+                if verbose is True:
+                    print(err)
+
+                return None
+
+        if strategy == InstallStrategy.NATIVE:
+            assert native_script_path is not None
+
+            if zcompile and shell == ShellType.ZSH:
+                compile_zsh_function(native_script_path, verbose=verbose)
+
+        # Remove a completion script written by the native strategy.
+        elif (
+            native_script_path is not None
+            and read_script_fingerprint(native_script_path) is not None
+        ):
+            os.remove(native_script_path)
+
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(f"{native_script_path}.zwc")
+
+        # Remove the program from the bundle, without removing the bundle
+        # from the shell configuration file, since other programs use it.
+        if (
+            strategy != InstallStrategy.BUNDLE
+            and os.path.exists(get_bundle_path(shell))
+            and program_name in get_bundled_programs(shell)
+        ):
+            update_bundle(shell, remove=program_name, verbose=verbose)
+
+        config_strings = {
+            InstallStrategy.EVAL: safe_eval_command,
+            InstallStrategy.CACHED: safe_source_command,
+            InstallStrategy.LAZY: lazy_stub,
+            InstallStrategy.DAEMON: safe_source_command,
+            InstallStrategy.STATIC: safe_source_command,
+        }
+
+        addition = (
+            bundle_source_command
+            if strategy == InstallStrategy.BUNDLE
+            else config_strings.get(strategy)
+        )
+        old_config_strings = [eval_command, unchecked_source_command] + [
+            config_string
+            for config_string in config_strings.values()
+            if config_string != addition
+        ]
+
+        return shell_config_file, ConfigurationEdit(
+            removals=[
+                f"{SHELL_CONFIGURATION_COMMENT}\n{old_config_string}"
+                for old_config_string in old_config_strings
+            ],
+            addition=addition,
+        )
+
+    elif shell == ShellType.FISH:
+        completer_script_path = os.path.expanduser(
+            f"~/.config/fish/completions/{program_name}.{shell.value}"
+        )
+
+        removed = _check_fish_completion_file(
+            completer_script_path, program_name
+        )
+        if removed is None:
+            print(
+                f"Warning: {completer_script_path} has completions that were "
+                "not written by auto-click-auto, leaving it unchanged."
             )
+            return None
+
+        old_fingerprint = read_script_fingerprint(completer_script_path)
+
+        # The whole completion script is written in the fish completion file
+        # of the program, which fish loads when the program is first
+        # completed in a session. The scripts generated by Click check that
+        # the program has not changed since.
+        check_program = wrapper is None and strategy in (
+            InstallStrategy.EVAL,
+            InstallStrategy.CACHED,
+            InstallStrategy.LAZY,
+            InstallStrategy.BUNDLE,
+        )
+
+        if script is not None:
+            written = write_rendered_script(completer_script_path, script)
 
         else:
-            raise NotImplementedError
+            try:
+                write_cached_completion_script(
+                    program_name=program_name,
+                    shell=shell,
+                    verbose=verbose,
+                    wrapper=wrapper,
+                    script_path=completer_script_path,
+                    command=command,
+                    prebuilt_directory=prebuilt_directory,
+                    check_program=check_program,
+                )
+            except CompletionScriptGenerationError as err:
+                if verbose is True:
+                    print(err)
+
+                return None
+
+            written = (
+                read_script_fingerprint(completer_script_path)
+                != old_fingerprint
+            )
+
+        return ShellConfigurationResult(
+            program_name=program_name,
+            shell=shell,
+            shell_config_file=completer_script_path,
+            removed=removed,
+            added=written,
+        )
+
+    else:
+        raise NotImplementedError
 
 
 def enable_click_shell_completion_option(
     *param_decls: str,
     program_name: Optional[str] = None,
     shells: Optional[Set[ShellType]] = None,
+    strategy: InstallStrategy = InstallStrategy.EVAL,
+    command_import_path: Optional[str] = None,
     **kwargs: Any,
 ) -> _Decorator[FC]:
     """
@@ -167,6 +983,10 @@ def enable_click_shell_completion_option(
     also described as the executable name.
     :param shells: The shell types for which we want to add tab completion
     support.
+    :param strategy: How the tab completion is installed in the shell
+    configuration.
+    :param command_import_path: The import path of the program's root command
+    in the `module:attribute` format. Required by the `daemon` strategy.
     :param kwargs: Extra arguments are passed to :func:`option`.
     """
 
@@ -183,7 +1003,12 @@ def enable_click_shell_completion_option(
         assert program_name is not None
 
         enable_click_shell_completion(
-            program_name=program_name, shells=shells, verbose=True
+            program_name=program_name,
+            shells=shells,
+            verbose=True,
+            strategy=strategy,
+            command_import_path=command_import_path,
+            command=ctx.find_root().command,
         )
 
         ctx.exit()
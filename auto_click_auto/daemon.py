@@ -0,0 +1,247 @@
+import contextlib
+import hashlib
+import json
+import os
+import shlex
+import socketserver
+import sys
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Tuple
+
+from .completion import get_completion_response, load_command
+from .constants import ShellType
+from .fingerprint import get_program_fingerprint
+from .registry import load_registry
+from .utils import get_cache_directory
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from click import Command
+
+# The seconds without completion requests after which the daemon exits.
+DEFAULT_IDLE_TIMEOUT = 15 * 60
+
+
+def get_daemon_socket_path(python: Optional[str] = None) -> str:
+    """
+    Return the path of the Unix socket of the completion daemon of the given
+    Python interpreter. There is one daemon per user and interpreter, which
+    serves all the registered programs installed for that interpreter.
+
+    :param python: The path of the Python interpreter. Defaults to the current
+    one.
+    """
+
+    runtime_directory = (
+        os.environ.get("XDG_RUNTIME_DIR") or get_cache_directory()
+    )
+    digest = hashlib.sha256(
+        (python or sys.executable).encode()
+    ).hexdigest()[:8]
+
+    return os.path.join(runtime_directory, f"auto-click-auto-{digest}.sock")
+
+
+def get_daemon_client_command(
+    python: Optional[str] = None, budget: Optional[float] = None
+) -> str:
+    """
+    Return the shell command that runs the completion daemon client. The
+    program and its arguments are appended to the command.
+
+    :param python: The path of the Python interpreter. Defaults to the current
+    one.
+    :param budget: The number of seconds the daemon, or the program, has to
+    answer a completion request, after which the shell falls back to file
+    completion. `None` for no budget.
+    """
+
+    python = python or sys.executable
+    client_path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "client.py"
+    )
+
+    arguments = [python, "-S", "-E", client_path]
+    if budget is not None:
+        arguments += ["--budget", str(budget)]
+    arguments.append(get_daemon_socket_path(python))
+
+    return " ".join(shlex.quote(argument) for argument in arguments)
+
+
+@contextlib.contextmanager
+def _use_request_context(
+    cwd: Optional[str], env: Optional[Dict[str, str]]
+) -> Iterator[None]:
+    """Run the completion request in the working directory and with the
+    environment of the client, which are restored afterwards. The daemon
+    answers one request at a time, so requests do not see each other's."""
+
+    saved_cwd = os.getcwd()
+    saved_env = dict(os.environ)
+
+    try:
+        if env is not None:
+            os.environ.clear()
+            os.environ.update(env)
+
+        if cwd is not None:
+            os.chdir(cwd)
+
+        yield
+
+    finally:
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+
+
+class CompletionRequestHandler(socketserver.StreamRequestHandler):
+    """Handle one completion request sent by the daemon client."""
+
+    server: "CompletionDaemon"
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.read().decode())
+            response = f"ok\n{self.server.complete(request)}\n"
+
+        # The custom completion functions of the program may exit, e.g., with
+        # `sys.exit()`, which must not stop the daemon. The client then runs
+        # the program instead.
+        except (Exception, SystemExit):
+            response = "error\n"
+
+        self.wfile.write(response.encode())
+
+
+class CompletionDaemon(socketserver.UnixStreamServer):
+    """
+    A completion server that keeps the command trees of the registered
+    programs loaded and answers completion requests over a Unix socket. It
+    stops serving after ``idle_timeout`` seconds without requests.
+    """
+
+    def __init__(self, socket_path: str, idle_timeout: float) -> None:
+        """
+        :param socket_path: The path of the Unix socket to listen to.
+        :param idle_timeout: The seconds without completion requests after
+        which the daemon stops serving.
+        """
+
+        self.commands: Dict[str, Tuple["Command", str]] = {}
+        self.idle = False
+        self.timeout = idle_timeout
+        super().__init__(socket_path, CompletionRequestHandler)
+
+    def handle_timeout(self) -> None:
+        self.idle = True
+
+    def get_command(self, program_name: str) -> "Command":
+        """
+        Return the loaded root command of the registered program, loading it
+        on the first request.
+
+        :param program_name: The program name, also described as the
+        executable name.
+        :raise KeyError: When the program is not registered for the daemon.
+        """
+
+        fingerprint = get_program_fingerprint(
+            program_name, include_metadata=False
+        )
+
+        if program_name in self.commands:
+            command, loaded_fingerprint = self.commands[program_name]
+
+            if loaded_fingerprint == fingerprint:
+                return command
+
+            # Modules cannot be reliably reloaded, so the daemon exits to be
+            # started again with the updated program.
+            self.idle = True
+            raise RuntimeError(f"{program_name} has changed.")
+
+        command = load_command(load_registry()[program_name]["command"])
+        self.commands[program_name] = (command, fingerprint)
+
+        return command
+
+    def complete(self, request: Dict[str, Any]) -> str:
+        """
+        Answer a completion request of the client.
+
+        :param request: The completion request, with the program name, the
+        shell completion instruction, the `COMP_WORDS` and `COMP_CWORD`
+        values of the shell and, optionally, the working directory and the
+        environment of the client.
+        :return: The completion response.
+        """
+
+        shell, _, action = request["instruction"].partition("_")
+
+        if action != "complete" or shell not in ShellType.get_all_values():
+            raise ValueError(f"Unsupported instruction {request['instruction']}")
+
+        command = self.get_command(request["program"])
+
+        with _use_request_context(request.get("cwd"), request.get("env")):
+            # Click reads the completion arguments from the environment.
+            os.environ["COMP_WORDS"] = request["words"]
+            os.environ["COMP_CWORD"] = request["cword"]
+
+            return get_completion_response(
+                command, request["program"], shell
+            )
+
+    def serve_until_idle(self) -> None:
+        """Serve completion requests until the daemon is idle."""
+
+        while not self.idle:
+            self.handle_request()
+
+
+def run_daemon(
+    socket_path: Optional[str] = None,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+) -> None:
+    """
+    Run the completion daemon until it is idle. If another daemon is already
+    running on the same socket, return immediately.
+
+    :param socket_path: The path of the Unix socket to listen to. Defaults to
+    the socket of the current Python interpreter.
+    :param idle_timeout: The seconds without completion requests after which
+    the daemon exits.
+    """
+
+    socket_path = socket_path or get_daemon_socket_path()
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+
+    with open(f"{socket_path}.lock", "a") as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+
+        # Remove the socket a crashed daemon may have left behind.
+        try:
+            os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+
+        old_umask = os.umask(0o177)
+        try:
+            daemon = CompletionDaemon(socket_path, idle_timeout)
+        finally:
+            os.umask(old_umask)
+
+        try:
+            daemon.serve_until_idle()
+        finally:
+            daemon.server_close()
+            os.unlink(socket_path)
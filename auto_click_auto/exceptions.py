@@ -24,3 +24,9 @@ class ShellEnvVarNotFoundError(AutoClickAutoError):
     """
 
     pass
+
+
+class CompletionScriptGenerationError(AutoClickAutoError):
+    """Exception raised when the completion script cannot be generated."""
+
+    pass
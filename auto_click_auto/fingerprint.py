@@ -0,0 +1,119 @@
+import hashlib
+import os
+import shutil
+import sys
+from types import ModuleType
+from typing import List, Optional
+
+
+def _import_metadata() -> Optional[ModuleType]:
+    """Import `importlib.metadata` when it is first needed, since it is slow
+    to import."""
+
+    try:
+        from importlib import metadata
+
+        return metadata
+
+    except ImportError:  # Python 3.7
+        try:
+            import importlib_metadata
+
+            return importlib_metadata
+
+        except ImportError:
+            return None
+
+
+def get_distribution_version(distribution_name: str) -> Optional[str]:
+    """
+    Return the installed version of the given distribution.
+
+    :param distribution_name: The name of the distribution, e.g., `click`.
+    :return: The version, or `None` if it cannot be determined.
+    """
+
+    importlib_metadata = _import_metadata()
+
+    if importlib_metadata is None:
+        return None
+
+    try:
+        return importlib_metadata.version(distribution_name)
+
+    except importlib_metadata.PackageNotFoundError:
+        return None
+
+
+def get_program_version(program_name: str) -> Optional[str]:
+    """
+    Return the version of the distribution that provides the given program as
+    a console script entry point.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :return: The version, or `None` if it cannot be determined.
+    """
+
+    importlib_metadata = _import_metadata()
+
+    if importlib_metadata is None:
+        return None
+
+    for distribution in importlib_metadata.distributions():
+        for entry_point in distribution.entry_points:
+            if (
+                entry_point.group == "console_scripts"
+                and entry_point.name == program_name
+            ):
+                return distribution.version
+
+    return None
+
+
+def get_program_path(program_name: str) -> str:
+    """
+    Return the path of the program's executable. If the program is not found
+    in `PATH`, the path of the currently running script is returned instead.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    """
+
+    return shutil.which(program_name) or os.path.abspath(sys.argv[0])
+
+
+def get_program_fingerprint(
+    program_name: str, include_metadata: bool = True
+) -> str:
+    """
+    Return a short fingerprint that changes whenever the program changes. It
+    is built from the path, modification time and size of the program's entry
+    point and, optionally, from the versions of the program and of Click.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param include_metadata: `True` to also include the program and Click
+    versions, `False` to only use the entry point's file metadata. Looking up
+    the versions reads the metadata of the installed distributions, which is
+    too slow for code that runs on every tab press.
+    :return: The fingerprint as a hexadecimal string.
+    """
+
+    program_path = get_program_path(program_name)
+    parts: List[str] = [program_name, program_path]
+
+    try:
+        stat_result = os.stat(program_path)
+        parts += [str(stat_result.st_mtime_ns), str(stat_result.st_size)]
+
+    except OSError:
+        parts.append("")
+
+    if include_metadata:
+        parts += [
+            str(get_program_version(program_name)),
+            str(get_distribution_version("click")),
+        ]
+
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:16]
@@ -0,0 +1,278 @@
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from click import (
+    STRING,
+    Argument,
+    Choice,
+    Command,
+    Context,
+    Group,
+    Option,
+    Parameter,
+    ParamType,
+    Path,
+)
+from click.shell_completion import CompletionItem
+
+from .completion import CommandLoader, load_command
+from .fingerprint import get_program_fingerprint
+from .tree import CompletionType, walk_command_tree
+from .utils import get_cache_directory, write_file_atomically
+
+# A function that loads the real command at the given path of subcommands.
+CommandLocator = Callable[[Tuple[str, ...]], Command]
+
+
+def get_command_index_path(program_name: str) -> str:
+    """
+    Return the path of the command tree index of the given program, stored in
+    `~/.cache/auto-click-auto/{program_name}.index.json` by default.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    """
+
+    return os.path.join(get_cache_directory(), f"{program_name}.index.json")
+
+
+def build_command_index(command: Command, program_name: str) -> Dict[str, Any]:
+    """
+    Describe the whole command tree of the program in a JSON serializable
+    index. The commands are keyed by the space separated names of the
+    subcommands leading to them.
+
+    :param command: The root command of the program.
+    :param program_name: The program name, also described as the executable
+    name.
+    """
+
+    commands = {}
+    for spec in walk_command_tree(command, program_name):
+        commands[" ".join(spec.path)] = {
+            **spec._asdict(),
+            "options": [option._asdict() for option in spec.options],
+            "arguments": [argument._asdict() for argument in spec.arguments],
+        }
+
+    return {
+        # Only the entry point is checked on completion requests, where
+        # looking up the installed distributions would be too slow.
+        "fingerprint": get_program_fingerprint(
+            program_name, include_metadata=False
+        ),
+        "commands": commands,
+    }
+
+
+def write_command_index(command: Command, program_name: str) -> None:
+    """
+    Build the command tree index of the program and store it in the cache.
+
+    :param command: The root command of the program.
+    :param program_name: The program name, also described as the executable
+    name.
+    """
+
+    write_file_atomically(
+        file_path=get_command_index_path(program_name),
+        content=json.dumps(build_command_index(command, program_name)),
+    )
+
+
+def load_command_index(program_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the command tree index of the program from the cache.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :return: The index, or `None` if it is missing, unreadable or was built
+    for another version of the program.
+    """
+
+    try:
+        with open(get_command_index_path(program_name)) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if index.get("fingerprint") != get_program_fingerprint(
+        program_name, include_metadata=False
+    ):
+        return None
+
+    return index
+
+
+def _get_indexed_command_locator(
+    index: Dict[str, Any], get_command: CommandLoader
+) -> CommandLocator:
+    """
+    Return a function that loads the real command at the given path, importing
+    only the module of the command when the index knows its import path, and
+    the whole program otherwise.
+    """
+
+    def locate_command(path: Tuple[str, ...]) -> Command:
+        import_path = index["commands"][" ".join(path)]["import_path"]
+
+        if import_path is not None:
+            return load_command(import_path)
+
+        command = load_command(get_command)
+        for name in path:
+            assert isinstance(command, Group)
+            subcommand = command.get_command(Context(command), name)
+            assert subcommand is not None
+            command = subcommand
+
+        return command
+
+    return locate_command
+
+
+def _build_parameter(
+    spec: Dict[str, Any],
+    path: Tuple[str, ...],
+    locate_command: CommandLocator,
+) -> Parameter:
+    """Build a Click parameter that completes as the indexed parameter."""
+
+    completion_type = spec["completion_type"]
+    param_type: ParamType = STRING
+    if completion_type == CompletionType.CHOICE:
+        param_type = Choice(spec["choices"])
+    elif completion_type == CompletionType.FILE:
+        param_type = Path()
+    elif completion_type == CompletionType.DIR:
+        param_type = Path(file_okay=False)
+
+    shell_complete = None
+    if completion_type == CompletionType.DYNAMIC:
+
+        def shell_complete(
+            ctx: Context, param: Parameter, incomplete: str
+        ) -> List[CompletionItem]:
+            # Only the completion of the real parameter needs the command.
+            for real_param in locate_command(path).params:
+                if real_param.name == param.name:
+                    return real_param.shell_complete(ctx, incomplete)
+
+            return []
+
+    if not spec["opts"]:
+        return Argument(
+            [spec["name"]],
+            type=param_type,
+            nargs=spec["nargs"],
+            required=False,
+            shell_complete=shell_complete,
+        )
+
+    if not spec["takes_value"]:
+        return Option(
+            [spec["name"], *spec["opts"]],
+            is_flag=True,
+            multiple=spec["multiple"],
+            help=spec["help"],
+        )
+
+    return Option(
+        [spec["name"], *spec["opts"]],
+        type=param_type,
+        nargs=spec["nargs"],
+        multiple=spec["multiple"],
+        help=spec["help"],
+        shell_complete=shell_complete,
+    )
+
+
+class IndexedGroup(Group):
+    """
+    A group of the command tree index, which builds its subcommands from the
+    index on demand.
+    """
+
+    def __init__(
+        self,
+        index: Dict[str, Any],
+        path: Tuple[str, ...],
+        locate_command: CommandLocator,
+        **attrs: Any,
+    ) -> None:
+        super().__init__(**attrs)
+        self.index = index
+        self.path = path
+        self.locate_command = locate_command
+
+    def list_commands(self, ctx: Context) -> List[str]:
+        spec = self.index["commands"][" ".join(self.path)]
+        return [name for name, _ in spec["subcommands"]]
+
+    def get_command(self, ctx: Context, cmd_name: str) -> Optional[Command]:
+        path = self.path + (cmd_name,)
+
+        if " ".join(path) not in self.index["commands"]:
+            return None
+
+        return build_indexed_command(self.index, path, self.locate_command)
+
+
+def build_indexed_command(
+    index: Dict[str, Any],
+    path: Tuple[str, ...],
+    locate_command: CommandLocator,
+) -> Command:
+    """
+    Build a Click command that completes as the indexed command at the given
+    path, without importing the program.
+
+    :param index: The command tree index of the program.
+    :param path: The names of the subcommands leading to the command.
+    :param locate_command: A function that loads the real command at a path,
+    for the parameters with custom completion functions.
+    """
+
+    spec = index["commands"][" ".join(path)]
+    attrs = {
+        "name": path[-1] if path else None,
+        "help": spec["help"],
+        "params": [
+            _build_parameter(param_spec, path, locate_command)
+            for param_spec in spec["options"] + spec["arguments"]
+        ],
+        # The help option is already part of the indexed options.
+        "add_help_option": False,
+    }
+
+    if spec["subcommands"]:
+        return IndexedGroup(index, path, locate_command, **attrs)
+
+    return Command(**attrs)
+
+
+def load_indexed_command(
+    program_name: str, get_command: CommandLoader
+) -> Command:
+    """
+    Return a command that completes as the root command of the program, built
+    from the command tree index when it is up to date. Otherwise, load the
+    program and store its index for the next completion requests.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param get_command: A function that builds and returns the root command of
+    the program, or its import path in the `module:attribute` format.
+    """
+
+    index = load_command_index(program_name)
+
+    if index is None:
+        command = load_command(get_command)
+        write_command_index(command, program_name)
+        return command
+
+    return build_indexed_command(
+        index, (), _get_indexed_command_locator(index, get_command)
+    )
@@ -0,0 +1,208 @@
+import sys
+import time
+from types import TracebackType
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    List,
+    NamedTuple,
+    Optional,
+    Type,
+    Union,
+)
+
+if TYPE_CHECKING:
+    import logging
+
+# The name of the logger of the events.
+LOGGER_NAME = "auto_click_auto"
+
+
+class InstrumentationEvent(NamedTuple):
+    """A timed phase of enabling tab completion."""
+
+    # The name of the phase, e.g., `read` or `scan`.
+    phase: str
+    # The wall clock duration of the phase.
+    seconds: float
+    # The file the phase worked on, if any.
+    file_path: Optional[str]
+    # The number of bytes read, scanned, removed, added or written, if any.
+    size: Optional[int]
+    # The path taken by the phase, e.g., `unchanged` or `rewritten`, or
+    # `error:<exception name>` when the phase raised an exception.
+    outcome: Optional[str]
+
+
+InstrumentationHook = Callable[[InstrumentationEvent], None]
+
+_hooks: List[InstrumentationHook] = []
+
+
+def add_instrumentation_hook(hook: InstrumentationHook) -> None:
+    """
+    Call the given function with an :class:`InstrumentationEvent` at the end
+    of every phase of enabling tab completion: the OS check, the shell
+    detection, the stamp check, the generation of the completion scripts, the
+    creation of files, and the read, scan, removal, addition and write of the
+    shell configuration files.
+
+    The events are also logged at the `DEBUG` level by the `auto_click_auto`
+    logger. When there is no hook and the logger does not log `DEBUG`
+    messages, the phases are not timed.
+
+    :param hook: The function to call with each event. It runs in the
+    process that enables tab completion, so it should be fast.
+    """
+
+    _hooks.append(hook)
+
+
+def remove_instrumentation_hook(hook: InstrumentationHook) -> None:
+    """
+    Stop calling a function added with :func:`add_instrumentation_hook`.
+
+    :param hook: The function to stop calling.
+    :raise ValueError: When the function was not added.
+    """
+
+    _hooks.remove(hook)
+
+
+class Phase:
+    """A phase timed from the start to the end of a `with` block."""
+
+    __slots__ = ("phase", "file_path", "size", "outcome", "start")
+
+    def __init__(self, phase: str, file_path: Optional[str]) -> None:
+        self.phase = phase
+        self.file_path = file_path
+        self.size: Optional[int] = None
+        self.outcome: Optional[str] = None
+        self.start = 0.0
+
+    def record(
+        self, size: Optional[int] = None, outcome: Optional[str] = None
+    ) -> None:
+        """
+        Record the details of the phase.
+
+        :param size: The number of bytes the phase worked on.
+        :param outcome: The path taken by the phase.
+        """
+
+        if size is not None:
+            self.size = size
+
+        if outcome is not None:
+            self.outcome = outcome
+
+    def __enter__(self) -> "Phase":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        outcome = self.outcome
+        if exc_type is not None:
+            outcome = f"error:{exc_type.__name__}"
+
+        emit(
+            InstrumentationEvent(
+                phase=self.phase,
+                seconds=time.perf_counter() - self.start,
+                file_path=self.file_path,
+                size=self.size,
+                outcome=outcome,
+            )
+        )
+
+
+class _DisabledPhase:
+    """A phase that is not timed, returned when instrumentation is off."""
+
+    __slots__ = ()
+
+    def record(
+        self, size: Optional[int] = None, outcome: Optional[str] = None
+    ) -> None:
+        pass
+
+    def __enter__(self) -> "_DisabledPhase":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        pass
+
+
+_DISABLED_PHASE = _DisabledPhase()
+
+
+def _get_logger() -> Optional["logging.Logger"]:
+    # Nothing can be logged unless `logging` was imported, e.g., by the
+    # program, so it is not imported here.
+    logging = sys.modules.get("logging")
+
+    if logging is None or not logging.getLogger(LOGGER_NAME).isEnabledFor(
+        logging.DEBUG
+    ):
+        return None
+
+    return logging.getLogger(LOGGER_NAME)
+
+
+def is_enabled() -> bool:
+    """Check whether the phases are timed."""
+
+    return bool(_hooks) or _get_logger() is not None
+
+
+def phase(
+    name: str, file_path: Optional[str] = None
+) -> Union[Phase, _DisabledPhase]:
+    """
+    Time the phase run in the returned context manager, or do nothing if
+    instrumentation is off.
+
+    :param name: The name of the phase.
+    :param file_path: The file the phase works on, if any.
+    """
+
+    if not is_enabled():
+        return _DISABLED_PHASE
+
+    return Phase(name, file_path)
+
+
+def emit(event: InstrumentationEvent) -> None:
+    """
+    Log the given event and pass it to the instrumentation hooks.
+
+    :param event: The event of a finished phase.
+    """
+
+    # The logger of the events, if it logs them.
+    logger = _get_logger()
+
+    if logger is not None:
+        logger.debug(
+            "%s took %.6fs (file: %s, size: %s, outcome: %s)",
+            event.phase,
+            event.seconds,
+            event.file_path,
+            event.size,
+            event.outcome,
+            extra={"auto_click_auto_event": event},
+        )
+
+    for hook in list(_hooks):
+        hook(event)
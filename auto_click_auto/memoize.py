@@ -0,0 +1,165 @@
+import functools
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, List, Optional, Sequence, TypeVar, Union
+
+from click import Context, Parameter
+from click.shell_completion import CompletionItem
+
+from .cache import DiskCache
+from .utils import get_cache_directory, run_detached
+
+ShellCompleteResult = Sequence[Union[CompletionItem, str]]
+ShellComplete = Callable[[Context, Parameter, str], ShellCompleteResult]
+ContextKey = Callable[[Context, Parameter], str]
+F = TypeVar("F", bound=ShellComplete)
+
+# The number of seconds after which a refresh that did not finish, e.g.,
+# because its process was killed, no longer prevents other refreshes.
+REFRESH_TIMEOUT = 60.0
+
+
+def get_memoized_cache_directory(callback: Callable[..., Any]) -> str:
+    """
+    Return the directory of the memoized results of the given `shell_complete`
+    callback, `~/.cache/auto-click-auto/shell-complete/<hash>` by default,
+    where the hash is computed from the qualified name of the callback.
+
+    :param callback: The `shell_complete` callback.
+    """
+
+    qualified_name = f"{callback.__module__}.{callback.__qualname__}"
+
+    return os.path.join(
+        get_cache_directory(),
+        "shell-complete",
+        hashlib.sha256(qualified_name.encode()).hexdigest()[:16],
+    )
+
+
+def _serialize(items: ShellCompleteResult) -> str:
+    return json.dumps(
+        [
+            [item, "plain", None]
+            if isinstance(item, str)
+            else [item.value, item.type, item.help]
+            for item in items
+        ]
+    )
+
+
+def _deserialize(value: str) -> List[CompletionItem]:
+    return [
+        CompletionItem(item_value, type=item_type, help=item_help)
+        for item_value, item_type, item_help in json.loads(value)
+    ]
+
+
+def _start_refresh(refresh_path: str) -> bool:
+    """
+    Mark the refresh of an entry as started, unless another process already
+    refreshes it.
+
+    :return: `True` if the refresh was marked as started, `False` otherwise.
+    """
+
+    try:
+        if time.time() - os.stat(refresh_path).st_mtime > REFRESH_TIMEOUT:
+            os.unlink(refresh_path)
+    except FileNotFoundError:
+        pass
+
+    try:
+        os.close(os.open(refresh_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+
+    return True
+
+
+def memoize_shell_complete(
+    ttl: float = 60,
+    max_entries: int = 256,
+    context_key: Optional[ContextKey] = None,
+) -> Callable[[F], F]:
+    """
+    Memoize a slow `shell_complete` callback of a Click parameter, e.g., one
+    that calls a remote API, on disk.
+
+    The results are kept per parameter, command, incomplete value and context
+    key in a size-bounded cache, see
+    :class:`auto_click_auto.cache.DiskCache`. A fresh result is returned
+    without calling the callback. A stale result is returned immediately as
+    well, while a detached background process calls the callback again and
+    stores its result for the next tab press. The callback only runs in the
+    foreground when there is no result at all.
+
+    ::
+
+        @memoize_shell_complete(ttl=300, context_key=lambda ctx, param: (
+            ctx.params.get("region") or ""
+        ))
+        def complete_clusters(ctx, param, incomplete):
+            ...
+
+    :param ttl: The number of seconds a result is fresh.
+    :param max_entries: The maximum number of results kept for the callback.
+    :param context_key: A function that returns the part of the key that
+    depends on the context, e.g., the values of other parameters the results
+    depend on.
+    """
+
+    def decorator(callback: F) -> F:
+        @functools.wraps(callback)
+        def wrapper(
+            ctx: Context, param: Parameter, incomplete: str
+        ) -> ShellCompleteResult:
+            cache = DiskCache(
+                get_memoized_cache_directory(callback), ttl, max_entries
+            )
+            key = json.dumps(
+                [
+                    ctx.command_path,
+                    param.name,
+                    incomplete,
+                    context_key(ctx, param) if context_key else None,
+                ]
+            )
+
+            def refresh() -> ShellCompleteResult:
+                items = callback(ctx, param, incomplete)
+                cache.set(key, _serialize(items))
+                return items
+
+            entry = cache.get_entry(key)
+
+            if entry is None:
+                return refresh()
+
+            if entry.age > ttl:
+                # Hidden, like the temporary files, from the eviction.
+                entry_path = cache.get_path(key)
+                refresh_path = os.path.join(
+                    cache.directory,
+                    f".{os.path.basename(entry_path)}.refresh",
+                )
+
+                def refresh_in_background() -> None:
+                    try:
+                        refresh()
+                    finally:
+                        os.unlink(refresh_path)
+
+                if not hasattr(os, "fork"):  # Windows
+                    return refresh()
+
+                if _start_refresh(refresh_path):
+                    run_detached(refresh_in_background)
+
+            return _deserialize(entry.value)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
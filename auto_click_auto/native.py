@@ -0,0 +1,233 @@
+import os
+import shutil
+import subprocess
+from typing import Optional
+
+from .constants import ShellType
+from .instrumentation import phase
+from .utils import get_cache_directory, write_file_atomically
+
+# The installation directories of bash-completion 2.x, which loads the
+# completion files of the `completions` directories on demand.
+BASH_COMPLETION_DIRECTORIES = (
+    "/usr/share/bash-completion",
+    "/usr/local/share/bash-completion",
+    "/opt/homebrew/share/bash-completion",
+    "/run/current-system/sw/share/bash-completion",
+)
+
+# Printed before the details of the zsh session, to skip the output of the
+# zsh configuration file.
+_ZSH_DETAILS_MARKER = "__auto_click_auto_zsh__"
+
+
+def detect_bash_completion() -> bool:
+    """
+    Check whether bash-completion 2.x, which loads the completion files of its
+    user directory on demand, is installed.
+    """
+
+    return any(
+        os.path.isfile(os.path.join(directory, "bash_completion"))
+        and os.path.isdir(os.path.join(directory, "completions"))
+        for directory in BASH_COMPLETION_DIRECTORIES
+    )
+
+
+def get_bash_completion_user_directory() -> str:
+    """
+    Return the directory bash-completion loads the user's completion files
+    from, `~/.local/share/bash-completion/completions` by default. It respects
+    the `BASH_COMPLETION_USER_DIR` and `XDG_DATA_HOME` environment variables.
+    """
+
+    user_directories = os.environ.get("BASH_COMPLETION_USER_DIR", "")
+    user_directory = user_directories.split(":")[0]
+    if not user_directory:
+        data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser(
+            "~/.local/share"
+        )
+        user_directory = os.path.join(data_home, "bash-completion")
+
+    return os.path.join(user_directory, "completions")
+
+
+def get_zsh_function_directory_record_path() -> str:
+    """
+    Return the path of the file that records the zsh function directory
+    detected by :func:`get_zsh_function_directory`.
+    """
+
+    return os.path.join(get_cache_directory(), "zsh-function-directory")
+
+
+def _detect_zsh_function_directory() -> Optional[str]:
+    """
+    Start an interactive zsh session to find a directory of the user in its
+    `fpath`, from which compinit autoloads completion functions.
+    """
+
+    if shutil.which("zsh") is None:
+        return None
+
+    try:
+        result = subprocess.run(
+            [
+                "zsh",
+                "-ic",
+                f"print -r -- {_ZSH_DETAILS_MARKER} "
+                "${+functions[compdef]}; print -rl -- $fpath",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=10,
+            universal_newlines=True,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+    _, _, details = result.stdout.rpartition(f"{_ZSH_DETAILS_MARKER} ")
+    lines = details.splitlines()
+
+    # compinit defines `compdef`, and completion functions are not autoloaded
+    # without it.
+    if not lines or lines[0] != "1":
+        return None
+
+    home = os.path.realpath(os.path.expanduser("~"))
+    candidates = [
+        directory
+        for directory in lines[1:]
+        if os.path.realpath(directory).startswith(home + os.sep)
+    ]
+
+    # An existing directory is already scanned by compinit.
+    for directory in candidates:
+        if os.path.isdir(directory) and os.access(directory, os.W_OK):
+            return directory
+
+    for directory in candidates:
+        if not os.path.exists(directory):
+            return directory
+
+    return None
+
+
+def get_zsh_function_directory(detect: bool = True) -> Optional[str]:
+    """
+    Return a directory of the user in the zsh `fpath`, from which compinit
+    autoloads completion functions, e.g., `~/.zfunc` after
+    `fpath=(~/.zfunc $fpath)` in `~/.zshrc`.
+
+    Detecting the directory starts an interactive zsh session, so the result
+    is recorded in the cache directory and detected again when the zsh
+    configuration file changes.
+
+    :param detect: `False` to only return the recorded directory.
+    :return: The directory, or `None` if there is none or compinit is not
+    used.
+    """
+
+    record_path = get_zsh_function_directory_record_path()
+
+    try:
+        zshrc_state = str(os.stat(os.path.expanduser("~/.zshrc")).st_mtime_ns)
+    except FileNotFoundError:
+        zshrc_state = ""
+
+    try:
+        with open(record_path) as file:
+            state, _, directory = file.read().partition("\n")
+
+        if state == zshrc_state or not detect:
+            return directory or None
+
+    except FileNotFoundError:
+        if not detect:
+            return None
+
+    with phase("detect_zsh_fpath") as detect_phase:
+        detected_directory = _detect_zsh_function_directory()
+        detect_phase.record(outcome=detected_directory or "unavailable")
+
+    write_file_atomically(
+        record_path, f"{zshrc_state}\n{detected_directory or ''}"
+    )
+
+    return detected_directory
+
+
+def get_native_script_path(
+    program_name: str, shell: ShellType, detect: bool = True
+) -> Optional[str]:
+    """
+    Return the path of the completion file the shell loads on demand for the
+    given program, in bash-completion's user directory for bash and in a
+    directory of the zsh `fpath` for zsh.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param shell: The shell type, bash or zsh.
+    :param detect: `False` to avoid starting a zsh session to find the zsh
+    function directory, see :func:`get_zsh_function_directory`.
+    :return: The path, or `None` if the shell cannot load completion files on
+    demand.
+    """
+
+    if shell == ShellType.BASH:
+        if not detect_bash_completion():
+            return None
+
+        return os.path.join(get_bash_completion_user_directory(), program_name)
+
+    elif shell == ShellType.ZSH:
+        directory = get_zsh_function_directory(detect=detect)
+
+        if directory is None:
+            return None
+
+        return os.path.join(os.path.expanduser(directory), f"_{program_name}")
+
+    return None
+
+
+def compile_zsh_function(
+    script_path: str, verbose: Optional[bool] = False
+) -> None:
+    """
+    Compile the given zsh function file with `zcompile` to a `.zwc` file next
+    to it, which zsh loads instead of the file while it is newer.
+
+    :param script_path: The path of the zsh function file.
+    :param verbose: `True` to print whether the compilation failed, `False`
+    otherwise.
+    """
+
+    compiled_path = f"{script_path}.zwc"
+
+    try:
+        if os.stat(compiled_path).st_mtime_ns >= os.stat(
+            script_path
+        ).st_mtime_ns:
+            return None
+    except FileNotFoundError:
+        pass
+
+    with phase("zcompile", script_path) as compile_phase:
+        try:
+            result = subprocess.run(
+                ["zsh", "-fc", 'zcompile -U -- "$1"', "zsh", script_path],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=10,
+            )
+            compiled = result.returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            compiled = False
+
+        compile_phase.record(outcome="compiled" if compiled else "failed")
+
+    if not compiled and verbose is True:
+        print(f"Could not compile {script_path} with zcompile.")
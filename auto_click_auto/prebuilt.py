@@ -0,0 +1,185 @@
+import json
+import os
+import sys
+from typing import TYPE_CHECKING, List, Optional, Type
+
+from click import Command
+
+from .constants import ShellType
+from .fingerprint import get_program_fingerprint
+from .index import (
+    build_command_index,
+    get_command_index_path,
+    load_command_index,
+)
+from .static import compile_static_completion
+from .utils import write_file_atomically
+
+if TYPE_CHECKING:
+    from setuptools import Command as SetuptoolsCommand
+
+
+def get_prebuilt_script_path(
+    directory: str, program_name: str, shell: ShellType
+) -> str:
+    """
+    Return the path of a prebuilt completion script, see
+    :func:`build_completion_artifacts`.
+
+    :param directory: The directory of the prebuilt artifacts.
+    :param program_name: The program name, also described as the executable
+    name.
+    :param shell: The shell type of the script.
+    """
+
+    return os.path.join(directory, f"{program_name}.{shell.value}")
+
+
+def get_prebuilt_index_path(directory: str, program_name: str) -> str:
+    """
+    Return the path of a prebuilt command tree index, see
+    :func:`build_completion_artifacts`.
+
+    :param directory: The directory of the prebuilt artifacts.
+    :param program_name: The program name, also described as the executable
+    name.
+    """
+
+    return os.path.join(directory, f"{program_name}.index.json")
+
+
+def build_completion_artifacts(
+    command: Command, program_name: str, directory: str
+) -> List[str]:
+    """
+    Write the completion artifacts of the program in the given directory,
+    meant to be run while the program's package is built, so that they ship
+    as package data: the bash, zsh and fish completion scripts compiled from
+    the command tree, see
+    :func:`auto_click_auto.static.compile_static_completion`, and the command
+    tree index, see :func:`auto_click_auto.index.build_command_index`.
+
+    The artifacts do not depend on where the program is installed. They are
+    installed with the `static` strategy and the ``prebuilt_directory`` of
+    :func:`auto_click_auto.enable_click_shell_completion`, which neither
+    imports the command tree nor runs the program.
+
+    :param command: The root command of the program.
+    :param program_name: The program name, also described as the executable
+    name.
+    :param directory: The directory to write the artifacts to, e.g., a
+    directory of the program's package in the build directory.
+    :return: The paths of the written artifacts.
+    """
+
+    file_paths = []
+
+    for shell in ShellType:
+        script_path = get_prebuilt_script_path(directory, program_name, shell)
+        write_file_atomically(
+            script_path,
+            compile_static_completion(command, program_name, shell),
+            mode=0o644,
+        )
+        file_paths.append(script_path)
+
+    index = build_command_index(command, program_name)
+    # The fingerprint of the installed program is only known when the index
+    # is installed.
+    index["fingerprint"] = None
+
+    index_path = get_prebuilt_index_path(directory, program_name)
+    write_file_atomically(index_path, json.dumps(index), mode=0o644)
+    file_paths.append(index_path)
+
+    return file_paths
+
+
+def install_prebuilt_index(directory: str, program_name: str) -> bool:
+    """
+    Install the prebuilt command tree index of the program in the cache, with
+    the fingerprint of the installed program, unless the cache already has an
+    index of this program version.
+
+    :param directory: The directory of the prebuilt artifacts.
+    :param program_name: The program name, also described as the executable
+    name.
+    :return: `True` if the index was installed, `False` if the cache was up to
+    date or there is no prebuilt index.
+    """
+
+    if load_command_index(program_name) is not None:
+        return False
+
+    try:
+        with open(get_prebuilt_index_path(directory, program_name)) as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return False
+
+    index["fingerprint"] = get_program_fingerprint(
+        program_name, include_metadata=False
+    )
+    write_file_atomically(
+        get_command_index_path(program_name), json.dumps(index)
+    )
+
+    return True
+
+
+def get_build_py_command(
+    program_name: str,
+    command_import_path: str,
+    directory: str,
+    base: Optional[Type["SetuptoolsCommand"]] = None,
+) -> Type["SetuptoolsCommand"]:
+    """
+    Return a setuptools `build_py` command that also writes the completion
+    artifacts of the program in the build directory, see
+    :func:`build_completion_artifacts`. Use it in the `cmdclass` of `setup`,
+    with `auto-click-auto` in the build requirements of the package::
+
+        setup(
+            ...,
+            cmdclass={
+                "build_py": get_build_py_command(
+                    program_name="my-program",
+                    command_import_path="my_program.cli:main",
+                    directory="my_program/completions",
+                )
+            },
+        )
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param command_import_path: The import path of the program's root command
+    in the `module:attribute` format, imported from the build directory.
+    :param directory: The directory of the artifacts, relative to the build
+    directory, i.e., in the program's package.
+    :param base: The `build_py` command to extend. Defaults to setuptools'.
+    """
+
+    if base is None:
+        from setuptools.command.build_py import build_py
+
+        base = build_py
+
+    class BuildPyWithCompletions(base):  # type: ignore[misc,valid-type]
+        def run(self) -> None:
+            super().run()
+
+            from .completion import load_command
+
+            sys.path.insert(0, self.build_lib)
+            try:
+                command = load_command(command_import_path)
+            finally:
+                sys.path.remove(self.build_lib)
+
+            build_completion_artifacts(
+                command,
+                program_name,
+                os.path.join(self.build_lib, directory),
+            )
+
+    return BuildPyWithCompletions
@@ -0,0 +1,252 @@
+import contextlib
+import mmap
+import os
+import struct
+import time
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from click import Context, Parameter
+from click.shell_completion import CompletionItem
+
+from .scanner import map_file
+from .utils import get_cache_directory, write_file_atomically
+
+# The first bytes of a prefix index file, followed by the number of
+# candidates, their offsets and their concatenated UTF-8 encoded values.
+PREFIX_INDEX_MAGIC = b"ACAPIDX1"
+_COUNT = struct.Struct("<Q")
+_OFFSET = struct.Struct("<Q")
+
+# The value of the item added after the results of a search that found more
+# candidates than it returns.
+MORE_MARKER = "…"
+
+
+def build_prefix_index(file_path: str, candidates: Iterable[str]) -> int:
+    """
+    Write the prefix index of the given candidates to the specified file. The
+    candidates are deduplicated and sorted by their UTF-8 encoded values, so
+    that the candidates with a given prefix are adjacent and found with a
+    binary search over the memory mapped file.
+
+    :param file_path: The path of the index file.
+    :param candidates: The completion candidates.
+    :return: The number of indexed candidates.
+    """
+
+    values = sorted({candidate.encode() for candidate in candidates})
+
+    offsets = bytearray()
+    offset = 0
+    for value in values:
+        offsets += _OFFSET.pack(offset)
+        offset += len(value)
+    offsets += _OFFSET.pack(offset)
+
+    write_file_atomically(
+        file_path,
+        PREFIX_INDEX_MAGIC
+        + _COUNT.pack(len(values))
+        + bytes(offsets)
+        + b"".join(values),
+    )
+
+    return len(values)
+
+
+class PrefixIndex:
+    """A sorted prefix index of completion candidates, see
+    :func:`build_prefix_index`."""
+
+    def __init__(self, data: Union[bytes, mmap.mmap]) -> None:
+        """
+        :param data: The content of the index file.
+        :raise ValueError: When the content is not a prefix index.
+        """
+
+        self.offsets_start = len(PREFIX_INDEX_MAGIC) + _COUNT.size
+
+        if (
+            len(data) < self.offsets_start
+            or data[:len(PREFIX_INDEX_MAGIC)] != PREFIX_INDEX_MAGIC
+        ):
+            raise ValueError("Not a prefix index.")
+
+        self.data = data
+        (self.count,) = _COUNT.unpack_from(data, len(PREFIX_INDEX_MAGIC))
+        self.values_start = (
+            self.offsets_start + (self.count + 1) * _OFFSET.size
+        )
+
+        if len(data) < self.values_start:
+            raise ValueError("Truncated prefix index.")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _get_value(self, index: int) -> bytes:
+        start, end = struct.unpack_from(
+            "<QQ", self.data, self.offsets_start + index * _OFFSET.size
+        )
+
+        return self.data[self.values_start + start:self.values_start + end]
+
+    def _bisect(self, value: bytes) -> int:
+        """Return the index of the first candidate not lower than the
+        value."""
+
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._get_value(middle) < value:
+                low = middle + 1
+            else:
+                high = middle
+
+        return low
+
+    def _get_range(self, prefix: str) -> range:
+        encoded_prefix = prefix.encode()
+        start = self._bisect(encoded_prefix)
+        # No UTF-8 encoded value contains the 0xff byte, so every candidate
+        # with the prefix is lower than the prefix followed by it.
+        end = self._bisect(encoded_prefix + b"\xff")
+
+        return range(start, end)
+
+    def count_prefix(self, prefix: str) -> int:
+        """Return the number of candidates with the given prefix."""
+
+        return len(self._get_range(prefix))
+
+    def search(
+        self, prefix: str, limit: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Yield the candidates with the given prefix, in their sorted order.
+
+        :param prefix: The prefix of the candidates.
+        :param limit: The maximum number of candidates to yield.
+        """
+
+        indices = self._get_range(prefix)
+
+        if limit is not None:
+            indices = indices[:limit]
+
+        for index in indices:
+            yield self._get_value(index).decode()
+
+
+@contextlib.contextmanager
+def open_prefix_index(file_path: str) -> Iterator[PrefixIndex]:
+    """
+    Memory map the specified prefix index file.
+
+    :param file_path: The path of the index file.
+    :raise FileNotFoundError: When the file does not exist.
+    :raise ValueError: When the file is not a prefix index.
+    """
+
+    with map_file(file_path) as data:
+        yield PrefixIndex(data)
+
+
+class PrefixIndexCompletion:
+    """
+    A `shell_complete` callback that completes a parameter against a very
+    large set of candidates, e.g., hundreds of thousands of identifiers.
+
+    The candidates are loaded once into a prefix index in
+    `~/.cache/auto-click-auto/prefix-index/<name>`, which is memory mapped and
+    searched with a binary search on every tab press. At most ``limit``
+    candidates are returned, followed by a :data:`MORE_MARKER` item that
+    tells how many candidates were left out, so that the shells are not
+    flooded with output.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load_candidates: Callable[[], Iterable[str]],
+        limit: int = 100,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """
+        :param name: The name of the index, unique for the user.
+        :param load_candidates: A function that returns the candidates.
+        :param limit: The maximum number of candidates returned on a tab
+        press.
+        :param ttl: The number of seconds after which the index is rebuilt
+        from the candidates on the next tab press. `None` to keep the index
+        until :meth:`rebuild` is called.
+        """
+
+        self.name = name
+        self.load_candidates = load_candidates
+        self.limit = limit
+        self.ttl = ttl
+
+    @property
+    def path(self) -> str:
+        """The path of the index file."""
+
+        return os.path.join(get_cache_directory(), "prefix-index", self.name)
+
+    def rebuild(self) -> int:
+        """
+        Build the index again from the candidates.
+
+        :return: The number of indexed candidates.
+        """
+
+        return build_prefix_index(self.path, self.load_candidates())
+
+    def _is_outdated(self) -> bool:
+        try:
+            modified = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return True
+
+        return self.ttl is not None and time.time() - modified > self.ttl
+
+    def _search(self, incomplete: str) -> Tuple[List[CompletionItem], int]:
+        with open_prefix_index(self.path) as index:
+            items = [
+                CompletionItem(value)
+                for value in index.search(incomplete, limit=self.limit)
+            ]
+
+            return items, index.count_prefix(incomplete) - len(items)
+
+    def __call__(
+        self, ctx: Context, param: Parameter, incomplete: str
+    ) -> List[CompletionItem]:
+        if self._is_outdated():
+            self.rebuild()
+
+        try:
+            items, remaining = self._search(incomplete)
+
+        # The index may have been removed in the meantime or, in case of an
+        # unexpected crash, corrupted.
+        except (OSError, ValueError):
+            self.rebuild()
+            items, remaining = self._search(incomplete)
+
+        if remaining > 0:
+            items.append(
+                CompletionItem(
+                    f"{incomplete}{MORE_MARKER}", help=f"{remaining} more"
+                )
+            )
+
+        return items
@@ -0,0 +1,269 @@
+import contextlib
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .constants import InstallStrategy, ShellType
+from .core import (
+    ShellConfigurationResult,
+    _apply_configuration_edits,
+    _prepare_shell_configuration,
+)
+from .exceptions import CompletionScriptGenerationError
+from .scripts import render_cached_completion_script
+from .utils import ConfigurationEdit
+
+# The strategies that only need files in the home directory, and no running
+# program, daemon or shell to detect where the completion is loaded from.
+PROVISION_STRATEGIES = (
+    InstallStrategy.EVAL,
+    InstallStrategy.CACHED,
+    InstallStrategy.LAZY,
+)
+
+# The environment variables that would point the files of a target outside
+# of its home directory.
+_HOME_VARIABLES = ("HOME", "XDG_CACHE_HOME", "XDG_DATA_HOME")
+
+Scripts = Dict[Tuple[str, ShellType], str]
+
+
+class ProvisionResult(NamedTuple):
+    """The completion configuration provisioned in a home directory."""
+
+    target: str
+    # What changed in the shell configuration files, for each program and
+    # shell.
+    results: List[ShellConfigurationResult]
+    # The error that stopped the provisioning of the target, if any.
+    error: Optional[str]
+
+
+@contextlib.contextmanager
+def _use_home(home: str) -> Iterator[None]:
+    """Resolve `~` and the cache and data directories in the given home
+    directory."""
+
+    saved = {name: os.environ.get(name) for name in _HOME_VARIABLES}
+
+    os.environ["HOME"] = home
+    os.environ.pop("XDG_CACHE_HOME", None)
+    os.environ.pop("XDG_DATA_HOME", None)
+
+    try:
+        yield
+
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _run_as_owner(
+    target: str, function: Callable[[], ProvisionResult]
+) -> ProvisionResult:
+    """
+    Run the provisioning of a target as the owner of the target, when
+    provisioning as root, so that the files are written with the owner's
+    permissions and the symbolic links of the owner cannot make root write
+    elsewhere. The privileges are dropped in a forked child process, since
+    they cannot be regained, and its result is sent back through a pipe.
+    """
+
+    if not hasattr(os, "geteuid") or os.geteuid() != 0:
+        return function()
+
+    owner = os.stat(target)
+
+    if owner.st_uid == 0:
+        return function()
+
+    read_fd, write_fd = os.pipe()
+    # The buffered output must not be written by both processes.
+    sys.stdout.flush()
+    pid = os.fork()
+
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            os.setgroups([owner.st_gid])
+            os.setgid(owner.st_gid)
+            os.setuid(owner.st_uid)
+            result = function()
+        except BaseException as err:
+            result = ProvisionResult(target=target, results=[], error=str(err))
+
+        with os.fdopen(write_fd, "wb") as pipe:
+            pickle.dump(result, pipe)
+
+        sys.stdout.flush()
+        os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as pipe:
+        data = pipe.read()
+    os.waitpid(pid, 0)
+
+    try:
+        return pickle.loads(data)
+    except (EOFError, pickle.UnpicklingError):
+        return ProvisionResult(
+            target=target,
+            results=[],
+            error="The provisioning process of the target failed.",
+        )
+
+
+def _provision_target(
+    target: str,
+    program_names: List[str],
+    shells: Set[ShellType],
+    strategy: InstallStrategy,
+    scripts: Scripts,
+    verbose: Optional[bool] = False,
+) -> ProvisionResult:
+    """Write the completion configuration of the programs in a home
+    directory, run in a worker process."""
+
+    def provision() -> ProvisionResult:
+        with _use_home(target):
+            edits: Dict[
+                str, List[Tuple[str, ShellType, ConfigurationEdit]]
+            ] = {}
+            fish_results: List[ShellConfigurationResult] = []
+
+            for program_name in program_names:
+                for shell in sorted(shells):
+                    configuration = _prepare_shell_configuration(
+                        program_name=program_name,
+                        shell=shell,
+                        strategy=strategy,
+                        verbose=verbose,
+                        script=scripts.get((program_name, shell)),
+                    )
+
+                    if isinstance(configuration, ShellConfigurationResult):
+                        fish_results.append(configuration)
+
+                    elif configuration is not None:
+                        shell_config_file, edit = configuration
+                        edits.setdefault(shell_config_file, []).append(
+                            (program_name, shell, edit)
+                        )
+
+            results = _apply_configuration_edits(edits, verbose=verbose)
+            results += fish_results
+
+        return ProvisionResult(target=target, results=results, error=None)
+
+    try:
+        return _run_as_owner(target, provision)
+
+    except OSError as err:
+        return ProvisionResult(target=target, results=[], error=str(err))
+
+
+def _provision_target_star(
+    arguments: Tuple[
+        str, List[str], Set[ShellType], InstallStrategy, Scripts, bool
+    ],
+) -> ProvisionResult:
+    return _provision_target(*arguments)
+
+
+def provision_completions(
+    targets: Iterable[str],
+    program_names: Iterable[str],
+    shells: Optional[Set[ShellType]] = None,
+    strategy: InstallStrategy = InstallStrategy.CACHED,
+    processes: Optional[int] = None,
+    verbose: Optional[bool] = False,
+) -> List[ProvisionResult]:
+    """
+    Provision the tab completion of many programs in many home directories at
+    once, e.g., the homes of the users of a shared build host, or the
+    `root` home and `/etc/skel` of a container image root filesystem.
+
+    The completion scripts of every program and shell are rendered once, and
+    then written along with the shell configuration of each target in
+    parallel worker processes. Re-running the provisioning only writes what
+    changed, e.g., the scripts of an upgraded program.
+
+    Only the strategies that need nothing but files in the home directory are
+    supported, see :data:`PROVISION_STRATEGIES`. As with
+    :func:`enable_click_shell_completion`, missing bash and zsh configuration
+    files are not created. When provisioning as root, each target is
+    provisioned as its owner.
+
+    :param targets: The home directories to provision.
+    :param program_names: The programs to provision, also described as the
+    executable names.
+    :param shells: The shell types to provision. Defaults to all the
+    supported shells.
+    :param strategy: The way the completion is installed, see
+    :func:`enable_click_shell_completion`.
+    :param processes: The number of worker processes. Defaults to the number
+    of CPUs. `1` to provision in the current process.
+    :param verbose: `True` to print more details regarding the installation,
+    `False` otherwise.
+    :return: The results of each target, in the order of the targets.
+    :raise ValueError: When the ``strategy`` is not supported.
+    """
+
+    if strategy not in PROVISION_STRATEGIES:
+        raise ValueError(
+            f"The {strategy.value} strategy is not supported for "
+            "provisioning."
+        )
+
+    targets = [os.path.abspath(target) for target in targets]
+    program_names = list(program_names)
+    shells = shells or set(ShellType)
+
+    # The fish completion files are written without the check of the
+    # program's path and modification time, which are those of this host.
+    scripts: Scripts = {}
+    for program_name in program_names:
+        for shell in shells:
+            if shell != ShellType.FISH and strategy == InstallStrategy.EVAL:
+                continue
+
+            try:
+                scripts[(program_name, shell)] = (
+                    render_cached_completion_script(program_name, shell)
+                )
+            except CompletionScriptGenerationError as err:
+                if verbose is True:
+                    print(err)
+
+    arguments = [
+        (target, program_names, shells, strategy, scripts, bool(verbose))
+        for target in targets
+    ]
+
+    if processes == 1 or len(targets) <= 1:
+        return [_provision_target_star(argument) for argument in arguments]
+
+    processes = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(
+            executor.map(
+                _provision_target_star,
+                arguments,
+                chunksize=max(len(arguments) // (processes * 4), 1),
+            )
+        )
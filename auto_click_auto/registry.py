@@ -0,0 +1,68 @@
+import json
+import os
+from typing import Any, Dict
+
+from .utils import file_lock, get_data_directory, write_file_atomically
+
+
+def get_registry_path() -> str:
+    """
+    Return the path of the registry of the programs `auto-click-auto` enabled
+    tab completion for, `~/.local/share/auto-click-auto/registry.json` by
+    default.
+    """
+
+    return os.path.join(get_data_directory(), "registry.json")
+
+
+def load_registry() -> Dict[str, Dict[str, Any]]:
+    """
+    Load the registry of the programs.
+
+    :return: A mapping of the program names to their registered details.
+    """
+
+    try:
+        with open(get_registry_path()) as file:
+            return json.load(file)
+
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def register_program(program_name: str, **details: Any) -> None:
+    """
+    Add the program to the registry or update its registered details.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param details: The details to store for the program.
+    """
+
+    registry_path = get_registry_path()
+
+    with file_lock(f"{registry_path}.lock"):
+        registry = load_registry()
+        registry.setdefault(program_name, {}).update(details)
+        write_file_atomically(
+            registry_path, json.dumps(registry, indent=2, sort_keys=True)
+        )
+
+
+def unregister_program(program_name: str) -> None:
+    """
+    Remove the program from the registry.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    """
+
+    registry_path = get_registry_path()
+
+    with file_lock(f"{registry_path}.lock"):
+        registry = load_registry()
+
+        if registry.pop(program_name, None) is not None:
+            write_file_atomically(
+                registry_path, json.dumps(registry, indent=2, sort_keys=True)
+            )
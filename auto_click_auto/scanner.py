@@ -0,0 +1,200 @@
+import contextlib
+import functools
+import mmap
+import os
+import re
+from typing import Dict, Iterator, List, NamedTuple, Pattern, Tuple, Union
+
+
+class ScanMatch(NamedTuple):
+    """A match of the configuration scanner in a shell configuration file."""
+
+    # The byte offsets of the match.
+    start: int
+    end: int
+    # The index of the matched pattern, the blocks first and then the strings.
+    pattern: int
+
+
+# The end of the last line of a block, either a newline or the end of the
+# content.
+_BLOCK_END = rb"(?:\r?\n|\Z)"
+
+_Trie = Dict[bytes, "_Trie"]
+
+
+def _render_trie(node: _Trie) -> bytes:
+    alternatives = [
+        token + _render_trie(child) for token, child in node.items() if token
+    ]
+
+    if not alternatives:
+        return b""
+
+    regex = alternatives[0]
+    if len(alternatives) > 1:
+        regex = b"(?:" + b"|".join(alternatives) + b")"
+
+    # The empty token marks the end of a pattern that is a prefix of others.
+    if b"" in node:
+        regex = b"(?:" + regex + b")?"
+
+    return regex
+
+
+def _get_tokens(text: str) -> List[bytes]:
+    return [re.escape(bytes([byte])) for byte in text.encode()]
+
+
+def compile_scanner(blocks: List[str], strings: List[str]) -> Pattern[bytes]:
+    """
+    Compile a single regular expression that matches all the given patterns,
+    so that a file is scanned once for all of them. The patterns are merged
+    in a trie, so the engine tries their common prefixes, e.g., the comment of
+    the configuration blocks, once instead of once per pattern.
+
+    :param blocks: Configuration blocks, matched as whole lines in their
+    order. The last line is matched with or without a trailing newline, which
+    is part of the match. The regular expression does not check that a block
+    starts at the beginning of a line, see :func:`scan_configuration`.
+    :param strings: Strings, matched anywhere.
+    """
+
+    return _compile_scanner(tuple(blocks), tuple(strings))
+
+
+# The same patterns are scanned for in every shell configuration file a
+# program, or a provisioning run, edits.
+@functools.lru_cache(maxsize=32)
+def _compile_scanner(
+    blocks: Tuple[str, ...], strings: Tuple[str, ...]
+) -> Pattern[bytes]:
+    trie: _Trie = {}
+    sequences = [
+        [
+            token
+            for index, line in enumerate(block.split("\n"))
+            for token in ([rb"\r?\n"] if index else []) + _get_tokens(line)
+        ]
+        + [_BLOCK_END]
+        for block in blocks
+    ] + [_get_tokens(string) for string in strings]
+
+    for sequence in sequences:
+        node = trie
+        for token in sequence:
+            node = node.setdefault(token, {})
+        node[b""] = {}
+
+    return re.compile(_render_trie(trie))
+
+
+def scan_configuration(
+    data: Union[bytes, mmap.mmap], blocks: List[str], strings: List[str]
+) -> List[ScanMatch]:
+    """
+    Find every non-overlapping match of the given patterns in one pass.
+
+    :param data: The content of the shell configuration file.
+    :param blocks: Configuration blocks, see :func:`compile_scanner`. Empty
+    blocks are ignored.
+    :param strings: Strings, see :func:`compile_scanner`. Empty strings are
+    ignored.
+    :return: The matches, in the order they appear in the content.
+    """
+
+    block_indices: Dict[str, int] = {}
+    for index, block in enumerate(blocks):
+        if block != "":
+            block_indices.setdefault(block, index)
+
+    string_indices: Dict[str, int] = {}
+    for index, string in enumerate(strings, start=len(blocks)):
+        if string != "":
+            string_indices.setdefault(string, index)
+
+    if not block_indices and not string_indices:
+        return []
+
+    scanner = compile_scanner(list(block_indices), list(string_indices))
+    string_scanner = None
+
+    matches: List[ScanMatch] = []
+    position = 0
+    while True:
+        match = scanner.search(data, position)
+
+        if match is None:
+            return matches
+
+        start, end = match.span()
+        text = match.group()
+        pattern = None
+
+        if (start == 0 or data[start - 1:start] == b"\n") and (
+            text.endswith(b"\n") or end == len(data)
+        ):
+            block_text = text.replace(b"\r\n", b"\n")
+            if block_text.endswith(b"\n"):
+                block_text = block_text[:-1]
+            pattern = block_indices.get(block_text.decode())
+
+        if pattern is None:
+            pattern = string_indices.get(text.decode())
+
+        if pattern is None:
+            # A block that does not start at the beginning of a line, which
+            # may hide a string at the same position.
+            string_match = None
+            if string_indices:
+                if string_scanner is None:
+                    string_scanner = compile_scanner([], list(string_indices))
+
+                string_match = string_scanner.match(data, start)
+
+            if string_match is None:
+                position = start + 1
+                continue
+
+            end = string_match.end()
+            pattern = string_indices[string_match.group().decode()]
+
+        matches.append(ScanMatch(start=start, end=end, pattern=pattern))
+        position = end
+
+
+@contextlib.contextmanager
+def map_file(file_path: str) -> Iterator[Union[bytes, mmap.mmap]]:
+    """
+    Memory map the specified file for reading, so that large files are not
+    copied in memory.
+
+    :param file_path: The path of the file to map.
+    :raise FileNotFoundError: When the file does not exist.
+    """
+
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            # Empty files cannot be mapped.
+            yield b""
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def scan_file(
+    file_path: str, blocks: List[str], strings: List[str]
+) -> List[ScanMatch]:
+    """
+    Find every non-overlapping match of the given patterns in the specified
+    file in one pass over its memory mapped content.
+
+    :param file_path: The path of the file to scan.
+    :param blocks: Configuration blocks, see :func:`compile_scanner`.
+    :param strings: Strings, see :func:`compile_scanner`.
+    :raise FileNotFoundError: When the file does not exist.
+    """
+
+    with map_file(file_path) as data:
+        return scan_configuration(data, blocks, strings)
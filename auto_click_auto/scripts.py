@@ -0,0 +1,446 @@
+import hashlib
+import os
+import re
+import shlex
+import sys
+from typing import Optional
+
+from click import Command
+from click.shell_completion import get_completion_class
+
+from .constants import FINGERPRINT_PREFIX, ShellType
+from .exceptions import CompletionScriptGenerationError
+from .fingerprint import get_program_fingerprint, get_program_path
+from .instrumentation import phase
+from .utils import (
+    get_cache_directory,
+    get_click_env_var,
+    write_file_atomically,
+)
+
+
+def generate_completion_script(program_name: str, shell: ShellType) -> str:
+    """
+    Generate the completion script that Click outputs for the
+    `{shell}_source` instruction of the given program.
+
+    The script is rendered with Click's own completion classes, so the output
+    is the same as running `_{PROGRAM_NAME}_COMPLETE={shell}_source
+    {program_name}`, without starting the program.
+
+    :param program_name: The program name for which we generate the script,
+    also described as the executable name.
+    :param shell: The shell type of the script.
+    :raise CompletionScriptGenerationError: When Click cannot generate the
+    script for the given shell.
+    """
+
+    completion_class = get_completion_class(shell.value)
+
+    if completion_class is None:
+        raise CompletionScriptGenerationError(
+            f"Click does not support shell completion for {shell.value}."
+        )
+
+    completion = completion_class(
+        Command(program_name), {}, program_name, get_click_env_var(program_name)
+    )
+
+    try:
+        return completion.source()
+
+    # Older Click versions raise an error for unsupported Bash versions.
+    except RuntimeError as err:
+        raise CompletionScriptGenerationError(str(err))
+
+
+# The part of Click's completion scripts that runs the program to get the
+# completions, for each shell. The group matches the program's command.
+_INVOCATION_PATTERNS = {
+    ShellType.BASH: r"=bash_complete (\$1)\)",
+    ShellType.ZSH: r"=zsh_complete ({program})\)",
+    ShellType.FISH: r"COMP_CWORD=\(commandline -t\) ({program})\)",
+}
+
+
+def wrap_completion_invocation(
+    script: str, program_name: str, shell: ShellType, wrapper: str
+) -> str:
+    """
+    Make the completion script run the given wrapper command, with the
+    program's command as its arguments, instead of the program itself.
+
+    :param script: The completion script generated by Click.
+    :param program_name: The program name, also described as the executable
+    name.
+    :param shell: The shell type of the script.
+    :param wrapper: The shell command that wraps the program's command.
+    :raise CompletionScriptGenerationError: When the program's command is not
+    found in the script.
+    """
+
+    match = re.search(
+        _INVOCATION_PATTERNS[shell].format(program=re.escape(program_name)),
+        script,
+    )
+
+    if match is None:
+        raise CompletionScriptGenerationError(
+            f"Could not find how the {shell.value} completion script of "
+            f"{program_name} runs the program."
+        )
+
+    return f"{script[:match.start(1)]}{wrapper} {script[match.start(1):]}"
+
+
+def get_budget_command(budget: float, python: Optional[str] = None) -> str:
+    """
+    Return the shell command that runs a completion request of the program
+    within a time budget, see the `auto_click_auto.budget` module. The
+    program and its arguments are appended to the command, as a wrapper of
+    :func:`wrap_completion_invocation`.
+
+    :param budget: The number of seconds the program has to answer, after
+    which the shell falls back to file completion.
+    :param python: The path of the Python interpreter. Defaults to the current
+    one.
+    """
+
+    budget_path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "budget.py"
+    )
+
+    return " ".join(
+        shlex.quote(argument)
+        for argument in (
+            python or sys.executable, "-S", "-E", budget_path, str(budget)
+        )
+    )
+
+
+def _fish_quote(text: str) -> str:
+    return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def guard_fish_completion_script(script: str, program_name: str) -> str:
+    """
+    Make a fish completion script of the program check, when fish loads it,
+    that the program's executable still has the path and modification time
+    it had when the script was written. The check only uses fish builtins,
+    so it does not start a process. If the program has changed since, e.g.,
+    it was upgraded, fish sources the completion script the program
+    generates instead, until the script is written again.
+
+    fish versions without the `path` builtin, before 3.5, skip the check.
+
+    :param script: The completion script.
+    :param program_name: The program name, also described as the executable
+    name.
+    """
+
+    program_path = get_program_path(program_name)
+
+    try:
+        mtime = int(os.stat(program_path).st_mtime)
+    except OSError:
+        mtime = -1
+
+    source_command = (
+        f"{get_click_env_var(program_name)}=fish_source {program_name} "
+        "| source"
+    )
+
+    return (
+        f"set -l program_path (command -s {program_name})\n"
+        "if set -q program_path[1]; and builtin -q path 2>/dev/null\n"
+        '    and test "$program_path[1] "(path mtime -- $program_path[1]) '
+        f"!= {_fish_quote(f'{program_path} {mtime}')}\n"
+        f"    {source_command}\n"
+        "else\n"
+        f"{script}\n"
+        "end"
+    )
+
+
+def get_completion_function_name(program_name: str) -> str:
+    """
+    Return the name of the shell function that Click's completion scripts
+    define for the given program, e.g., `_foo_bar_completion` for `foo-bar`.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    """
+
+    completion_class = get_completion_class(ShellType.BASH.value)
+    assert completion_class is not None
+
+    return completion_class(
+        Command(program_name), {}, program_name, get_click_env_var(program_name)
+    ).func_name
+
+
+def render_lazy_completion_stub(
+    program_name: str, shell: ShellType, script_path: str
+) -> str:
+    """
+    Render a one-line shell function that is registered as the completion
+    function of the program. On the first tab press, it sources the completion
+    script (or generates it with the `{shell}_source` instruction if the
+    script is missing), which replaces the stub, and completes.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param shell: The shell type of the stub, bash or zsh.
+    :param script_path: The path of the completion script, as it should be
+    written in the shell configuration.
+    :raise NotImplementedError: When ``shell`` is not bash or zsh.
+    """
+
+    function_name = get_completion_function_name(program_name)
+    stub_name = f"{function_name[:-len('_completion')]}_lazy_completion"
+    load_command = (
+        f'. "{script_path}" 2>/dev/null || eval "$('
+        f"{get_click_env_var(program_name)}={shell.value}_source "
+        f'{program_name} 2>/dev/null)"'
+    )
+
+    if shell == ShellType.BASH:
+        # Returning 124 after the completion specification of the program has
+        # changed makes bash restart the completion with the real function.
+        return (
+            f"{stub_name}() {{ complete -r {program_name}; {load_command}; "
+            f"return 124; }} && complete -F {stub_name} {program_name}"
+        )
+
+    elif shell == ShellType.ZSH:
+        return (
+            f'{stub_name}() {{ {load_command}; {function_name} "$@"; }} && '
+            f"compdef {stub_name} {program_name}"
+        )
+
+    raise NotImplementedError
+
+
+def get_cached_script_path(program_name: str, shell: ShellType) -> str:
+    """
+    Return the path of the cached completion script of the given program,
+    `~/.cache/auto-click-auto/{program_name}.{shell}` by default.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param shell: The shell type of the script.
+    """
+
+    return os.path.join(
+        get_cache_directory(), f"{program_name}.{shell.value}"
+    )
+
+
+def read_script_fingerprint(script_path: str) -> Optional[str]:
+    """
+    Read the fingerprint from the first line of a generated completion script,
+    or from the second line of zsh scripts, which start with their `#compdef`
+    line.
+
+    :param script_path: The path of the completion script.
+    :return: The fingerprint, or `None` if the script does not exist or does
+    not carry a fingerprint.
+    """
+
+    try:
+        with open(script_path) as file:
+            first_line = file.readline()
+
+            if first_line.startswith("#compdef "):
+                first_line = file.readline()
+
+    except FileNotFoundError:
+        return None
+
+    if not first_line.startswith(FINGERPRINT_PREFIX):
+        return None
+
+    return first_line[len(FINGERPRINT_PREFIX):].strip()
+
+
+def _format_script(
+    program_name: str, shell: ShellType, fingerprint: str, script: str
+) -> str:
+    """Return the content of a completion script file, headed by the
+    fingerprint of the program."""
+
+    content = f"{FINGERPRINT_PREFIX}{fingerprint}\n{script}\n"
+
+    if shell == ShellType.ZSH:
+        # compinit only autoloads functions whose first line is their
+        # `#compdef` line.
+        content = f"#compdef {program_name}\n{content}"
+
+    return content
+
+
+def render_cached_completion_script(
+    program_name: str, shell: ShellType
+) -> str:
+    """
+    Return the content :func:`write_cached_completion_script` writes for the
+    given program and shell, so that it can be rendered once and written in
+    many places.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param shell: The shell type of the script.
+    :raise CompletionScriptGenerationError: When Click cannot generate the
+    script for the given shell.
+    """
+
+    return _format_script(
+        program_name,
+        shell,
+        get_program_fingerprint(program_name),
+        generate_completion_script(program_name, shell),
+    )
+
+
+def write_rendered_script(script_path: str, content: str) -> bool:
+    """
+    Write a completion script rendered with
+    :func:`render_cached_completion_script`, unless the file already has this
+    content.
+
+    :param script_path: The path of the script.
+    :param content: The content of the script.
+    :return: `True` if the script was written, `False` if it was up to date.
+    """
+
+    with phase("generate_script", script_path) as script_phase:
+        try:
+            with open(script_path) as file:
+                if file.read() == content:
+                    script_phase.record(outcome="up to date")
+                    return False
+        except FileNotFoundError:
+            pass
+
+        write_file_atomically(script_path, content)
+        script_phase.record(size=len(content.encode()), outcome="written")
+
+        return True
+
+
+def write_cached_completion_script(
+    program_name: str,
+    shell: ShellType,
+    verbose: Optional[bool] = False,
+    wrapper: Optional[str] = None,
+    script_path: Optional[str] = None,
+    command: Optional[Command] = None,
+    prebuilt_directory: Optional[str] = None,
+    check_program: bool = False,
+) -> str:
+    """
+    Write the completion script of the given program in the cache directory.
+    The script carries the fingerprint of the program, so it is only
+    regenerated when the program changes.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param shell: The shell type of the script.
+    :param verbose: `True` to print whether the cached script is up to date,
+    `False` otherwise.
+    :param wrapper: A shell command the script runs, with the program's command
+    as its arguments, instead of the program itself. See
+    :func:`wrap_completion_invocation`.
+    :param script_path: The path to write the script to. Defaults to the path
+    of the cached completion script of the program.
+    :param command: The root command of the program. If provided, the script
+    is compiled from the command tree, see
+    :func:`auto_click_auto.static.compile_static_completion`, instead of being
+    generated by Click.
+    :param prebuilt_directory: A directory of completion scripts compiled
+    when the program was built, see
+    :func:`auto_click_auto.prebuilt.build_completion_artifacts`. If it has
+    the script of the given shell, the script is copied from it.
+    :param check_program: `True` to make a fish script generated by Click
+    check that the program has not changed whenever fish loads it, see
+    :func:`guard_fish_completion_script`.
+    :return: The path of the completion script.
+    :raise CompletionScriptGenerationError: When Click cannot generate the
+    script for the given shell.
+    """
+
+    script_path = script_path or get_cached_script_path(program_name, shell)
+
+    prebuilt_script_path = None
+    if prebuilt_directory is not None:
+        from .prebuilt import get_prebuilt_script_path
+
+        prebuilt_script_path = get_prebuilt_script_path(
+            prebuilt_directory, program_name, shell
+        )
+        if not os.path.exists(prebuilt_script_path):
+            prebuilt_script_path = None
+
+    with phase("generate_script", script_path) as script_phase:
+        fingerprint = get_program_fingerprint(program_name)
+
+        # Scripts generated differently for the same program must not match.
+        variant = "\0".join(
+            (wrapper or "", "static" if command is not None else "")
+        )
+        if prebuilt_script_path is not None:
+            variant += "\0prebuilt"
+        if check_program:
+            variant += "\0checked"
+        if variant != "\0":
+            fingerprint += (
+                "-" + hashlib.sha256(variant.encode()).hexdigest()[:8]
+            )
+
+        if read_script_fingerprint(script_path) == fingerprint:
+            if verbose is True:
+                print(f"Completion script {script_path} is up to date.")
+
+            script_phase.record(outcome="up to date")
+            return script_path
+
+        if prebuilt_script_path is not None:
+            with open(prebuilt_script_path) as file:
+                script = file.read()
+
+            if wrapper is not None:
+                try:
+                    script = wrap_completion_invocation(
+                        script, program_name, shell, wrapper
+                    )
+
+                # Scripts without custom completion functions do not run the
+                # program.
+                except CompletionScriptGenerationError:
+                    pass
+
+        elif command is not None:
+            # The static compiler uses the functions of this module.
+            from .static import compile_static_completion
+
+            script = compile_static_completion(
+                command, program_name, shell, wrapper
+            )
+
+        else:
+            script = generate_completion_script(program_name, shell)
+
+            if wrapper is not None:
+                script = wrap_completion_invocation(
+                    script, program_name, shell, wrapper
+                )
+
+            elif check_program and shell == ShellType.FISH:
+                script = guard_fish_completion_script(script, program_name)
+
+        print(f"Generating completion script in {script_path} ...")
+        content = _format_script(program_name, shell, fingerprint, script)
+        write_file_atomically(script_path, content)
+        script_phase.record(size=len(content.encode()), outcome="generated")
+
+        return script_path
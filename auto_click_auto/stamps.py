@@ -0,0 +1,96 @@
+import hashlib
+import os
+from typing import List, Optional
+
+from .utils import create_file, get_cache_directory
+
+
+def get_stamp_directory() -> str:
+    """
+    Return the directory of the stamps, stored in
+    `~/.cache/auto-click-auto/stamps` by default.
+    """
+
+    return os.path.join(get_cache_directory(), "stamps")
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def get_stamp_path(key: str, file_paths: List[str]) -> Optional[str]:
+    """
+    Return the path of the stamp of the given key and of the current state of
+    the given files. The name of the stamp encodes both, so that checking a
+    stamp only takes an `os.stat` per file and a lookup of the stamp.
+
+    :param key: What was verified, e.g., the program name and the install
+    strategy.
+    :param file_paths: The files the verification depends on. Their state is
+    their inode, size and modification time.
+    :return: The path of the stamp, or `None` if any of the files is missing.
+    """
+
+    states = []
+    for file_path in file_paths:
+        try:
+            stat_result = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+
+        states.append(
+            f"{file_path}\0{stat_result.st_ino}\0{stat_result.st_size}\0"
+            f"{stat_result.st_mtime_ns}"
+        )
+
+    return os.path.join(
+        get_stamp_directory(), f"{_hash(key)}-{_hash(chr(0).join(states))}"
+    )
+
+
+def check_stamp(key: str, file_paths: List[str]) -> bool:
+    """
+    Check whether the given key was verified with the files in their current
+    state.
+
+    :param key: What was verified.
+    :param file_paths: The files the verification depends on.
+    """
+
+    stamp_path = get_stamp_path(key, file_paths)
+
+    return stamp_path is not None and os.path.exists(stamp_path)
+
+
+def write_stamp(key: str, file_paths: List[str]) -> None:
+    """
+    Record that the given key was verified with the files in their current
+    state, replacing the older stamps of the key. Nothing is recorded if any
+    of the files is missing.
+
+    :param key: What was verified.
+    :param file_paths: The files the verification depends on.
+    """
+
+    stamp_path = get_stamp_path(key, file_paths)
+
+    if stamp_path is None:
+        return None
+
+    key_prefix = f"{_hash(key)}-"
+    stamp_name = os.path.basename(stamp_path)
+    try:
+        with os.scandir(get_stamp_directory()) as entries:
+            for entry in entries:
+                if (
+                    entry.name.startswith(key_prefix)
+                    and entry.name != stamp_name
+                ):
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+    except FileNotFoundError:
+        pass
+
+    create_file(stamp_path)
@@ -0,0 +1,567 @@
+import shlex
+from typing import Dict, List, Optional, Tuple
+
+from click import Command
+
+from .constants import ShellType
+from .scripts import (
+    _fish_quote,
+    generate_completion_script,
+    get_completion_function_name,
+    wrap_completion_invocation,
+)
+from .tree import CommandSpec, CompletionType, ParameterSpec, walk_command_tree
+from .utils import get_click_env_var
+
+
+def compile_static_completion(
+    command: Command,
+    program_name: str,
+    shell: ShellType,
+    wrapper: Optional[str] = None,
+) -> str:
+    """
+    Compile the command tree of the program into a native completion script
+    of the given shell, which completes subcommand names, option names,
+    `Choice` values and paths without running the program. Only parameters
+    with custom `shell_complete` functions run the program, through Click's
+    completion protocol, to get their completions.
+
+    :param command: The root command of the program.
+    :param program_name: The program name, also described as the executable
+    name.
+    :param shell: The shell type of the script.
+    :param wrapper: A shell command the script runs, with the program's command
+    as its arguments, instead of the program itself. See
+    :func:`auto_click_auto.scripts.wrap_completion_invocation`.
+    :raise NotImplementedError: When ``shell`` is not supported.
+    """
+
+    specs = list(walk_command_tree(command, program_name))
+    compilers = {
+        ShellType.BASH: _compile_bash,
+        ShellType.ZSH: _compile_zsh,
+        ShellType.FISH: _compile_fish,
+    }
+
+    if shell not in compilers:
+        raise NotImplementedError
+
+    return compilers[shell](specs, program_name, wrapper)
+
+
+def _has_dynamic_completion(specs: List[CommandSpec]) -> bool:
+    return any(
+        param.completion_type == CompletionType.DYNAMIC
+        for spec in specs
+        for param in spec.options + spec.arguments
+    )
+
+
+def _get_function_prefix(program_name: str) -> str:
+    """Return the prefix of the shell functions, e.g., `_foo_bar`."""
+
+    return get_completion_function_name(program_name)[: -len("_completion")]
+
+
+def _get_argument_positions(
+    arguments: List[ParameterSpec],
+) -> List[Tuple[Optional[int], ParameterSpec]]:
+    """
+    Return the position of the first value of each argument, counting the
+    values of the previous arguments, and `None` for the argument that takes
+    an unlimited number of values.
+    """
+
+    positions: List[Tuple[Optional[int], ParameterSpec]] = []
+    position = 0
+
+    for argument in arguments:
+        if argument.nargs < 0:
+            positions.append((None, argument))
+            break
+
+        for _ in range(argument.nargs):
+            positions.append((position, argument))
+            position += 1
+
+    return positions
+
+
+def _get_path_transitions(
+    specs: List[CommandSpec],
+) -> List[Tuple[str, str, Optional[str], int]]:
+    """
+    Return how walking over a word of the command line changes the state of
+    the completion: for each command path and word, the new command path, if
+    the word is a subcommand, and the number of values to skip, if the word
+    is an option that takes values.
+    """
+
+    transitions: List[Tuple[str, str, Optional[str], int]] = []
+
+    for spec in specs:
+        path = " ".join(spec.path)
+
+        for name, _ in spec.subcommands:
+            transitions.append((path, name, " ".join(spec.path + (name,)), 0))
+
+        for option in spec.options:
+            if option.takes_value:
+                for opt in option.opts:
+                    transitions.append((path, opt, None, option.nargs))
+
+    return transitions
+
+
+def _bash_action(param: ParameterSpec, function_name: str) -> str:
+    if param.completion_type == CompletionType.CHOICE:
+        return (
+            f"COMPREPLY=($(compgen -W {shlex.quote(' '.join(param.choices))} "
+            '-- "$cur"))'
+        )
+
+    elif param.completion_type == CompletionType.FILE:
+        return "COMPREPLY=(); compopt -o default"
+
+    elif param.completion_type == CompletionType.DIR:
+        return "COMPREPLY=(); compopt -o dirnames"
+
+    elif param.completion_type == CompletionType.DYNAMIC:
+        return f'{function_name} "$@"'
+
+    return "COMPREPLY=()"
+
+
+def _compile_bash(
+    specs: List[CommandSpec], program_name: str, wrapper: Optional[str]
+) -> str:
+    function_name = get_completion_function_name(program_name)
+    static_function_name = f"{_get_function_prefix(program_name)}_static"
+    lines: List[str] = []
+
+    if _has_dynamic_completion(specs):
+        # Click's completion function completes the dynamic parameters.
+        script = generate_completion_script(program_name, ShellType.BASH)
+        if wrapper is not None:
+            script = wrap_completion_invocation(
+                script, program_name, ShellType.BASH, wrapper
+            )
+        lines += [script, ""]
+
+    lines += [
+        f"{static_function_name}_completion() {{",
+        '    local cur="${COMP_WORDS[COMP_CWORD]}" prev path="" word',
+        "    local args=0 skip=0 i",
+        "",
+        "    for ((i = 1; i < COMP_CWORD; i++)); do",
+        '        word="${COMP_WORDS[i]}"',
+        "",
+        '        if [[ $word == "=" ]]; then',
+        "            skip=1",
+        "            continue",
+        "        elif ((skip > 0)); then",
+        "            skip=$((skip - 1))",
+        "            continue",
+        "        fi",
+        "",
+        '        case "$path|$word" in',
+    ]
+
+    for path, word, new_path, skip in _get_path_transitions(specs):
+        if new_path is not None:
+            action = f"path={shlex.quote(new_path)}; args=0"
+        else:
+            action = f"skip={skip}"
+        pattern = shlex.quote(f"{path}|{word}")
+        lines.append(f"            {pattern}) {action} ;;")
+
+    lines += [
+        '            *"|-"*) ;;',
+        "            *) args=$((args + 1)) ;;",
+        "        esac",
+        "    done",
+        "",
+        '    prev="${COMP_WORDS[COMP_CWORD-1]}"',
+        '    if [[ $cur == "=" ]]; then',
+        '        cur=""',
+        '    elif [[ $prev == "=" ]]; then',
+        '        prev="${COMP_WORDS[COMP_CWORD-2]}"',
+        "    fi",
+        "",
+        '    case "$path|$prev" in',
+    ]
+
+    for spec in specs:
+        path = " ".join(spec.path)
+        for option in spec.options:
+            if option.takes_value:
+                for opt in option.opts:
+                    lines.append(
+                        f"        {shlex.quote(f'{path}|{opt}')}) "
+                        f"{_bash_action(option, function_name)}; return 0 ;;"
+                    )
+
+    lines += [
+        "    esac",
+        "",
+        "    if [[ $cur == -* ]]; then",
+        '        case "$path" in',
+    ]
+
+    for spec in specs:
+        opts = " ".join(opt for option in spec.options for opt in option.opts)
+        lines.append(
+            f"            {shlex.quote(' '.join(spec.path))}) "
+            f'COMPREPLY=($(compgen -W {shlex.quote(opts)} -- "$cur")) ;;'
+        )
+
+    lines += [
+        "        esac",
+        "        return 0",
+        "    fi",
+        "",
+        '    case "$path|$args" in',
+    ]
+
+    for spec in specs:
+        path = " ".join(spec.path)
+
+        if spec.subcommands:
+            names = " ".join(name for name, _ in spec.subcommands)
+            lines.append(
+                f"        {shlex.quote(path + '|')}*) "
+                f"COMPREPLY=($(compgen -W {shlex.quote(names)} "
+                '-- "$cur")) ;;'
+            )
+            continue
+
+        for position, argument in _get_argument_positions(spec.arguments):
+            pattern = shlex.quote(
+                f"{path}|{'' if position is None else position}"
+            )
+            if position is None:
+                pattern += "*"
+            action = _bash_action(argument, function_name)
+            lines.append(f"        {pattern}) {action} ;;")
+
+    lines += [
+        "    esac",
+        "",
+        "    return 0",
+        "}",
+        "",
+        f"complete -o nosort -F {static_function_name}_completion "
+        f"{program_name}",
+    ]
+
+    return "\n".join(lines)
+
+
+def _zsh_quote(text: str) -> str:
+    return "'" + text.replace("'", "'\\''") + "'"
+
+
+def _zsh_escape_spec(text: str) -> str:
+    for character in ("\\", "[", "]", ":"):
+        text = text.replace(character, "\\" + character)
+    return text
+
+
+def _zsh_action(param: ParameterSpec, dynamic_function_name: str) -> str:
+    if param.completion_type == CompletionType.CHOICE:
+        choices = " ".join(
+            _zsh_escape_spec(choice).replace(" ", "\\ ")
+            for choice in param.choices
+        )
+        return f"({choices})"
+
+    elif param.completion_type == CompletionType.FILE:
+        return "_files"
+
+    elif param.completion_type == CompletionType.DIR:
+        return "_files -/"
+
+    elif param.completion_type == CompletionType.DYNAMIC:
+        return dynamic_function_name
+
+    return " "
+
+
+def _compile_zsh(
+    specs: List[CommandSpec], program_name: str, wrapper: Optional[str]
+) -> str:
+    prefix = f"{_get_function_prefix(program_name)}_static"
+    dynamic_function_name = f"{prefix}_dynamic"
+    function_names: Dict[Tuple[str, ...], str] = {
+        spec.path: f"{prefix}_{index}" for index, spec in enumerate(specs)
+    }
+    invocation = (
+        program_name if wrapper is None else f"{wrapper} {program_name}"
+    )
+
+    lines = [
+        f"#compdef {program_name}",
+        "",
+        f"{prefix}() {{",
+        "    # The words of the whole command line, for the dynamic",
+        "    # completions, before `_arguments` changes them.",
+        f"    local -a {prefix}_words",
+        f"    local {prefix}_current=$CURRENT",
+        f'    {prefix}_words=("${{words[@]}}")',
+        f'    {function_names[()]} "$@"',
+        "}",
+        "",
+    ]
+
+    if _has_dynamic_completion(specs):
+        lines += [
+            f"{dynamic_function_name}() {{",
+            "    local -a completions",
+            "    local -a completions_with_descriptions",
+            "    local -a response",
+            "",
+            '    response=("${(@f)$(env '
+            f'COMP_WORDS="${{{prefix}_words[*]}}" '
+            f"COMP_CWORD=$(({prefix}_current-1)) "
+            f"{get_click_env_var(program_name)}=zsh_complete "
+            f'{invocation})}}")',
+            "",
+            "    for type key descr in ${response}; do",
+            '        if [[ "$type" == "plain" ]]; then',
+            '            if [[ "$descr" == "_" ]]; then',
+            '                completions+=("$key")',
+            "            else",
+            '                completions_with_descriptions+=("$key":"$descr")',
+            "            fi",
+            '        elif [[ "$type" == "dir" ]]; then',
+            "            _path_files -/",
+            '        elif [[ "$type" == "file" ]]; then',
+            "            _path_files -f",
+            "        fi",
+            "    done",
+            "",
+            '    if [ -n "$completions_with_descriptions" ]; then',
+            "        _describe -V unsorted completions_with_descriptions -U",
+            "    fi",
+            "",
+            '    if [ -n "$completions" ]; then',
+            "        compadd -U -V unsorted -a completions",
+            "    fi",
+            "}",
+            "",
+        ]
+
+    for spec in specs:
+        arguments_specs = []
+
+        for option in spec.options:
+            # Options that can be repeated are not excluded once used.
+            if option.multiple:
+                exclusion = "*"
+            else:
+                exclusion = f"({' '.join(option.opts)})"
+
+            description = ""
+            if option.help:
+                description = f"[{_zsh_escape_spec(option.help)}]"
+
+            for opt in option.opts:
+                option_spec = f"{exclusion}{opt}{description}"
+                if option.takes_value:
+                    option_spec += (
+                        f":{_zsh_escape_spec(option.name)}:"
+                        f"{_zsh_action(option, dynamic_function_name)}"
+                    )
+                arguments_specs.append(option_spec)
+
+        if spec.subcommands:
+            arguments_specs += ["1: :->command", "*:: :->argument"]
+        else:
+            for position, argument in _get_argument_positions(spec.arguments):
+                arguments_specs.append(
+                    f"{'*' if position is None else position + 1}:"
+                    f"{_zsh_escape_spec(argument.name)}:"
+                    f"{_zsh_action(argument, dynamic_function_name)}"
+                )
+
+        lines += [
+            f"{function_names[spec.path]}() {{",
+            '    local curcontext="$curcontext" state line',
+            "    typeset -A opt_args",
+            "",
+            "    _arguments -C -s \\",
+        ]
+        lines += [f"        {_zsh_quote(item)} \\" for item in arguments_specs]
+        lines.append("        && return 0")
+
+        if spec.subcommands:
+            lines += [
+                "",
+                "    case $state in",
+                "        command)",
+                "            local -a subcommands",
+                "            subcommands=(",
+            ]
+            lines += [
+                "                "
+                + _zsh_quote(name.replace(":", "\\:") + ":" + help_text)
+                for name, help_text in spec.subcommands
+            ]
+            lines += [
+                "            )",
+                "            _describe -t commands command subcommands",
+                "            ;;",
+                "        argument)",
+                "            case $line[1] in",
+            ]
+            lines += [
+                f"                {_zsh_quote(name)}) "
+                f"{function_names[spec.path + (name,)]} ;;"
+                for name, _ in spec.subcommands
+            ]
+            lines += [
+                "            esac",
+                "            ;;",
+                "    esac",
+            ]
+
+        lines += ["}", ""]
+
+    lines += [
+        "if [[ $zsh_eval_context[-1] == loadautofunc ]]; then",
+        "    # autoload from fpath, call function directly",
+        f'    {prefix} "$@"',
+        "else",
+        "    # eval/source/. command, register function for later",
+        f"    compdef {prefix} {program_name}",
+        "fi",
+    ]
+
+    return "\n".join(lines)
+
+
+def _fish_action(param: ParameterSpec, dynamic_function_name: str) -> str:
+    if param.completion_type == CompletionType.CHOICE:
+        return f"-f -a {_fish_quote(' '.join(param.choices))}"
+
+    elif param.completion_type == CompletionType.FILE:
+        return "-F"
+
+    elif param.completion_type == CompletionType.DIR:
+        return "-f -a '(__fish_complete_directories (commandline -ct))'"
+
+    elif param.completion_type == CompletionType.DYNAMIC:
+        return f"-f -a '({dynamic_function_name})'"
+
+    return "-f"
+
+
+def _fish_option(opt: str) -> str:
+    if opt.startswith("--"):
+        return f"-l {_fish_quote(opt[2:])}"
+
+    elif len(opt) == 2:
+        return f"-s {_fish_quote(opt[1:])}"
+
+    return f"-o {_fish_quote(opt[1:])}"
+
+
+def _compile_fish(
+    specs: List[CommandSpec], program_name: str, wrapper: Optional[str]
+) -> str:
+    prefix = f"_{_get_function_prefix(program_name)}_static"
+    path_function_name = f"{prefix}_path"
+    dynamic_function_name = f"{prefix}_dynamic"
+    invocation = (
+        program_name if wrapper is None else f"{wrapper} {program_name}"
+    )
+
+    lines = [
+        f"function {path_function_name}",
+        "    set -l path ''",
+        "    set -l skip 0",
+        "    set -l tokens (commandline -opc)",
+        "    set -e tokens[1]",
+        "",
+        "    for token in $tokens",
+        "        if test $skip -gt 0",
+        "            set skip (math $skip - 1)",
+        "            continue",
+        "        end",
+        "",
+        '        switch "$path|$token"',
+    ]
+
+    for path, word, new_path, skip in _get_path_transitions(specs):
+        lines.append(f"            case {_fish_quote(f'{path}|{word}')}")
+        if new_path is not None:
+            lines.append(f"                set path {_fish_quote(new_path)}")
+        else:
+            lines.append(f"                set skip {skip}")
+
+    lines += [
+        "        end",
+        "    end",
+        "",
+        '    test "$path" = "$argv[1]"',
+        "end",
+        "",
+    ]
+
+    if _has_dynamic_completion(specs):
+        lines += [
+            f"function {dynamic_function_name}",
+            "    set -l response (env "
+            f"{get_click_env_var(program_name)}=fish_complete "
+            "COMP_WORDS=(commandline -cp) COMP_CWORD=(commandline -t) "
+            f"{invocation})",
+            "",
+            "    for completion in $response",
+            '        set -l metadata (string split "," $completion)',
+            "",
+            '        if test $metadata[1] = "dir"',
+            "            __fish_complete_directories $metadata[2]",
+            '        else if test $metadata[1] = "file"',
+            "            __fish_complete_path $metadata[2]",
+            '        else if test $metadata[1] = "plain"',
+            "            echo $metadata[2]",
+            "        end",
+            "    end",
+            "end",
+            "",
+        ]
+
+    complete = f"complete -c {_fish_quote(program_name)}"
+    lines.append(f"{complete} -f")
+
+    for spec in specs:
+        path = shlex.quote(" ".join(spec.path))
+        condition = f"-n {_fish_quote(f'{path_function_name} {path}')}"
+
+        for name, help_text in spec.subcommands:
+            lines.append(
+                f"{complete} {condition} -f -a {_fish_quote(name)} "
+                f"-d {_fish_quote(help_text)}"
+            )
+
+        for option in spec.options:
+            options = " ".join(_fish_option(opt) for opt in option.opts)
+            value = ""
+            if option.takes_value:
+                value = f" -r {_fish_action(option, dynamic_function_name)}"
+            description = ""
+            if option.help:
+                description = f" -d {_fish_quote(option.help)}"
+            lines.append(
+                f"{complete} {condition} {options}{value}{description}"
+            )
+
+        if not spec.subcommands:
+            for argument in spec.arguments:
+                lines.append(
+                    f"{complete} {condition} "
+                    f"{_fish_action(argument, dynamic_function_name)}"
+                )
+
+    return "\n".join(lines)
@@ -0,0 +1,262 @@
+import math
+import os
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .utils import file_lock, get_cache_directory
+
+# The size in bytes after which the log is rotated. The previous log is kept
+# in `stats.log.1`, so the logs take at most twice this size.
+STATS_LOG_MAX_SIZE = 1024 * 1024
+
+# The percentiles of the latency in the report.
+PERCENTILES = (50, 95, 99)
+
+
+class CompletionRecord(NamedTuple):
+    """A completion request answered by the program."""
+
+    # The Unix time of the request.
+    timestamp: int
+    program_name: str
+    shell: str
+    # The path of the command whose parameters were completed, e.g.,
+    # `my-program deploy`.
+    command_path: str
+    # The number of completion candidates of the response.
+    candidates: int
+    # `hit` or `miss` of the response cache, or `-` without the cache.
+    cache: str
+    # The wall clock time of the request in microseconds.
+    microseconds: int
+
+
+class LatencySummary(NamedTuple):
+    """The latency of the completion requests of a command path."""
+
+    program_name: str
+    command_path: str
+    requests: int
+    # The fraction of the requests answered from the response cache.
+    hit_ratio: float
+    # The latency of each percentile of :data:`PERCENTILES`, in seconds.
+    percentiles: Tuple[float, ...]
+    max_seconds: float
+
+
+def get_stats_log_path() -> str:
+    """
+    Return the path of the log of the completion requests,
+    `~/.cache/auto-click-auto/stats.log` by default.
+    """
+
+    return os.path.join(get_cache_directory(), "stats.log")
+
+
+def record_completion(
+    program_name: str,
+    shell: str,
+    command_path: str,
+    candidates: int,
+    cache: str,
+    seconds: float,
+) -> None:
+    """
+    Append a completion request to the log of the completion requests, with
+    a single `write` to a file opened in append mode, so that concurrent
+    requests do not interleave their records. The log is rotated when it
+    grows over :data:`STATS_LOG_MAX_SIZE`, under a lock, so that concurrent
+    requests do not rotate it twice and lose the rotated records.
+
+    Errors are ignored, since the completion request must be answered
+    anyway.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    :param shell: The shell name of the completion request.
+    :param command_path: The path of the completed command.
+    :param candidates: The number of completion candidates.
+    :param cache: `hit` or `miss` of the response cache, or `-` without the
+    cache.
+    :param seconds: The wall clock time of the request.
+    """
+
+    log_path = get_stats_log_path()
+    command_path = command_path.replace("\t", " ")
+    record = (
+        f"{int(time.time())}\t{program_name}\t{shell}\t"
+        f"{command_path}\t{candidates}\t{cache}\t"
+        f"{round(seconds * 1e6)}\n"
+    ).encode()
+
+    try:
+        try:
+            fd = os.open(
+                log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600
+            )
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            fd = os.open(
+                log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600
+            )
+
+        try:
+            os.write(fd, record)
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+        if size > STATS_LOG_MAX_SIZE:
+            with file_lock(f"{log_path}.lock"):
+                # Another request may have rotated the log since the write.
+                if os.stat(log_path).st_size > STATS_LOG_MAX_SIZE:
+                    os.replace(log_path, f"{log_path}.1")
+
+    except OSError:
+        pass
+
+
+def read_completion_records(
+    log_path: Optional[str] = None,
+) -> Iterator[CompletionRecord]:
+    """
+    Yield the completion requests of the rotated and of the current log,
+    from the oldest to the newest. Malformed records, e.g., the last record
+    of a log written by a killed process, are skipped.
+
+    :param log_path: The path of the log. Defaults to
+    :func:`get_stats_log_path`.
+    """
+
+    log_path = log_path or get_stats_log_path()
+
+    for file_path in (f"{log_path}.1", log_path):
+        try:
+            with open(file_path) as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            continue
+
+        for line in lines:
+            fields = line.rstrip("\n").split("\t")
+
+            try:
+                (
+                    timestamp,
+                    program_name,
+                    shell,
+                    command_path,
+                    candidates,
+                    cache,
+                    microseconds,
+                ) = fields
+
+                yield CompletionRecord(
+                    timestamp=int(timestamp),
+                    program_name=program_name,
+                    shell=shell,
+                    command_path=command_path,
+                    candidates=int(candidates),
+                    cache=cache,
+                    microseconds=int(microseconds),
+                )
+            except ValueError:
+                continue
+
+
+def _get_percentile(sorted_values: List[int], percentile: float) -> int:
+    """Return the nearest-rank percentile of the sorted values."""
+
+    rank = max(math.ceil(percentile / 100 * len(sorted_values)), 1)
+
+    return sorted_values[rank - 1]
+
+
+def summarize_completion_records(
+    records: Iterator[CompletionRecord],
+    program_name: Optional[str] = None,
+) -> List[LatencySummary]:
+    """
+    Summarize the latency of the completion requests per program and command
+    path, sorted by the slowest 95th percentile first.
+
+    :param records: The completion requests.
+    :param program_name: The program to summarize. `None` for every
+    program.
+    """
+
+    latencies: Dict[Tuple[str, str], List[int]] = {}
+    hits: Dict[Tuple[str, str], int] = {}
+
+    for record in records:
+        if program_name is not None and record.program_name != program_name:
+            continue
+
+        key = (record.program_name, record.command_path)
+        latencies.setdefault(key, []).append(record.microseconds)
+        hits[key] = hits.get(key, 0) + (record.cache == "hit")
+
+    summaries = []
+    for (program, command_path), values in latencies.items():
+        values.sort()
+        summaries.append(
+            LatencySummary(
+                program_name=program,
+                command_path=command_path,
+                requests=len(values),
+                hit_ratio=hits[(program, command_path)] / len(values),
+                percentiles=tuple(
+                    _get_percentile(values, percentile) / 1e6
+                    for percentile in PERCENTILES
+                ),
+                max_seconds=values[-1] / 1e6,
+            )
+        )
+
+    summaries.sort(key=lambda summary: summary.percentiles[1], reverse=True)
+
+    return summaries
+
+
+def format_latency_summaries(summaries: List[LatencySummary]) -> str:
+    """
+    Format the latency summaries as a table, with the latencies in
+    milliseconds.
+
+    :param summaries: The summaries, see
+    :func:`summarize_completion_records`.
+    """
+
+    header = [
+        "COMMAND PATH",
+        "REQUESTS",
+        "HIT %",
+        *(f"P{percentile} MS" for percentile in PERCENTILES),
+        "MAX MS",
+    ]
+    rows = [
+        [
+            summary.command_path,
+            str(summary.requests),
+            f"{summary.hit_ratio * 100:.0f}",
+            *(f"{seconds * 1e3:.1f}" for seconds in summary.percentiles),
+            f"{summary.max_seconds * 1e3:.1f}",
+        ]
+        for summary in summaries
+    ]
+
+    widths = [
+        max(len(row[column]) for row in [header, *rows])
+        for column in range(len(header))
+    ]
+
+    return "\n".join(
+        "  ".join(
+            [row[0].ljust(widths[0])]
+            + [
+                value.rjust(width)
+                for value, width in zip(row[1:], widths[1:])
+            ]
+        ).rstrip()
+        for row in [header, *rows]
+    )
@@ -0,0 +1,224 @@
+import sys
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from click import (
+    Argument,
+    Choice,
+    Command,
+    Context,
+    File,
+    Group,
+    Option,
+    Parameter,
+    ParamType,
+    Path,
+)
+
+
+class CompletionType:
+    """The ways the value of a parameter is completed."""
+
+    # The value has no completions.
+    NONE = "none"
+    # The value is one of the choices of the parameter.
+    CHOICE = "choice"
+    # The value is a file or directory path.
+    FILE = "file"
+    # The value is a directory path.
+    DIR = "dir"
+    # The value is completed by a custom `shell_complete` function, which
+    # needs to run in the program.
+    DYNAMIC = "dynamic"
+
+
+class ParameterSpec(NamedTuple):
+    """The description of an option or argument of a command."""
+
+    name: str
+    # The option names, e.g., `["-n", "--name"]`, empty for arguments.
+    opts: List[str]
+    # Whether the option takes a value, `True` for arguments.
+    takes_value: bool
+    nargs: int
+    multiple: bool
+    completion_type: str
+    choices: List[str]
+    help: str
+
+
+class CommandSpec(NamedTuple):
+    """The description of a command in the command tree of a program."""
+
+    # The names of the subcommands leading to the command from the program,
+    # empty for the root command.
+    path: Tuple[str, ...]
+    help: str
+    options: List[ParameterSpec]
+    arguments: List[ParameterSpec]
+    # The names and short help texts of the subcommands of a group.
+    subcommands: List[Tuple[str, str]]
+    # The import path of the command in the `module:attribute` format, if the
+    # command is an attribute of the module of its callback.
+    import_path: Optional[str]
+
+
+def get_completion_type(param: Parameter) -> str:
+    """
+    Return how the value of the given parameter is completed.
+
+    :param param: The Click parameter.
+    :return: One of the :class:`CompletionType` values.
+    """
+
+    if param._custom_shell_complete is not None:
+        return CompletionType.DYNAMIC
+
+    param_type_class = type(param.type)
+
+    for base_class, completion_type in (
+        (Choice, CompletionType.CHOICE),
+        (Path, CompletionType.FILE),
+        (File, CompletionType.FILE),
+        (ParamType, CompletionType.NONE),
+    ):
+        if (
+            issubclass(param_type_class, base_class)
+            and param_type_class.shell_complete is base_class.shell_complete
+        ):
+            if (
+                isinstance(param.type, Path)
+                and param.type.dir_okay
+                and not param.type.file_okay
+            ):
+                return CompletionType.DIR
+
+            return completion_type
+
+    # Parameter types with their own `shell_complete` method.
+    return CompletionType.DYNAMIC
+
+
+def get_command_import_path(command: Command) -> Optional[str]:
+    """
+    Return the import path of the given command in the `module:attribute`
+    format, if the command is an attribute of the module that defines its
+    callback, e.g., a command defined with the ``@click.command()`` decorator.
+
+    :param command: The Click command.
+    :return: The import path, or `None` if the command cannot be imported on
+    its own.
+    """
+
+    module_name = getattr(command.callback, "__module__", None)
+    module = sys.modules.get(module_name or "")
+
+    if module is None:
+        return None
+
+    for name, value in vars(module).items():
+        if value is command:
+            return f"{module_name}:{name}"
+
+    return None
+
+
+def get_parameter_spec(ctx: Context, param: Parameter) -> ParameterSpec:
+    """
+    Describe the given parameter of the command of the context.
+
+    :param ctx: The context of the command the parameter belongs to.
+    :param param: The Click parameter.
+    """
+
+    completion_type = get_completion_type(param)
+    choices: List[str] = []
+    if completion_type == CompletionType.CHOICE:
+        choices = [
+            str(item.value)
+            for item in param.type.shell_complete(ctx, param, "")
+        ]
+
+    if isinstance(param, Option):
+        opts = [*param.opts, *param.secondary_opts]
+        takes_value = not param.is_flag and not param.count
+        multiple = param.multiple or param.count
+        help_text = param.help or ""
+    else:
+        opts = []
+        takes_value = True
+        multiple = param.nargs == -1
+        help_text = ""
+
+    return ParameterSpec(
+        name=param.name or "",
+        opts=opts,
+        takes_value=takes_value,
+        nargs=param.nargs,
+        multiple=multiple,
+        completion_type=completion_type,
+        choices=choices,
+        help=help_text.strip().split("\n")[0],
+    )
+
+
+def walk_command_tree(
+    command: Command,
+    program_name: str,
+    ctx: Optional[Context] = None,
+    path: Tuple[str, ...] = (),
+) -> Iterator[CommandSpec]:
+    """
+    Walk the command tree of the program and describe every visible command,
+    the root command first.
+
+    Subcommands are listed and loaded through the groups, so groups that load
+    their subcommands lazily import all of them.
+
+    :param command: The root command of the program.
+    :param program_name: The program name, also described as the executable
+    name.
+    :param ctx: The context of the parent command. Used while walking the
+    subcommands.
+    :param path: The names of the subcommands leading to the command. Used
+    while walking the subcommands.
+    """
+
+    ctx = Context(
+        command, info_name=path[-1] if path else program_name, parent=ctx
+    )
+
+    options = []
+    arguments = []
+    for param in command.get_params(ctx):
+        if getattr(param, "hidden", False):
+            continue
+
+        if isinstance(param, Argument):
+            arguments.append(get_parameter_spec(ctx, param))
+        else:
+            options.append(get_parameter_spec(ctx, param))
+
+    subcommands = []
+    if isinstance(command, Group):
+        for name in command.list_commands(ctx):
+            subcommand = command.get_command(ctx, name)
+
+            if subcommand is not None and not subcommand.hidden:
+                subcommands.append((name, subcommand))
+
+    yield CommandSpec(
+        path=path,
+        help=command.get_short_help_str(limit=80),
+        options=options,
+        arguments=arguments,
+        subcommands=[
+            (name, subcommand.get_short_help_str(limit=80))
+            for name, subcommand in subcommands
+        ],
+        import_path=get_command_import_path(command),
+    )
+
+    for name, subcommand in subcommands:
+        yield from walk_command_tree(
+            subcommand, program_name, ctx, path + (name,)
+        )
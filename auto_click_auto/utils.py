@@ -1,12 +1,33 @@
+import contextlib
+import hashlib
 import os
-from typing import List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
 
-from auto_click_auto.constants import ShellType
+from auto_click_auto.constants import SHELL_CONFIGURATION_COMMENT, ShellType
 from auto_click_auto.exceptions import (
     ShellConfigurationFileNotFoundError,
     ShellEnvVarNotFoundError,
     ShellTypeNotSupportedError,
 )
+from auto_click_auto.instrumentation import phase
+from auto_click_auto.scanner import map_file, scan_configuration, scan_file
+
+if TYPE_CHECKING:
+    import mmap
 
 
 def create_file(file_path: str) -> None:
@@ -18,22 +39,130 @@ def create_file(file_path: str) -> None:
     :return: `None`
     """
 
-    if not os.path.exists(file_path):
-        directory = os.path.dirname(file_path)
+    with phase("create_file", file_path) as create_phase:
+        create_phase.record(outcome="exists")
 
-        if not os.path.exists(directory):
-            # Recursive directory creation
-            os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(file_path):
+            directory = os.path.dirname(file_path)
 
-        try:
-            # Open for exclusive creation
-            with open(file_path, 'x'):
+            if not os.path.exists(directory):
+                # Recursive directory creation
+                os.makedirs(directory, exist_ok=True)
+
+            try:
+                # Open for exclusive creation
+                with open(file_path, 'x'):
+                    pass
+
+                create_phase.record(outcome="created")
+
+            # To avoid race conditions we handle here as well whether the file
+            # exists.
+            except FileExistsError:
                 pass
 
-        # To avoid race conditions we handle here as well whether the file
-        # exists.
-        except FileExistsError:
-            pass
+
+def write_file_atomically(
+    file_path: str,
+    content: Union[str, bytes],
+    mode: Optional[int] = None,
+    fsync: bool = False,
+) -> None:
+    """
+    Write the given content to the specified file, creating the directories of
+    the file path if they do not exist. The content is first written to a
+    temporary file in the same directory, which then replaces the file, so
+    that readers never see a partially written file.
+
+    :param file_path: The path of the file to write.
+    :param content: The content to write in the file.
+    :param mode: The permission bits of the file. Defaults to read and write
+    permissions for the user only.
+    :param fsync: `True` to flush the content to the disk before replacing the
+    file, so that the file is not left empty by a crash, `False` otherwise.
+    :return: `None`
+    """
+
+    import tempfile
+
+    directory = os.path.dirname(file_path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".auto-click-auto-")
+    try:
+        file_mode = "wb" if isinstance(content, bytes) else "w"
+        with os.fdopen(fd, file_mode) as file:
+            file.write(content)
+
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+
+        if mode is not None:
+            os.chmod(temp_path, mode)
+
+        os.replace(temp_path, file_path)
+
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+@contextlib.contextmanager
+def file_lock(lock_path: str) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on the given lock file, creating it if it
+    does not exist, so that concurrent processes take turns.
+
+    :param lock_path: The path of the lock file.
+    """
+
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+
+    with open(lock_path, "a") as lock_file:
+        if fcntl is not None:
+            with phase("lock", lock_path):
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        try:
+            yield
+
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def run_detached(function: Callable[[], None]) -> None:
+    """
+    Run the given function in a detached background process, which neither
+    keeps the output of the current process open, so that a shell reading it
+    does not wait for the function, nor has to be waited for.
+
+    :param function: The function to run. Its exceptions are ignored.
+    """
+
+    pid = os.fork()
+
+    if pid != 0:
+        # The intermediate process exits right away.
+        os.waitpid(pid, 0)
+        return None
+
+    try:
+        os.setsid()
+
+        if os.fork() == 0:
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for fd in (0, 1, 2):
+                os.dup2(devnull, fd)
+
+            try:
+                function()
+            finally:
+                os._exit(0)
+
+    finally:
+        os._exit(0)
 
 
 def check_strings_in_file(file_path: str, search_strings: List[str]) -> bool:
@@ -47,11 +176,7 @@ def check_strings_in_file(file_path: str, search_strings: List[str]) -> bool:
     """
 
     try:
-        with open(file_path) as file:
-            return any(
-                search_string in line for line in file
-                for search_string in search_strings
-            )
+        return len(scan_file(file_path, blocks=[], strings=search_strings)) > 0
 
     except FileNotFoundError:
         raise ShellConfigurationFileNotFoundError(
@@ -59,6 +184,17 @@ def check_strings_in_file(file_path: str, search_strings: List[str]) -> bool:
         )
 
 
+class ConfigurationEdit(NamedTuple):
+    """The configuration changes of one program in a shell configuration
+    file."""
+
+    # The configuration blocks to remove, see
+    # :func:`auto_click_auto.scanner.compile_scanner`.
+    removals: List[str]
+    # The configuration string to add, if it is not already present.
+    addition: Optional[str]
+
+
 def remove_shell_configuration(
     shell_config_file: str,
     config_string: str,
@@ -79,62 +215,11 @@ def remove_shell_configuration(
     the file, `False` otherwise.
     """
 
-    delimiter = "\n"
-    lines_to_remove = config_string.split(delimiter)
-    number_lines_to_remove = len(lines_to_remove)
-
-    if number_lines_to_remove == 0:
-        return None
-
-    try:
-        with open(shell_config_file) as file:
-            lines = file.readlines()
-    except FileNotFoundError:
-        if verbose is True:
-            print(
-                f"The {shell_config_file} configuration file does not exist."
-            )
-
-        return None
-
-    lines_to_remove_with_delimeter = [
-        line + delimiter for line in lines_to_remove
-    ]
-    # Keep the delimeter for the last splitted part.
-    lines_to_remove_ends_without_delimeter = [
-        line + delimiter
-        if index < (number_lines_to_remove - 1) else line
-        for index, line in enumerate(lines_to_remove)
-    ]
-
-    new_lines = []
-    removed = False
-    i = 0
-
-    while i < len(lines):
-        if (
-            lines[i:i + number_lines_to_remove] ==
-            lines_to_remove_with_delimeter
-            or
-            lines[i:i + number_lines_to_remove] ==
-            lines_to_remove_ends_without_delimeter
-        ):
-            # Skip the lines that match the sequence.
-            i += number_lines_to_remove
-            removed = True
-            print(
-                "Removing old tab autocomplete configuration from " +
-                f"{shell_config_file} ..."
-            )
-        else:
-            new_lines.append(lines[i])
-            i += 1
-
-    # Only rewrite the file if lines were actually removed, to avoid needless
-    # (and potentially failing) writes on files protected against overwriting.
-    if removed:
-        with open(shell_config_file, 'w') as file:
-            file.writelines(new_lines)
+    edit_shell_configuration(
+        shell_config_file=shell_config_file,
+        edits=[ConfigurationEdit(removals=[config_string], addition=None)],
+        verbose=verbose,
+    )
 
 
 def add_shell_configuration(
@@ -153,39 +238,197 @@ def add_shell_configuration(
     file, `False` otherwise.
     """
 
-    try:
-        string_in_file = check_strings_in_file(
-            file_path=shell_config_file, search_strings=[config_string]
-        )
-    except ShellConfigurationFileNotFoundError as err:
-        if verbose is True:
-            print(err)
-
-        return None
-
-    if not string_in_file:
-        print(
-            f"Adding tab autocomplete configuration in {shell_config_file} ..."
-        )
-
-        with open(shell_config_file, "a") as file:
-            file.write(
-                "\n\n# Shell completion configuration for the Click Python " +
-                "package"
-            )
-            # Source the file in the shell config file
-            file.write(f"\n{config_string}")
+    [(_, added)] = edit_shell_configuration(
+        shell_config_file=shell_config_file,
+        edits=[ConfigurationEdit(removals=[], addition=config_string)],
+        verbose=verbose,
+    )
 
+    if added:
         print(
             "Restart or create a new shell session for the changes to take "
             "effect."
         )
 
-    elif string_in_file and verbose is True:
-        print(
-            "Tab autocomplete configuration already setup in "
-            f"{shell_config_file}."
-        )
+
+def get_shell_configuration_lock_path(shell_config_file: str) -> str:
+    """
+    Return the path of the lock file that serializes the edits of the given
+    shell configuration file. The lock cannot be held on the file itself,
+    since every edit replaces the file.
+
+    :param shell_config_file: The resolved path of the shell configuration
+    file.
+    """
+
+    digest = hashlib.sha256(shell_config_file.encode()).hexdigest()[:16]
+
+    return os.path.join(get_cache_directory(), "locks", f"{digest}.lock")
+
+
+def _get_separator_start(
+    data: Union[bytes, "mmap.mmap"], start: int, offset: int
+) -> int:
+    """Return where the blank lines added before a configuration block
+    start, at most two, keeping the line break of the previous line, so that
+    they are removed with the block and switching configurations does not
+    leave blank lines behind."""
+
+    line_start = start
+    while line_start > offset and data[line_start - 1:line_start] == b"\n":
+        line_start -= 1
+
+    if line_start > 0:
+        line_start += 1
+
+    return max(line_start, start - 2)
+
+
+def edit_shell_configuration(
+    shell_config_file: str,
+    edits: List[ConfigurationEdit],
+    verbose: Optional[bool] = False,
+) -> List[Tuple[int, bool]]:
+    """
+    Apply the configuration changes of one or many programs to the specified
+    shell configuration file as a single transform.
+
+    The file is read once and written at most once, through a temporary file
+    that is flushed to the disk and then renamed over the file, keeping its
+    permissions. Concurrent edits of the same file, e.g., by programs enabling
+    their completion in two new terminals, wait for each other on an advisory
+    lock instead of losing updates. Symbolic links, e.g., to a dotfiles
+    repository, are resolved, so that the link is kept and its target is
+    edited.
+
+    :param shell_config_file: The shell configuration file to edit.
+    :param edits: The configuration changes, applied in their order.
+    :param verbose: `True` to print whether the configuration is already in the
+    file, `False` otherwise.
+    :return: For each edit, the number of removed configuration strings and
+    whether the configuration string was added.
+    """
+
+    shell_config_file = os.path.realpath(shell_config_file)
+    removals = [
+        config_string for edit in edits for config_string in edit.removals
+    ]
+    additions = [edit.addition or "" for edit in edits]
+
+    with file_lock(get_shell_configuration_lock_path(shell_config_file)):
+        try:
+            with contextlib.ExitStack() as stack:
+                with phase("read", shell_config_file) as read_phase:
+                    mode = os.stat(shell_config_file).st_mode & 0o7777
+                    data = stack.enter_context(map_file(shell_config_file))
+                    read_phase.record(size=len(data))
+
+                # All the configuration of all the edits is found in one pass.
+                with phase("scan", shell_config_file) as scan_phase:
+                    matches = scan_configuration(data, removals, additions)
+                    scan_phase.record(
+                        size=len(data), outcome=f"{len(matches)} matches"
+                    )
+
+                removed_matches = [
+                    match for match in matches if match.pattern < len(removals)
+                ]
+
+                # Keep the content between the removed blocks.
+                with phase("remove", shell_config_file) as remove_phase:
+                    parts = []
+                    offset = 0
+                    for match in removed_matches:
+                        start = _get_separator_start(
+                            data, match.start, offset
+                        )
+                        parts.append(data[offset:start])
+                        offset = match.end
+                    parts.append(data[offset:])
+                    remove_phase.record(
+                        size=sum(
+                            match.end - match.start
+                            for match in removed_matches
+                        ),
+                        outcome=f"{len(removed_matches)} removed",
+                    )
+
+        except FileNotFoundError:
+            if verbose is True:
+                print(
+                    f"The {shell_config_file} configuration file does not "
+                    "exist."
+                )
+
+            return [(0, False) for _ in edits]
+
+        present_additions = {
+            additions[match.pattern - len(removals)]
+            for match in matches
+            if match.pattern >= len(removals)
+        }
+
+        results = []
+        first_removal = 0
+        for edit in edits:
+            removal_indices = range(
+                first_removal, first_removal + len(edit.removals)
+            )
+            first_removal += len(edit.removals)
+            removed = sum(
+                1
+                for match in removed_matches
+                if match.pattern in removal_indices
+            )
+
+            if removed:
+                print(
+                    "Removing old tab autocomplete configuration from "
+                    f"{shell_config_file} ..."
+                )
+
+            added = False
+            if edit.addition is not None:
+                added = edit.addition not in present_additions
+
+                if added:
+                    print(
+                        "Adding tab autocomplete configuration in "
+                        f"{shell_config_file} ..."
+                    )
+                    with phase("append", shell_config_file) as append_phase:
+                        addition = (
+                            f"\n\n{SHELL_CONFIGURATION_COMMENT}\n"
+                            f"{edit.addition}".encode()
+                        )
+                        parts.append(addition)
+                        present_additions.add(edit.addition)
+                        append_phase.record(size=len(addition))
+
+                elif verbose is True:
+                    print(
+                        "Tab autocomplete configuration already setup in "
+                        f"{shell_config_file}."
+                    )
+
+            results.append((removed, added))
+
+        # Only rewrite the file if it changed, to avoid needless (and
+        # potentially failing) writes on files protected against overwriting.
+        with phase("write", shell_config_file) as write_phase:
+            write_phase.record(outcome="unchanged")
+
+            if removed_matches or any(added for _, added in results):
+                content = b"".join(parts)
+                write_file_atomically(
+                    file_path=shell_config_file,
+                    content=content,
+                    mode=mode,
+                    fsync=True,
+                )
+                write_phase.record(size=len(content), outcome="rewritten")
+
+    return results
 
 
 def detect_shell() -> ShellType:
@@ -217,3 +460,60 @@ def detect_shell() -> ShellType:
             f"{shell_value} is not one of the supported shell types "
             f"({ShellType.get_all_values()})."
         )
+
+
+def get_click_env_var(program_name: str) -> str:
+    """
+    Return the name of the environment variable Click checks for shell
+    completion instructions, e.g., `_FOO_BAR_COMPLETE` for `foo-bar`.
+
+    :param program_name: The program name, also described as the executable
+    name.
+    """
+
+    return f"_{program_name.upper().replace('-', '_')}_COMPLETE"
+
+
+def get_cache_directory() -> str:
+    """
+    Return the directory where `auto-click-auto` stores generated files. It
+    respects the `XDG_CACHE_HOME` environment variable and defaults to
+    `~/.cache/auto-click-auto`.
+    """
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(
+        "~/.cache"
+    )
+
+    return os.path.join(cache_home, "auto-click-auto")
+
+
+def get_data_directory() -> str:
+    """
+    Return the directory where `auto-click-auto` stores persistent data. It
+    respects the `XDG_DATA_HOME` environment variable and defaults to
+    `~/.local/share/auto-click-auto`.
+    """
+
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser(
+        "~/.local/share"
+    )
+
+    return os.path.join(data_home, "auto-click-auto")
+
+
+def get_shell_path(path: str) -> str:
+    """
+    Return the given path as it should be written in a shell configuration
+    file, i.e., relative to `$HOME` when it is in the home directory, so that
+    the configuration keeps working if the home directory is moved.
+
+    :param path: The absolute path to convert.
+    """
+
+    home = os.path.expanduser("~")
+
+    if path.startswith(home + os.sep):
+        return "$HOME" + path[len(home):]
+
+    return path
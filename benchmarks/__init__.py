@@ -0,0 +1 @@
+"""Benchmarks of `auto-click-auto`, run with `python -m benchmarks.<name>`."""
@@ -0,0 +1,46 @@
+"""
+Run all the benchmarks and print their results as JSON, to compare them
+between releases.
+
+Usage: python -m benchmarks [--repeat 10] [--shells bash zsh fish]
+[--output results.json]
+"""
+import argparse
+import json
+import platform
+import sys
+from typing import List
+
+from auto_click_auto.fingerprint import get_distribution_version
+
+from . import editing, scanner, startup, tab
+from .common import SHELL_COMMANDS
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--shells", nargs="+", choices=list(SHELL_COMMANDS))
+    parser.add_argument("--output", help="Write the results to this file.")
+    args = parser.parse_args(argv)
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "click": get_distribution_version("click"),
+        "startup": startup.run(args.repeat, args.shells),
+        "tab": tab.run(args.repeat, args.shells),
+        "editing": editing.run([1, 64, 1024, 8192], args.repeat),
+        "scanner": scanner.run([1, 4, 16], args.repeat),
+    }
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
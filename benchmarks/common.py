@@ -0,0 +1,249 @@
+"""Helpers shared by the benchmarks."""
+import fcntl
+import os
+import pty
+import select
+import shutil
+import signal
+import statistics
+import struct
+import subprocess
+import sys
+import termios
+import time
+from typing import Dict, List, Optional
+
+REPOSITORY_DIRECTORY = os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))
+)
+EXAMPLES_DIRECTORY = os.path.join(REPOSITORY_DIRECTORY, "examples")
+
+# The example programs and the import paths of their root commands.
+PROGRAMS = {
+    "example-1": "example_1:hello",
+    "example-2": "example_2:hello",
+    "example-3": "example_3:cli",
+}
+
+# The interactive shell commands. The shells read their configuration files
+# from the throwaway home directory.
+SHELL_COMMANDS = {
+    "bash": ["bash", "-i"],
+    "zsh": ["zsh", "-i"],
+    "fish": ["fish", "-i"],
+}
+
+# Enable the completion of the example programs in a new interpreter, so that
+# the programs are imported there and not in the benchmark.
+ENABLE_SCRIPT = """
+import sys
+
+from auto_click_auto import enable_click_shell_completion
+from auto_click_auto.completion import load_command
+from auto_click_auto.constants import InstallStrategy, ShellType
+
+strategy = InstallStrategy(sys.argv[1])
+shells = {ShellType(shell) for shell in sys.argv[2].split(",")}
+for program in sys.argv[3:]:
+    program_name, _, command_import_path = program.partition("=")
+    enable_click_shell_completion(
+        program_name,
+        shells,
+        strategy=strategy,
+        command_import_path=command_import_path,
+        command=load_command(command_import_path),
+    )
+"""
+
+
+def get_available_shells(shells: Optional[List[str]] = None) -> List[str]:
+    """Return the given shells, all by default, that are installed."""
+
+    return [
+        shell
+        for shell in (shells or list(SHELL_COMMANDS))
+        if shutil.which(shell) is not None
+    ]
+
+
+def create_home(directory: str) -> Dict[str, str]:
+    """
+    Prepare a throwaway home directory, with empty shell configuration files
+    and the example programs on the `PATH`.
+
+    :param directory: The empty directory to use as home directory.
+    :return: The environment variables of the processes that use it.
+    """
+
+    bin_directory = os.path.join(directory, "bin")
+    os.makedirs(bin_directory)
+    os.makedirs(os.path.join(directory, ".config", "fish", "completions"))
+    os.makedirs(os.path.join(directory, "run"), mode=0o700)
+
+    open(os.path.join(directory, ".bashrc"), "w").close()
+    with open(os.path.join(directory, ".zshrc"), "w") as file:
+        file.write("autoload -Uz compinit && compinit -u\n")
+
+    # The programs run like console script entry points, which Click names
+    # after the executable.
+    for program_name, command_import_path in PROGRAMS.items():
+        module_name, _, attribute = command_import_path.partition(":")
+        program_path = os.path.join(bin_directory, program_name)
+        with open(program_path, "w") as file:
+            file.write(
+                f'#!/bin/sh\nexec "{sys.executable}" -c '
+                f'"import {module_name}; '
+                f"{module_name}.{attribute}(prog_name='{program_name}')\" "
+                '"$@"\n'
+            )
+        os.chmod(program_path, 0o755)
+
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if not key.startswith("XDG_")
+    }
+    env.update(
+        HOME=directory,
+        PATH=f"{bin_directory}{os.pathsep}{os.environ['PATH']}",
+        PYTHONPATH=os.pathsep.join(
+            [REPOSITORY_DIRECTORY, EXAMPLES_DIRECTORY]
+        ),
+        XDG_RUNTIME_DIR=os.path.join(directory, "run"),
+        # The benchmarks start the completion daemon themselves.
+        AUTO_CLICK_AUTO_DAEMON_AUTOSTART="0",
+        TERM="xterm",
+    )
+
+    return env
+
+
+def enable_completion(
+    env: Dict[str, str], strategy: str, shells: List[str]
+) -> None:
+    """Enable the completion of the example programs in the given home."""
+
+    subprocess.run(
+        [sys.executable, "-c", ENABLE_SCRIPT, strategy, ",".join(shells)]
+        + [f"{name}={path}" for name, path in PROGRAMS.items()],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+
+
+def start_daemon(env: Dict[str, str]) -> subprocess.Popen:
+    """Start the completion daemon of the given home."""
+
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "auto_click_auto", "daemon"],
+        env=env,
+    )
+
+    # Wait for the daemon to listen.
+    deadline = time.monotonic() + 10
+    while not any(
+        name.endswith(".sock") for name in os.listdir(env["XDG_RUNTIME_DIR"])
+    ):
+        if time.monotonic() > deadline:
+            daemon.kill()
+            raise TimeoutError("The completion daemon did not start.")
+        time.sleep(0.01)
+
+    return daemon
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """Summarize the durations of the samples of a measurement."""
+
+    return {
+        "samples": len(durations),
+        "min_seconds": min(durations),
+        "median_seconds": statistics.median(durations),
+        "mean_seconds": statistics.mean(durations),
+        "max_seconds": max(durations),
+    }
+
+
+class Terminal:
+    """An interactive process running in a pseudo terminal."""
+
+    def __init__(self, argv: List[str], env: Dict[str, str]) -> None:
+        master, slave = pty.openpty()
+        # A wide terminal, so that the command lines are not wrapped.
+        fcntl.ioctl(
+            slave, termios.TIOCSWINSZ, struct.pack("HHHH", 50, 250, 0, 0)
+        )
+
+        self.master = master
+        self.output = b""
+        self.position = 0
+        self.process = subprocess.Popen(
+            argv,
+            stdin=slave,
+            stdout=slave,
+            stderr=slave,
+            env=env,
+            cwd=env["HOME"],
+            start_new_session=True,
+        )
+        os.close(slave)
+
+    def write(self, data: bytes) -> None:
+        os.write(self.master, data)
+
+    def expect(self, marker: bytes, timeout: float = 10) -> None:
+        """
+        Wait until the terminal shows the given marker after the last marker
+        that was found.
+
+        :raise TimeoutError: When the marker is not shown in time.
+        """
+
+        deadline = time.monotonic() + timeout
+        while True:
+            index = self.output.find(marker, self.position)
+
+            if index != -1:
+                self.position = index + len(marker)
+                return None
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"{marker!r} was not shown in time.")
+
+            readable, _, _ = select.select([self.master], [], [], remaining)
+            if readable:
+                try:
+                    self.output += os.read(self.master, 65536)
+                except OSError:  # The process exited.
+                    raise TimeoutError(f"{marker!r} was not shown.")
+
+    def wait_until_ready(self) -> None:
+        """
+        Wait until the shell running in the terminal runs commands.
+
+        :raise TimeoutError: When the shell does not start in time.
+        """
+
+        # Shells may discard the input typed while they start, so the command
+        # is typed again until it runs. The quotes keep the typed command from
+        # matching the marker.
+        for _ in range(200):
+            self.write(b'echo "__auto_click_auto"_ready__\n')
+            try:
+                self.expect(b"__auto_click_auto_ready__", timeout=0.05)
+                return None
+            except TimeoutError:
+                pass
+
+        raise TimeoutError("The shell did not start in time.")
+
+    def close(self) -> None:
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+        self.process.wait()
+        os.close(self.master)
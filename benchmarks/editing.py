@@ -0,0 +1,115 @@
+"""
+Measure the cost of one call of `add_shell_configuration` and
+`remove_shell_configuration` on shell configuration files of growing sizes.
+
+Usage: python -m benchmarks.editing [--sizes 1 64 1024 8192] [--repeat 20]
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from auto_click_auto.constants import SHELL_CONFIGURATION_COMMENT
+from auto_click_auto.utils import (
+    add_shell_configuration,
+    remove_shell_configuration,
+)
+
+from .common import summarize
+
+CONFIG_STRING = (
+    'command -v example > /dev/null 2>&1 && eval "$(_EXAMPLE_COMPLETE='
+    'bash_source example)"'
+)
+FILLER_LINE = 'export PATH="$HOME/.local/bin:$PATH"\n'
+
+
+def measure_call(
+    file_path: str, content: str, call: str, repeat: int
+) -> List[float]:
+    """Return the seconds of each call on the file with the given content."""
+
+    durations = []
+    for _ in range(repeat):
+        with open(file_path, "w") as file:
+            file.write(content)
+
+        start = time.perf_counter()
+        if call == "add":
+            add_shell_configuration(file_path, CONFIG_STRING)
+        else:
+            remove_shell_configuration(
+                file_path, f"{SHELL_CONFIGURATION_COMMENT}\n{CONFIG_STRING}"
+            )
+        durations.append(time.perf_counter() - start)
+
+    return durations
+
+
+def run(sizes: List[int], repeat: int = 20) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    home = os.environ.get("HOME")
+
+    with tempfile.TemporaryDirectory() as directory, open(
+        os.devnull, "w"
+    ) as devnull, contextlib.redirect_stdout(devnull):
+        # The lock files of the edits are kept in the throwaway home.
+        os.environ["HOME"] = directory
+        file_path = os.path.join(directory, ".bashrc")
+
+        try:
+            for kilobytes in sizes:
+                filler = FILLER_LINE * (kilobytes * 1024 // len(FILLER_LINE))
+                configured = (
+                    f"{filler}\n\n{SHELL_CONFIGURATION_COMMENT}\n"
+                    f"{CONFIG_STRING}\n{filler}"
+                )
+                # The configuration is added to the file without it, and
+                # found in the file with it.
+                for call, content in (
+                    ("add", filler),
+                    ("add", configured),
+                    ("remove", configured),
+                    ("remove", filler),
+                ):
+                    results.append(
+                        {
+                            "call": call,
+                            "configured": content is configured,
+                            "kilobytes": kilobytes,
+                            **summarize(
+                                measure_call(file_path, content, call, repeat)
+                            ),
+                        }
+                    )
+
+        finally:
+            if home is None:
+                del os.environ["HOME"]
+            else:
+                os.environ["HOME"] = home
+
+    return results
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1, 64, 1024, 8192]
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    json.dump(
+        {"benchmark": "editing", "results": run(args.sizes, args.repeat)},
+        sys.stdout,
+    )
+    print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,112 @@
+"""
+Compare the one-pass configuration scanner with the line by line search on
+large shell configuration files.
+
+Usage: python -m benchmarks.scanner [--sizes 1 4 16] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from auto_click_auto.constants import SHELL_CONFIGURATION_COMMENT
+from auto_click_auto.scanner import scan_file
+
+from .common import summarize
+
+# Current and legacy configuration of a few programs, as removed and checked
+# by `enable_click_shell_completion`.
+PROGRAMS = [f"program-{index}" for index in range(10)]
+BLOCKS = [
+    f"{SHELL_CONFIGURATION_COMMENT}\n"
+    f'eval "$(_{program.upper().replace("-", "_")}_COMPLETE=bash_source '
+    f'{program})"'
+    for program in PROGRAMS
+]
+STRINGS = [
+    f'command -v {program} > /dev/null 2>&1 && . "$HOME/.cache/'
+    f'auto-click-auto/{program}.bash"'
+    for program in PROGRAMS
+]
+FILLER_LINE = 'export PATH="$HOME/.local/bin:$PATH"  # managed by config\n'
+
+
+def line_by_line_search(file_path: str) -> None:
+    """The search of `check_strings_in_file` and `remove_shell_configuration`
+    before the scanner."""
+
+    with open(file_path) as file:
+        any(string in line for line in file for string in STRINGS)
+
+    with open(file_path) as file:
+        lines = file.readlines()
+
+    for block in BLOCKS:
+        block_lines = [f"{line}\n" for line in block.split("\n")]
+        for index in range(len(lines)):
+            if lines[index:index + len(block_lines)] == block_lines:
+                break
+
+
+def one_pass_scan(file_path: str) -> None:
+    scan_file(file_path, BLOCKS, STRINGS)
+
+
+def write_configuration_file(file_path: str, megabytes: int) -> None:
+    with open(file_path, "w") as file:
+        file.write(FILLER_LINE * (megabytes * 2**20 // len(FILLER_LINE)))
+        file.write(f"\n{BLOCKS[0]}\n{STRINGS[-1]}\n")
+
+
+def measure(
+    function: Callable[[str], None], file_path: str, repeat: int
+) -> List[float]:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(file_path)
+        durations.append(time.perf_counter() - start)
+
+    return durations
+
+
+def run(sizes: List[int], repeat: int = 5) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, ".bashrc")
+
+        for megabytes in sizes:
+            write_configuration_file(file_path, megabytes)
+            results.append(
+                {
+                    "megabytes": megabytes,
+                    "line_by_line": summarize(
+                        measure(line_by_line_search, file_path, repeat)
+                    ),
+                    "one_pass": summarize(
+                        measure(one_pass_scan, file_path, repeat)
+                    ),
+                }
+            )
+
+    return results
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    json.dump(
+        {"benchmark": "scanner", "results": run(args.sizes, args.repeat)},
+        sys.stdout,
+    )
+    print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
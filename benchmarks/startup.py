@@ -0,0 +1,88 @@
+"""
+Measure the startup time of interactive shells, without completion and with
+the completion of the example programs enabled with each install strategy.
+
+Usage: python -m benchmarks.startup [--repeat 10] [--shells bash zsh fish]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from auto_click_auto.constants import InstallStrategy
+
+from .common import (
+    SHELL_COMMANDS,
+    Terminal,
+    create_home,
+    enable_completion,
+    get_available_shells,
+    summarize,
+)
+
+
+def measure_startup(shell: str, env: Dict[str, str]) -> float:
+    """Return the seconds until the interactive shell runs a command."""
+
+    start = time.perf_counter()
+    terminal = Terminal(SHELL_COMMANDS[shell], env)
+    try:
+        terminal.wait_until_ready()
+        return time.perf_counter() - start
+
+    finally:
+        terminal.close()
+
+
+def run(
+    repeat: int = 10, shells: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    available_shells = get_available_shells(shells)
+
+    for shell in shells or list(SHELL_COMMANDS):
+        if shell not in available_shells:
+            results.append({"shell": shell, "skipped": "not installed"})
+
+    for strategy in [None] + InstallStrategy.get_all_values():
+        for shell in available_shells:
+            with tempfile.TemporaryDirectory() as directory:
+                env = create_home(directory)
+
+                if strategy is not None:
+                    enable_completion(env, strategy, [shell])
+
+                # The first start warms up the file system caches.
+                measure_startup(shell, env)
+                durations = [
+                    measure_startup(shell, env) for _ in range(repeat)
+                ]
+
+            results.append(
+                {
+                    "shell": shell,
+                    "strategy": strategy or "none",
+                    **summarize(durations),
+                }
+            )
+
+    return results
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--shells", nargs="+", choices=list(SHELL_COMMANDS))
+    args = parser.parse_args(argv)
+
+    json.dump(
+        {"benchmark": "startup", "results": run(args.repeat, args.shells)},
+        sys.stdout,
+    )
+    print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
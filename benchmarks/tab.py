@@ -0,0 +1,116 @@
+"""
+Measure the end-to-end latency of a Tab press in interactive shells, from the
+key press to the completion on the command line, for the example programs
+with each install strategy.
+
+Usage: python -m benchmarks.tab [--repeat 10] [--shells bash zsh fish]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from auto_click_auto.constants import InstallStrategy
+
+from .common import (
+    SHELL_COMMANDS,
+    Terminal,
+    create_home,
+    enable_completion,
+    get_available_shells,
+    start_daemon,
+    summarize,
+)
+
+# The command line typed before the Tab press, and the completed part shown
+# after it.
+COMMAND_LINE = b"example-3 config sh"
+COMPLETION_MARKER = b"ell-completion"
+# Ctrl-U clears the command line in every supported shell.
+CLEAR_LINE = b"\x15"
+
+
+def measure_tab_latency(
+    shell: str, env: Dict[str, str], repeat: int
+) -> List[float]:
+    """Return the seconds until each Tab press completes the command line."""
+
+    terminal = Terminal(SHELL_COMMANDS[shell], env)
+    try:
+        terminal.wait_until_ready()
+
+        durations = []
+        for _ in range(repeat):
+            terminal.write(COMMAND_LINE)
+            terminal.expect(COMMAND_LINE)
+
+            start = time.perf_counter()
+            terminal.write(b"\t")
+            terminal.expect(COMPLETION_MARKER)
+            durations.append(time.perf_counter() - start)
+
+            terminal.write(CLEAR_LINE)
+
+        return durations
+
+    finally:
+        terminal.close()
+
+
+def run(
+    repeat: int = 10, shells: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    available_shells = get_available_shells(shells)
+
+    for shell in shells or list(SHELL_COMMANDS):
+        if shell not in available_shells:
+            results.append({"shell": shell, "skipped": "not installed"})
+
+    for strategy in InstallStrategy.get_all_values():
+        for shell in available_shells:
+            with tempfile.TemporaryDirectory() as directory:
+                env = create_home(directory)
+                enable_completion(env, strategy, [shell])
+
+                daemon = None
+                if strategy == InstallStrategy.DAEMON:
+                    daemon = start_daemon(env)
+
+                try:
+                    durations = measure_tab_latency(shell, env, repeat)
+                finally:
+                    if daemon is not None:
+                        daemon.terminate()
+                        daemon.wait()
+
+            results.append(
+                {
+                    "shell": shell,
+                    "strategy": strategy,
+                    # The first Tab press may load the completion.
+                    "first_seconds": durations[0],
+                    **summarize(durations),
+                }
+            )
+
+    return results
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--shells", nargs="+", choices=list(SHELL_COMMANDS))
+    args = parser.parse_args(argv)
+
+    json.dump(
+        {"benchmark": "tab", "results": run(args.repeat, args.shells)},
+        sys.stdout,
+    )
+    print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """Use a temporary home directory for the shell configuration files."""
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    (tmp_path / ".bashrc").touch()
+    (tmp_path / ".zshrc").touch()
+    return tmp_path
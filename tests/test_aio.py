@@ -0,0 +1,103 @@
+import asyncio
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from auto_click_auto import enable_click_shell_completion
+from auto_click_auto.aio import (
+    enable_click_shell_completion_async,
+    enable_click_shell_completion_option_async,
+)
+from auto_click_auto.constants import InstallStrategy, ShellType
+
+SHELLS = {ShellType.BASH, ShellType.ZSH, ShellType.FISH}
+
+
+def read_configuration(home):
+    return {
+        name: (home / name).read_text()
+        for name in (".bashrc", ".zshrc", ".config/fish/completions/foo.fish")
+    }
+
+
+class TestAsyncEnable:
+    def test_matches_sync_enabling(self, home, tmp_path_factory, monkeypatch):
+        asyncio.run(
+            enable_click_shell_completion_async(
+                "foo", SHELLS, strategy=InstallStrategy.CACHED
+            )
+        )
+        async_configuration = read_configuration(home)
+
+        sync_home = tmp_path_factory.mktemp("sync")
+        monkeypatch.setenv("HOME", str(sync_home))
+        (sync_home / ".bashrc").touch()
+        (sync_home / ".zshrc").touch()
+        enable_click_shell_completion(
+            "foo", SHELLS, strategy=InstallStrategy.CACHED
+        )
+
+        assert async_configuration == read_configuration(sync_home)
+
+    def test_does_not_block_event_loop(self, home):
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(True)
+                await asyncio.sleep(0)
+
+        async def main():
+            ticker = asyncio.ensure_future(tick())
+            await enable_click_shell_completion_async("foo", SHELLS)
+            ticker.cancel()
+
+        asyncio.run(main())
+
+        assert len(ticks) > 1
+
+    def test_option_without_running_loop(self, home):
+        @click.command()
+        @enable_click_shell_completion_option_async(
+            program_name="foo", shells={ShellType.BASH}
+        )
+        def cli():
+            pass
+
+        result = CliRunner().invoke(cli, ["--autocomplete"])
+
+        assert result.exit_code == 0
+        assert "_FOO_COMPLETE=bash_source" in (home / ".bashrc").read_text()
+
+    def test_click_option_in_running_loop(self, home):
+        @click.command()
+        @enable_click_shell_completion_option_async(
+            program_name="foo", shells={ShellType.BASH}
+        )
+        def cli():
+            pass
+
+        async def main():
+            return CliRunner().invoke(cli, ["--autocomplete"])
+
+        result = asyncio.run(main())
+
+        assert result.exit_code == 0
+        assert type(cli.params[0]) is click.Option
+        assert "_FOO_COMPLETE=bash_source" in (home / ".bashrc").read_text()
+
+    def test_asyncclick_option(self, home):
+        asyncclick = pytest.importorskip("asyncclick")
+
+        @asyncclick.command()
+        @enable_click_shell_completion_option_async(
+            program_name="foo", shells={ShellType.BASH}
+        )
+        async def cli():
+            pass
+
+        asyncio.run(cli.main(["--autocomplete"], standalone_mode=False))
+
+        assert type(cli.params[0]) is asyncclick.Option
+        assert "_FOO_COMPLETE=bash_source" in (home / ".bashrc").read_text()
@@ -0,0 +1,202 @@
+import os
+import pty
+import select
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+from auto_click_auto import enable_click_shell_completion
+from auto_click_auto.constants import InstallStrategy, ShellType
+from auto_click_auto.daemon import get_daemon_client_command
+from auto_click_auto.scripts import get_budget_command
+
+# A program whose custom completion takes longer than the budget, and leaves a
+# marker when it finishes.
+SLOW_PROGRAM = """#!{python}
+import os
+import time
+
+import click
+
+
+def complete_name(ctx, param, incomplete):
+    time.sleep({delay})
+    open(os.environ["SLOW_MARKER"], "w").close()
+    return ["late"]
+
+
+@click.command()
+@click.argument("name", shell_complete=complete_name)
+def main(name):
+    pass
+
+
+main()
+"""
+
+
+@pytest.fixture
+def slow_program(home, tmp_path, monkeypatch):
+    bin_directory = tmp_path / "bin"
+    bin_directory.mkdir()
+
+    def write(delay):
+        program_path = bin_directory / "slow"
+        program_path.write_text(
+            SLOW_PROGRAM.format(python=sys.executable, delay=delay)
+        )
+        program_path.chmod(0o755)
+        return program_path
+
+    marker_path = tmp_path / "finished"
+    monkeypatch.setenv("PATH", f"{bin_directory}:{os.environ['PATH']}")
+    monkeypatch.setenv("SLOW_MARKER", str(marker_path))
+    write.marker_path = marker_path
+
+    return write
+
+
+def complete(command, shell="bash"):
+    env = dict(
+        os.environ,
+        _SLOW_COMPLETE=f"{shell}_complete",
+        COMP_WORDS="slow la",
+        COMP_CWORD="la" if shell == "fish" else "1",
+        AUTO_CLICK_AUTO_DAEMON_AUTOSTART="0",
+    )
+
+    start = time.monotonic()
+    result = subprocess.run(
+        f"{command} slow",
+        shell=True,
+        env=env,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+    return result.stdout, time.monotonic() - start
+
+
+def wait_for(path, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not path.exists():
+        assert time.monotonic() < deadline, f"{path} was not created"
+        time.sleep(0.05)
+
+
+class TestBudgetCommand:
+    def test_passes_response_within_budget(self, slow_program):
+        slow_program(delay=0)
+
+        output, _ = complete(get_budget_command(10))
+
+        assert output == "plain,late\n"
+
+    @pytest.mark.parametrize(
+        "shell, fallback",
+        [("bash", "file,\n"), ("zsh", "file\n\n_\n"), ("fish", "file,la\n")],
+    )
+    def test_falls_back_over_budget(self, slow_program, shell, fallback):
+        slow_program(delay=2)
+
+        output, seconds = complete(get_budget_command(0.3), shell)
+
+        assert output == fallback
+        assert seconds < 1.5
+        # The program finishes in the background.
+        wait_for(slow_program.marker_path)
+
+    def test_daemon_client_runs_program_within_budget(self, slow_program):
+        slow_program(delay=2)
+
+        # No daemon is running, and none is started.
+        output, seconds = complete(get_daemon_client_command(budget=0.3))
+
+        assert output == "file,\n"
+        assert seconds < 1.5
+
+
+class TestBudgetOption:
+    def test_scripts_run_within_budget(self, home):
+        enable_click_shell_completion(
+            "foo",
+            {ShellType.BASH, ShellType.FISH},
+            strategy=InstallStrategy.CACHED,
+            budget=0.5,
+        )
+
+        script = (home / ".cache/auto-click-auto/foo.bash").read_text()
+        assert "budget.py 0.5 $1" in script
+        fish_script = (home / ".config/fish/completions/foo.fish").read_text()
+        assert "budget.py 0.5 foo" in fish_script
+
+    @pytest.mark.parametrize(
+        "strategy", [InstallStrategy.EVAL, InstallStrategy.BUNDLE]
+    )
+    def test_rejects_strategies_without_scripts(self, home, strategy):
+        with pytest.raises(ValueError):
+            enable_click_shell_completion(
+                "foo", {ShellType.BASH}, strategy=strategy, budget=0.5
+            )
+
+
+def read_until(fd, text, timeout):
+    output = b""
+    deadline = time.monotonic() + timeout
+    while text.encode() not in output:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        if select.select([fd], [], [], remaining)[0]:
+            try:
+                output += os.read(fd, 1024)
+            except OSError:
+                break
+
+    return output.decode(errors="replace")
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash not found")
+class TestBashUnderPty:
+    def test_tab_falls_back_to_files_over_budget(
+        self, home, slow_program, tmp_path
+    ):
+        slow_program(delay=3)
+        enable_click_shell_completion(
+            "slow",
+            {ShellType.BASH},
+            strategy=InstallStrategy.CACHED,
+            budget=0.3,
+        )
+        workdir = tmp_path / "work"
+        workdir.mkdir()
+        (workdir / "only-file.txt").touch()
+
+        pid, fd = pty.fork()
+        if pid == 0:
+            os.chdir(str(workdir))
+            os.execvpe(
+                "bash",
+                ["bash", "--norc", "--noprofile", "-i"],
+                dict(os.environ, PS1="$ ", TERM="dumb"),
+            )
+
+        try:
+            os.write(fd, b". ~/.cache/auto-click-auto/slow.bash\n")
+            read_until(fd, "$ ", timeout=5)
+
+            start = time.monotonic()
+            os.write(fd, b"slow \t")
+            output = read_until(fd, "only-file.txt", timeout=2.5)
+
+            assert "only-file.txt" in output
+            assert time.monotonic() - start < 2.5
+        finally:
+            os.write(fd, b"\x03exit\n")
+            os.close(fd)
+            os.waitpid(pid, 0)
+
+        wait_for(slow_program.marker_path)
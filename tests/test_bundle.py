@@ -0,0 +1,96 @@
+import shutil
+import subprocess
+
+import pytest
+
+from auto_click_auto import (
+    enable_click_shell_completion,
+    enable_click_shell_completions,
+)
+from auto_click_auto.bundle import get_bundle_path, get_bundled_programs
+from auto_click_auto.constants import InstallStrategy, ShellType
+
+BUNDLE_LINE = (
+    '[ -r "$HOME/.cache/auto-click-auto/bundle.bash" ] && '
+    '. "$HOME/.cache/auto-click-auto/bundle.bash"'
+)
+
+
+class TestBundleStrategy:
+    def test_sources_single_bundle(self, home):
+        enable_click_shell_completions(
+            [("foo", {ShellType.BASH}), ("bar", {ShellType.BASH})]
+        )
+        enable_click_shell_completions(
+            [("foo", {ShellType.BASH}), ("bar", {ShellType.BASH})],
+            strategy=InstallStrategy.BUNDLE,
+        )
+
+        bashrc = (home / ".bashrc").read_text()
+        assert bashrc.count(BUNDLE_LINE) == 1
+        assert "command -v" not in bashrc
+        assert get_bundled_programs(ShellType.BASH) == ["bar", "foo"]
+
+        bundle = (home / ".cache/auto-click-auto/bundle.bash").read_text()
+        assert "_foo_completion" in bundle
+        assert "_bar_completion" in bundle
+
+    def test_fish_script_checks_program(self, home):
+        enable_click_shell_completion(
+            "foo", {ShellType.FISH}, strategy=InstallStrategy.BUNDLE
+        )
+
+        fish_script = (home / ".config/fish/completions/foo.fish").read_text()
+        assert "path mtime" in fish_script
+        assert "_FOO_COMPLETE=fish_source foo | source" in fish_script
+
+    def test_bundle_is_rewritten_only_on_changes(self, home):
+        enable_click_shell_completion(
+            "foo", {ShellType.BASH}, strategy=InstallStrategy.BUNDLE
+        )
+        bundle_path = get_bundle_path(ShellType.BASH)
+        with open(bundle_path) as file:
+            first_line = file.readline()
+
+        enable_click_shell_completion(
+            "foo", {ShellType.BASH}, strategy=InstallStrategy.BUNDLE
+        )
+        with open(bundle_path) as file:
+            assert file.readline() == first_line
+
+        enable_click_shell_completion(
+            "bar", {ShellType.BASH}, strategy=InstallStrategy.BUNDLE
+        )
+        with open(bundle_path) as file:
+            assert file.readline() != first_line
+
+    def test_switching_strategy_removes_program(self, home):
+        for program_name in ("foo", "bar"):
+            enable_click_shell_completion(
+                program_name, {ShellType.BASH}, strategy=InstallStrategy.BUNDLE
+            )
+
+        enable_click_shell_completion("foo", {ShellType.BASH})
+
+        bundle = open(get_bundle_path(ShellType.BASH)).read()
+        assert "_foo_completion" not in bundle
+        assert "_bar_completion" in bundle
+        assert BUNDLE_LINE in (home / ".bashrc").read_text()
+
+    @pytest.mark.skipif(shutil.which("bash") is None, reason="bash not found")
+    def test_registers_completion_in_bash(self, home):
+        for program_name in ("foo", "bar"):
+            enable_click_shell_completion(
+                program_name, {ShellType.BASH}, strategy=InstallStrategy.BUNDLE
+            )
+
+        result = subprocess.run(
+            ["bash", "-c", ". ~/.bashrc && complete -p foo bar"],
+            env={"HOME": str(home), "PATH": "/usr/bin:/bin"},
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+
+        assert "-F _foo_completion foo" in result.stdout
+        assert "-F _bar_completion bar" in result.stdout
@@ -0,0 +1,49 @@
+import os
+
+from auto_click_auto.cache import DiskCache
+
+
+class TestDiskCache:
+    def test_get_returns_fresh_value(self, tmp_path):
+        cache = DiskCache(str(tmp_path), ttl=60)
+
+        cache.set("key", "value\nwith lines")
+
+        assert cache.get("key") == "value\nwith lines"
+        assert cache.get("other key") is None
+
+    def test_expired_value_is_only_returned_as_entry(
+        self, tmp_path, monkeypatch
+    ):
+        cache = DiskCache(str(tmp_path), ttl=60)
+        cache.set("key", "value")
+
+        now = cache.get_entry("key").age
+        monkeypatch.setattr("time.time", lambda: 10 ** 10)
+
+        assert cache.get("key") is None
+        entry = cache.get_entry("key")
+        assert entry.value == "value"
+        assert entry.age > now
+
+    def test_evicts_least_recently_used_entries(self, tmp_path):
+        cache = DiskCache(str(tmp_path), ttl=60, max_entries=2)
+        cache.set("first", "1")
+        cache.set("second", "2")
+        os.utime(cache.get_path("first"), (1, 1))
+        os.utime(cache.get_path("second"), (2, 2))
+
+        # Reading an entry marks it as recently used.
+        assert cache.get("first") == "1"
+        cache.set("third", "3")
+
+        assert cache.get("first") == "1"
+        assert cache.get("second") is None
+        assert cache.get("third") == "3"
+
+    def test_corrupted_entry_is_a_miss(self, tmp_path):
+        cache = DiskCache(str(tmp_path), ttl=60)
+        with open(cache.get_path("key"), "w") as file:
+            file.write("not a timestamp\nvalue")
+
+        assert cache.get_entry("key") is None
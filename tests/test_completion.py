@@ -0,0 +1,122 @@
+import sys
+
+import click
+import pytest
+
+from auto_click_auto.completion import (
+    handle_completion_request,
+    load_command,
+    measure_import_savings,
+)
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command()
+def hello():
+    pass
+
+
+@cli.command()
+def help_me():
+    pass
+
+
+@pytest.fixture
+def completion_request(home, monkeypatch):
+    monkeypatch.setenv("_FOO_COMPLETE", "bash_complete")
+    monkeypatch.setenv("COMP_WORDS", "foo hel")
+    monkeypatch.setenv("COMP_CWORD", "1")
+
+
+class TestHandleCompletionRequest:
+    def test_returns_when_not_completing(self, home):
+        handle_completion_request("foo", lambda: pytest.fail("built"))
+
+    def test_leaves_source_instruction_to_click(self, home, monkeypatch):
+        monkeypatch.setenv("_FOO_COMPLETE", "bash_source")
+
+        handle_completion_request("foo", lambda: pytest.fail("built"))
+
+    def test_completes_and_exits(self, completion_request, capsys):
+        with pytest.raises(SystemExit) as exc_info:
+            handle_completion_request("foo", lambda: cli)
+
+        assert exc_info.value.code == 0
+        assert capsys.readouterr().out == "plain,hello\nplain,help-me\n"
+
+    def test_cached_response_skips_building_the_command(
+        self, completion_request, capsys
+    ):
+        built = []
+
+        def get_command():
+            built.append(True)
+            return cli
+
+        for _ in range(2):
+            with pytest.raises(SystemExit):
+                handle_completion_request(
+                    "foo", get_command, cache_ttl=60
+                )
+
+        assert built == [True]
+        assert capsys.readouterr().out == (
+            "plain,hello\nplain,help-me\n" * 2
+        )
+
+
+@pytest.fixture
+def program_modules(tmp_path, monkeypatch):
+    (tmp_path / "light_tree.py").write_text(
+        "import click\n\n"
+        "@click.group()\n"
+        "def cli():\n"
+        "    pass\n\n"
+        "@cli.command()\n"
+        "def hello():\n"
+        "    pass\n\n"
+        "def build():\n"
+        "    return cli\n"
+    )
+    (tmp_path / "heavy_program.py").write_text(
+        "import time\n\nimport light_tree\n\ntime.sleep(0.2)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+    yield
+    sys.modules.pop("light_tree", None)
+
+
+class TestLoadCommand:
+    def test_loads_command_from_import_path(self, program_modules):
+        assert load_command("light_tree:cli").name == "cli"
+
+    def test_calls_attribute_that_is_not_a_command(self, program_modules):
+        assert load_command("light_tree:build").name == "cli"
+
+
+class TestFastPath:
+    def test_import_path_is_only_imported_for_completion(
+        self, home, program_modules
+    ):
+        handle_completion_request("foo", "light_tree:cli")
+
+        assert "light_tree" not in sys.modules
+
+    def test_completes_from_import_path(
+        self, completion_request, program_modules, capsys
+    ):
+        with pytest.raises(SystemExit):
+            handle_completion_request("foo", "light_tree:cli")
+
+        assert capsys.readouterr().out == "plain,hello\n"
+
+    def test_measures_import_savings(self, program_modules):
+        savings = measure_import_savings("light_tree:cli", "heavy_program")
+
+        assert savings.full_seconds >= 0.2
+        assert savings.saved_seconds > 0
@@ -0,0 +1,296 @@
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from auto_click_auto import (
+    enable_click_shell_completion,
+    enable_click_shell_completion_in_background,
+    enable_click_shell_completions,
+)
+from auto_click_auto.constants import (
+    FINGERPRINT_PREFIX,
+    SHELL_CONFIGURATION_COMMENT,
+    InstallStrategy,
+    ShellType,
+)
+from auto_click_auto.registry import load_registry
+
+EVAL_LINE = (
+    'command -v foo > /dev/null 2>&1 && '
+    'eval "$(_FOO_COMPLETE=bash_source foo)"'
+)
+SOURCE_LINE = (
+    'command -v foo > /dev/null 2>&1 && '
+    '[ -r "$HOME/.cache/auto-click-auto/foo.bash" ] && '
+    '. "$HOME/.cache/auto-click-auto/foo.bash"'
+)
+
+
+class TestCachedStrategy:
+    def test_sources_cached_script(self, home):
+        enable_click_shell_completion(
+            "foo", {ShellType.BASH}, strategy=InstallStrategy.CACHED
+        )
+
+        assert SOURCE_LINE in (home / ".bashrc").read_text()
+        assert (home / ".cache/auto-click-auto/foo.bash").exists()
+
+    def test_replaces_eval_configuration(self, home):
+        enable_click_shell_completion("foo", {ShellType.BASH})
+        assert EVAL_LINE in (home / ".bashrc").read_text()
+
+        enable_click_shell_completion(
+            "foo", {ShellType.BASH}, strategy=InstallStrategy.CACHED
+        )
+
+        bashrc = (home / ".bashrc").read_text()
+        assert EVAL_LINE not in bashrc
+        assert bashrc.count(SOURCE_LINE) == 1
+
+    def test_switching_back_and_forth_leaves_file_unchanged(self, home):
+        (home / ".bashrc").write_text("export EDITOR=vi\n")
+        enable_click_shell_completion("foo", {ShellType.BASH})
+        bashrc = (home / ".bashrc").read_text()
+
+        for strategy in (InstallStrategy.CACHED, InstallStrategy.EVAL) * 2:
+            enable_click_shell_completion(
+                "foo", {ShellType.BASH}, strategy=strategy
+            )
+
+        assert (home / ".bashrc").read_text() == bashrc
+
+    def test_replaces_unchecked_source_configuration(self, home):
+        (home / ".bashrc").write_text(
+            f"{SHELL_CONFIGURATION_COMMENT}\n"
+            "command -v foo > /dev/null 2>&1 && "
+            '. "$HOME/.cache/auto-click-auto/foo.bash"'
+        )
+
+        enable_click_shell_completion(
+            "foo", {ShellType.BASH}, strategy=InstallStrategy.CACHED
+        )
+
+        bashrc = (home / ".bashrc").read_text()
+        assert bashrc.strip() == (
+            f"{SHELL_CONFIGURATION_COMMENT}\n{SOURCE_LINE}"
+        )
+
+    @pytest.mark.skipif(shutil.which("bash") is None, reason="bash not found")
+    def test_missing_cached_script_is_skipped(self, home, tmp_path):
+        enable_click_shell_completion(
+            "foo", {ShellType.BASH}, strategy=InstallStrategy.CACHED
+        )
+        shutil.rmtree(home / ".cache/auto-click-auto")
+        # `command -v foo` has to find the program.
+        bin_directory = tmp_path / "bin"
+        bin_directory.mkdir()
+        (bin_directory / "foo").write_text("#!/bin/sh\n")
+        (bin_directory / "foo").chmod(0o755)
+
+        result = subprocess.run(
+            ["bash", "-c", ". ~/.bashrc"],
+            env=dict(
+                os.environ,
+                HOME=str(home),
+                PATH=f"{bin_directory}:{os.environ['PATH']}",
+            ),
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+
+        assert result.stderr == ""
+
+    def test_switching_back_to_eval(self, home):
+        enable_click_shell_completion(
+            "foo", {ShellType.BASH}, strategy=InstallStrategy.CACHED
+        )
+        enable_click_shell_completion("foo", {ShellType.BASH})
+
+        bashrc = (home / ".bashrc").read_text()
+        assert SOURCE_LINE not in bashrc
+        assert bashrc.count(EVAL_LINE) == 1
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash not found")
+class TestLazyStrategy:
+    def test_stub_loads_completion_on_first_use(self, home):
+        enable_click_shell_completion(
+            "foo", {ShellType.BASH}, strategy=InstallStrategy.LAZY
+        )
+
+        result = subprocess.run(
+            [
+                "bash",
+                "-c",
+                "source ~/.bashrc; complete -p foo; "
+                "_foo_lazy_completion foo; echo $?; complete -p foo",
+            ],
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        )
+
+        assert result.stdout.splitlines() == [
+            "complete -F _foo_lazy_completion foo",
+            "124",
+            "complete -o nosort -F _foo_completion foo",
+        ]
+
+
+class TestFishCompletionFile:
+    def test_writes_whole_script_once(self, home):
+        enable_click_shell_completion("foo", {ShellType.FISH})
+        script_path = home / ".config/fish/completions/foo.fish"
+        modified = os.stat(script_path).st_mtime_ns
+
+        enable_click_shell_completion(
+            "foo", {ShellType.FISH}, strategy=InstallStrategy.CACHED
+        )
+
+        fish_script = script_path.read_text()
+        assert fish_script.startswith(FINGERPRINT_PREFIX)
+        assert "function _foo_completion" in fish_script
+        assert "path mtime" in fish_script
+        assert os.stat(script_path).st_mtime_ns == modified
+
+
+    def test_replaces_legacy_configuration(self, home):
+        script_path = home / ".config/fish/completions/foo.fish"
+        script_path.parent.mkdir(parents=True)
+        script_path.write_text(
+            f"\n\n{SHELL_CONFIGURATION_COMMENT}\n"
+            "command -v foo > /dev/null 2>&1 && "
+            "_FOO_COMPLETE=fish_source foo | source"
+        )
+
+        [result] = enable_click_shell_completions([("foo", {ShellType.FISH})])
+
+        assert result.removed == 1
+        assert result.added is True
+        assert "function _foo_completion" in script_path.read_text()
+
+    def test_keeps_user_completions(self, home, capsys):
+        script_path = home / ".config/fish/completions/foo.fish"
+        script_path.parent.mkdir(parents=True)
+        script_path.write_text("complete -c foo -l verbose\n")
+
+        enable_click_shell_completion("foo", {ShellType.FISH})
+
+        assert script_path.read_text() == "complete -c foo -l verbose\n"
+        assert "leaving it unchanged" in capsys.readouterr().out
+
+
+class TestDaemonStrategy:
+    def test_requires_command_import_path(self, home):
+        with pytest.raises(ValueError):
+            enable_click_shell_completion(
+                "foo", {ShellType.BASH}, strategy=InstallStrategy.DAEMON
+            )
+
+    def test_scripts_run_daemon_client(self, home):
+        enable_click_shell_completion(
+            "foo",
+            {ShellType.BASH, ShellType.FISH},
+            strategy=InstallStrategy.DAEMON,
+            command_import_path="foo.cli:main",
+        )
+
+        assert SOURCE_LINE in (home / ".bashrc").read_text()
+        for script_path in (
+            home / ".cache/auto-click-auto/foo.bash",
+            home / ".config/fish/completions/foo.fish",
+        ):
+            assert "client.py" in script_path.read_text()
+        assert load_registry()["foo"] == {"command": "foo.cli:main"}
+
+    def test_switching_back_replaces_fish_script(self, home):
+        enable_click_shell_completion(
+            "foo",
+            {ShellType.FISH},
+            strategy=InstallStrategy.DAEMON,
+            command_import_path="foo.cli:main",
+        )
+        enable_click_shell_completion("foo", {ShellType.FISH})
+
+        fish_script = (home / ".config/fish/completions/foo.fish").read_text()
+        assert "client.py" not in fish_script
+        assert "_FOO_COMPLETE=fish_source foo | source" in fish_script
+
+
+class TestBatchEnable:
+    def test_edits_each_file_once(self, home, monkeypatch):
+        opened = []
+        original_open = open
+
+        def tracking_open(file, *args, **kwargs):
+            opened.append(str(file))
+            return original_open(file, *args, **kwargs)
+
+        monkeypatch.setattr("builtins.open", tracking_open)
+        results = enable_click_shell_completions(
+            [
+                (f"foo{index}", {ShellType.BASH, ShellType.ZSH})
+                for index in range(3)
+            ]
+        )
+
+        # Read once, then replaced once by a temporary file.
+        assert opened.count(str(home / ".bashrc")) == 1
+        assert opened.count(str(home / ".zshrc")) == 1
+        assert len(list(home.glob(".cache/auto-click-auto/locks/*"))) == 2
+        assert len(results) == 6
+        assert all(result.added for result in results)
+        bashrc = (home / ".bashrc").read_text()
+        for index in range(3):
+            assert f"_FOO{index}_COMPLETE=bash_source foo{index}" in bashrc
+
+    def test_reports_replaced_configuration(self, home):
+        enable_click_shell_completion("foo", {ShellType.BASH})
+
+        results = enable_click_shell_completions(
+            [("foo", {ShellType.BASH}), ("bar", {ShellType.BASH})],
+            strategy=InstallStrategy.CACHED,
+        )
+
+        assert [tuple(result) for result in results] == [
+            ("foo", ShellType.BASH, str(home / ".bashrc"), 1, True),
+            ("bar", ShellType.BASH, str(home / ".bashrc"), 0, True),
+        ]
+        bashrc = (home / ".bashrc").read_text()
+        assert EVAL_LINE not in bashrc
+        assert SOURCE_LINE in bashrc
+        assert bashrc.count(SHELL_CONFIGURATION_COMMENT) == 2
+
+    def test_is_idempotent(self, home):
+        programs = [("foo", {ShellType.BASH}), ("bar", {ShellType.BASH})]
+        enable_click_shell_completions(programs)
+        bashrc = (home / ".bashrc").read_text()
+
+        results = enable_click_shell_completions(programs)
+
+        assert not any(result.added for result in results)
+        assert (home / ".bashrc").read_text() == bashrc
+
+
+class TestBackgroundEnable:
+    def test_enables_in_background_once_per_interval(self, home, monkeypatch):
+        started = enable_click_shell_completion_in_background(
+            "foo", {ShellType.BASH}, interval=60
+        )
+
+        assert started
+        deadline = time.monotonic() + 10
+        while EVAL_LINE not in (home / ".bashrc").read_text():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        def fork():
+            raise AssertionError("The check is throttled.")
+
+        monkeypatch.setattr(os, "fork", fork)
+
+        assert not enable_click_shell_completion_in_background(
+            "foo", {ShellType.BASH}, interval=60
+        )
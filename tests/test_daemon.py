@@ -0,0 +1,143 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+import pytest
+
+from auto_click_auto.daemon import run_daemon
+from auto_click_auto.registry import load_registry, register_program
+
+CLIENT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "auto_click_auto",
+    "client.py",
+)
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to around 100 characters.
+    directory = tempfile.mkdtemp(prefix="aca-", dir="/tmp")
+    yield os.path.join(directory, "daemon.sock")
+    shutil.rmtree(directory)
+
+
+@pytest.fixture
+def program(home, tmp_path, monkeypatch):
+    (tmp_path / "daemon_tree.py").write_text(
+        "import click\n\n"
+        "@click.group()\n"
+        "def cli():\n"
+        "    pass\n\n"
+        "@cli.command()\n"
+        "def hello():\n"
+        "    pass\n\n"
+        "def complete_local(ctx, param, incomplete):\n"
+        "    import os\n"
+        "    target = os.environ.get('FOO_TARGET', '')\n"
+        "    return sorted(os.listdir()) + [target]\n\n"
+        "def complete_exit(ctx, param, incomplete):\n"
+        "    raise SystemExit(1)\n\n"
+        "@cli.command()\n"
+        "@click.argument('name', shell_complete=complete_exit)\n"
+        "def quit(name):\n"
+        "    pass\n\n"
+        "@cli.command()\n"
+        "@click.argument('name', shell_complete=complete_local)\n"
+        "def local(name):\n"
+        "    pass\n"
+    )
+    bin_directory = tmp_path / "bin"
+    bin_directory.mkdir()
+    program_path = bin_directory / "foo"
+    program_path.write_text("#!/bin/sh\necho \"fallback,$_FOO_COMPLETE\"\n")
+    program_path.chmod(0o755)
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("PATH", f"{bin_directory}:{os.environ['PATH']}")
+    register_program("foo", command="daemon_tree:cli")
+
+
+def run_client(socket_path, words="foo he", cword="1", cwd=None, **env):
+    env = dict(
+        os.environ,
+        _FOO_COMPLETE="bash_complete",
+        COMP_WORDS=words,
+        COMP_CWORD=cword,
+        AUTO_CLICK_AUTO_DAEMON_AUTOSTART="0",
+        **env,
+    )
+
+    return subprocess.run(
+        [sys.executable, "-S", "-E", CLIENT_PATH, socket_path, "foo"],
+        env=env,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stdout
+
+
+class TestRegistry:
+    def test_register_updates_details(self, home):
+        register_program("foo", command="a:b")
+        register_program("foo", fingerprint="123")
+
+        assert load_registry() == {
+            "foo": {"command": "a:b", "fingerprint": "123"}
+        }
+
+
+@pytest.fixture
+def daemon(socket_path):
+    thread = threading.Thread(target=run_daemon, args=(socket_path, 0.5))
+    thread.start()
+    for _ in range(100):
+        if os.path.exists(socket_path):
+            break
+        threading.Event().wait(0.01)
+
+    yield thread
+
+    thread.join()
+
+
+class TestCompletionDaemon:
+    def test_client_is_answered_by_daemon(self, program, daemon, socket_path):
+        assert run_client(socket_path) == "plain,hello\n"
+
+        daemon.join()
+        assert not os.path.exists(socket_path)
+
+    def test_exit_while_completing_falls_back(
+        self, program, daemon, socket_path
+    ):
+        response = run_client(socket_path, words="foo quit ", cword="2")
+
+        assert response == "fallback,bash_complete\n"
+        # The daemon keeps serving.
+        assert run_client(socket_path) == "plain,hello\n"
+
+    def test_request_uses_client_cwd_and_environment(
+        self, program, daemon, socket_path, tmp_path
+    ):
+        workdir = tmp_path / "work"
+        workdir.mkdir()
+        (workdir / "only.txt").touch()
+
+        response = run_client(
+            socket_path,
+            words="foo local ",
+            cword="2",
+            cwd=str(workdir),
+            FOO_TARGET="staging",
+        )
+
+        assert response == "plain,only.txt\nplain,staging\n"
+        assert "FOO_TARGET" not in os.environ
+
+    def test_client_falls_back_to_program(self, program, socket_path):
+        assert run_client(socket_path) == "fallback,bash_complete\n"
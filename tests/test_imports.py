@@ -0,0 +1,60 @@
+import re
+import subprocess
+import sys
+
+import pytest
+
+import auto_click_auto
+
+# The cumulative import time budget of the package, relative to the import
+# time of Click in the same interpreter, so that it does not depend on the
+# load of the machine.
+IMPORT_TIME_BUDGET = 0.25
+
+
+def run_python(statement):
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+
+class TestLazyImports:
+    def test_package_import_is_nearly_free(self):
+        result = run_python("import click; import auto_click_auto")
+        click_cumulative, cumulative = (
+            int(
+                re.search(
+                    rf"^import time:\s*\d+ \|\s*(\d+) \| {module}$",
+                    result.stderr,
+                    re.MULTILINE,
+                ).group(1)
+            )
+            for module in ("click", "auto_click_auto")
+        )
+
+        assert cumulative < click_cumulative * IMPORT_TIME_BUDGET
+
+    def test_modules_are_imported_on_first_use(self):
+        result = run_python(
+            "import sys, auto_click_auto; "
+            "print(sorted(name for name in sys.modules if name in ("
+            "'auto_click_auto.core', 'click', 'platform', 'logging')))"
+        )
+
+        assert result.stdout.strip() == "[]"
+
+    def test_public_api(self):
+        from auto_click_auto.core import enable_click_shell_completion
+
+        assert (
+            auto_click_auto.enable_click_shell_completion
+            is enable_click_shell_completion
+        )
+        assert set(auto_click_auto.__all__) <= set(dir(auto_click_auto))
+
+        with pytest.raises(AttributeError):
+            auto_click_auto.missing
@@ -0,0 +1,98 @@
+import json
+import sys
+
+import pytest
+
+from auto_click_auto.completion import get_completion_response
+from auto_click_auto.index import (
+    get_command_index_path,
+    load_command_index,
+    load_indexed_command,
+)
+
+ROOT_MODULE = '''\
+import importlib
+
+import click
+
+
+class LazyGroup(click.Group):
+    def list_commands(self, ctx):
+        return ["deploy"]
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name == "deploy":
+            return importlib.import_module("indexed_leaf").deploy
+
+
+@click.group(cls=LazyGroup)
+@click.option("--verbose", is_flag=True)
+def cli(verbose):
+    pass
+'''
+
+LEAF_MODULE = '''\
+import click
+
+
+def complete_cluster(ctx, param, incomplete):
+    return [c for c in ["alpha", "beta"] if c.startswith(incomplete)]
+
+
+@click.command()
+@click.option("--cluster", shell_complete=complete_cluster)
+@click.argument("stage", type=click.Choice(["dev", "prod"]))
+def deploy(cluster, stage):
+    """Deploy the application."""
+'''
+
+
+@pytest.fixture
+def modules(home, tmp_path, monkeypatch):
+    (tmp_path / "indexed_root.py").write_text(ROOT_MODULE)
+    (tmp_path / "indexed_leaf.py").write_text(LEAF_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    # Build the index with the whole program, then forget the program.
+    load_indexed_command("foo", "indexed_root:cli")
+    for name in ("indexed_root", "indexed_leaf"):
+        sys.modules.pop(name, None)
+
+    yield
+    for name in ("indexed_root", "indexed_leaf"):
+        sys.modules.pop(name, None)
+
+
+def complete(monkeypatch, words, cword):
+    monkeypatch.setenv("COMP_WORDS", words)
+    monkeypatch.setenv("COMP_CWORD", str(cword))
+    command = load_indexed_command("foo", "indexed_root:cli")
+
+    return get_completion_response(command, "foo", "bash")
+
+
+class TestCommandIndex:
+    def test_completes_without_importing_program(self, modules, monkeypatch):
+        response = complete(monkeypatch, "foo deploy ", 2)
+
+        assert response == "plain,dev\nplain,prod"
+        assert complete(monkeypatch, "foo --v", 1) == "plain,--verbose"
+        assert "indexed_root" not in sys.modules
+        assert "indexed_leaf" not in sys.modules
+
+    def test_dynamic_completion_imports_only_leaf(self, modules, monkeypatch):
+        response = complete(monkeypatch, "foo deploy --cluster a", 3)
+
+        assert response == "plain,alpha"
+        assert "indexed_root" not in sys.modules
+        assert "indexed_leaf" in sys.modules
+
+    def test_index_is_invalidated_by_fingerprint(self, modules):
+        index_path = get_command_index_path("foo")
+        with open(index_path) as f:
+            index = json.load(f)
+        index["fingerprint"] = "outdated"
+        with open(index_path, "w") as f:
+            json.dump(index, f)
+
+        assert load_command_index("foo") is None
@@ -0,0 +1,67 @@
+import logging
+
+import pytest
+
+from auto_click_auto import (
+    add_instrumentation_hook,
+    enable_click_shell_completion,
+    remove_instrumentation_hook,
+)
+from auto_click_auto.constants import ShellType
+from auto_click_auto.instrumentation import Phase, phase
+
+
+@pytest.fixture
+def events():
+    recorded = []
+    add_instrumentation_hook(recorded.append)
+    yield recorded
+    remove_instrumentation_hook(recorded.append)
+
+
+class TestInstrumentation:
+    def test_reports_phases_of_enabling(self, home, events, monkeypatch):
+        monkeypatch.setenv("SHELL", "/bin/bash")
+        enable_click_shell_completion("foo")
+
+        phases = [event.phase for event in events]
+        assert phases[:3] == ["check_os", "detect_shell", "check_stamp"]
+        for name in ("lock", "read", "scan", "remove", "append", "write"):
+            assert name in phases
+
+        [write] = [event for event in events if event.phase == "write"]
+        assert write.file_path == str(home / ".bashrc")
+        assert write.outcome == "rewritten"
+        assert write.size == (home / ".bashrc").stat().st_size
+        assert all(event.seconds >= 0 for event in events)
+
+    def test_reports_skipped_rewrites(self, home, events):
+        enable_click_shell_completion("foo", {ShellType.BASH})
+        (home / ".bashrc").write_text((home / ".bashrc").read_text())
+        del events[:]
+
+        enable_click_shell_completion("foo", {ShellType.BASH})
+
+        outcomes = {event.phase: event.outcome for event in events}
+        assert outcomes["check_stamp"] == "miss"
+        assert outcomes["write"] == "unchanged"
+        assert "append" not in outcomes
+
+    def test_reports_errors(self, events):
+        with pytest.raises(OSError):
+            with phase("read", "/missing"):
+                raise FileNotFoundError
+
+        assert events[-1].outcome == "error:FileNotFoundError"
+
+    def test_logs_events(self, home, caplog):
+        with caplog.at_level(logging.DEBUG, logger="auto_click_auto"):
+            enable_click_shell_completion("foo", {ShellType.BASH})
+
+        assert any(
+            record.auto_click_auto_event.phase == "write"
+            for record in caplog.records
+        )
+
+    def test_disabled_phases_are_not_timed(self):
+        assert not isinstance(phase("read"), Phase)
@@ -0,0 +1,76 @@
+import time
+
+import click
+import pytest
+
+from auto_click_auto.memoize import memoize_shell_complete
+
+
+class SlowSource:
+    """A local fake of a slow remote API."""
+
+    def __init__(self, directory):
+        self.path = directory / "clusters"
+        self.path.write_text("alpha\nbeta")
+
+    def list_clusters(self):
+        time.sleep(0.3)
+        return self.path.read_text().split("\n")
+
+
+@pytest.fixture
+def source(home):
+    return SlowSource(home)
+
+
+def make_parameter(source, ttl):
+    @memoize_shell_complete(ttl=ttl)
+    def complete_cluster(ctx, param, incomplete):
+        return [
+            click.shell_completion.CompletionItem(name, help="A cluster")
+            for name in source.list_clusters()
+            if name.startswith(incomplete)
+        ]
+
+    param = click.Option(["--cluster"], shell_complete=complete_cluster)
+    command = click.Command("deploy", params=[param])
+
+    return click.Context(command, info_name="deploy"), param
+
+
+def complete(ctx, param, incomplete=""):
+    start = time.perf_counter()
+    items = param.shell_complete(ctx, incomplete)
+
+    return [item.value for item in items], time.perf_counter() - start
+
+
+class TestMemoizeShellComplete:
+    def test_returns_fresh_results_from_cache(self, source):
+        ctx, param = make_parameter(source, ttl=60)
+
+        assert complete(ctx, param)[0] == ["alpha", "beta"]
+        assert complete(ctx, param, "b")[0] == ["beta"]
+
+        source.path.write_text("gamma")
+        values, seconds = complete(ctx, param)
+
+        assert values == ["alpha", "beta"]
+        assert seconds < 0.3
+        assert param.shell_complete(ctx, "")[0].help == "A cluster"
+
+    def test_refreshes_stale_results_in_background(self, source):
+        ctx, param = make_parameter(source, ttl=0.1)
+        complete(ctx, param)
+        source.path.write_text("gamma")
+        time.sleep(0.2)
+
+        values, seconds = complete(ctx, param)
+
+        assert values == ["alpha", "beta"]
+        assert seconds < 0.3
+
+        deadline = time.monotonic() + 10
+        while complete(ctx, param)[0] != ["gamma"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
@@ -0,0 +1,122 @@
+import shutil
+import subprocess
+
+import pytest
+
+from auto_click_auto import enable_click_shell_completion, native
+from auto_click_auto.constants import InstallStrategy, ShellType
+from auto_click_auto.scripts import read_script_fingerprint
+
+
+@pytest.fixture
+def bash_completion(tmp_path, monkeypatch):
+    directory = tmp_path / "usr/share/bash-completion"
+    (directory / "completions").mkdir(parents=True)
+    (directory / "bash_completion").touch()
+    monkeypatch.setattr(
+        native, "BASH_COMPLETION_DIRECTORIES", (str(directory),)
+    )
+
+
+@pytest.fixture
+def zsh_fpath(home, monkeypatch):
+    detections = []
+
+    def detect():
+        detections.append(True)
+        return str(home / ".zfunc")
+
+    monkeypatch.setattr(native, "_detect_zsh_function_directory", detect)
+    return detections
+
+
+class TestNativeStrategy:
+    def test_writes_bash_completion_user_file(self, home, bash_completion):
+        enable_click_shell_completion(
+            "foo", {ShellType.BASH}, strategy=InstallStrategy.CACHED
+        )
+        enable_click_shell_completion(
+            "foo", {ShellType.BASH}, strategy=InstallStrategy.NATIVE
+        )
+
+        script_path = home / ".local/share/bash-completion/completions/foo"
+        assert "complete -o nosort -F _foo_completion foo" in (
+            script_path.read_text()
+        )
+        assert "auto-click-auto" not in (home / ".bashrc").read_text()
+
+    def test_falls_back_to_cached_strategy(self, home, monkeypatch):
+        monkeypatch.setattr(native, "BASH_COMPLETION_DIRECTORIES", ())
+        enable_click_shell_completion(
+            "foo", {ShellType.BASH}, strategy=InstallStrategy.NATIVE
+        )
+
+        assert "foo.bash" in (home / ".bashrc").read_text()
+
+    def test_writes_zsh_autoloaded_function(self, home, zsh_fpath):
+        enable_click_shell_completion(
+            "foo", {ShellType.ZSH}, strategy=InstallStrategy.NATIVE
+        )
+        enable_click_shell_completion(
+            "foo", {ShellType.ZSH}, strategy=InstallStrategy.NATIVE
+        )
+
+        script_path = home / ".zfunc/_foo"
+        assert script_path.read_text().startswith("#compdef foo\n")
+        assert read_script_fingerprint(str(script_path)) is not None
+        assert "auto-click-auto" not in (home / ".zshrc").read_text()
+        # The detected directory is recorded.
+        assert len(zsh_fpath) == 1
+
+    def test_switching_strategy_removes_native_file(self, home, zsh_fpath):
+        enable_click_shell_completion(
+            "foo", {ShellType.ZSH}, strategy=InstallStrategy.NATIVE
+        )
+        enable_click_shell_completion(
+            "foo", {ShellType.ZSH}, strategy=InstallStrategy.CACHED
+        )
+
+        assert not (home / ".zfunc/_foo").exists()
+        assert "foo.zsh" in (home / ".zshrc").read_text()
+
+    @pytest.mark.skipif(shutil.which("zsh") is None, reason="zsh not found")
+    def test_compiles_zsh_function(self, home, zsh_fpath):
+        enable_click_shell_completion(
+            "foo",
+            {ShellType.ZSH},
+            strategy=InstallStrategy.NATIVE,
+            zcompile=True,
+        )
+
+        assert (home / ".zfunc/_foo.zwc").exists()
+
+
+class TestZshFunctionDirectory:
+    def test_finds_user_directory_in_fpath(self, home, monkeypatch):
+        (home / ".zfunc").mkdir()
+        output = (
+            "Welcome!\n__auto_click_auto_zsh__ 1\n"
+            f"/usr/share/zsh/functions\n{home}/.zfunc\n"
+        )
+        monkeypatch.setattr(shutil, "which", lambda name: "/bin/zsh")
+        monkeypatch.setattr(
+            subprocess,
+            "run",
+            lambda *args, **kwargs: subprocess.CompletedProcess(
+                args, 0, stdout=output
+            ),
+        )
+
+        assert native.get_zsh_function_directory() == f"{home}/.zfunc"
+
+    def test_requires_compinit(self, home, monkeypatch):
+        monkeypatch.setattr(shutil, "which", lambda name: "/bin/zsh")
+        monkeypatch.setattr(
+            subprocess,
+            "run",
+            lambda *args, **kwargs: subprocess.CompletedProcess(
+                args, 0, stdout=f"__auto_click_auto_zsh__ 0\n{home}/.zfunc\n"
+            ),
+        )
+
+        assert native.get_zsh_function_directory() is None
@@ -0,0 +1,107 @@
+import json
+import sys
+
+import click
+import pytest
+
+from auto_click_auto import enable_click_shell_completion
+from auto_click_auto.constants import InstallStrategy, ShellType
+from auto_click_auto.index import load_command_index
+from auto_click_auto.prebuilt import (
+    build_completion_artifacts,
+    get_build_py_command,
+    get_prebuilt_index_path,
+    get_prebuilt_script_path,
+)
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command()
+@click.option("--color", type=click.Choice(["red", "blue"]))
+def paint(color):
+    pass
+
+
+@pytest.fixture
+def prebuilt(tmp_path):
+    directory = tmp_path / "package" / "completions"
+    build_completion_artifacts(cli, "foo", str(directory))
+    return directory
+
+
+class TestBuildCompletionArtifacts:
+    def test_writes_scripts_and_index(self, prebuilt):
+        for shell in ShellType:
+            script_path = get_prebuilt_script_path(str(prebuilt), "foo", shell)
+            with open(script_path) as file:
+                assert "paint" in file.read()
+
+        with open(get_prebuilt_index_path(str(prebuilt), "foo")) as file:
+            index = json.load(file)
+
+        assert index["fingerprint"] is None
+        assert "paint" in index["commands"]
+
+
+class TestPrebuiltStaticStrategy:
+    def test_copies_prebuilt_scripts_without_command(self, home, prebuilt):
+        enable_click_shell_completion(
+            "foo",
+            {ShellType.BASH, ShellType.FISH},
+            strategy=InstallStrategy.STATIC,
+            prebuilt_directory=str(prebuilt),
+        )
+
+        script = (home / ".cache/auto-click-auto/foo.bash").read_text()
+        assert (prebuilt / "foo.bash").read_text() in script
+        fish_script = (home / ".config/fish/completions/foo.fish").read_text()
+        assert (prebuilt / "foo.fish").read_text() in fish_script
+
+    def test_installs_index(self, home, prebuilt):
+        enable_click_shell_completion(
+            "foo", {ShellType.BASH}, prebuilt_directory=str(prebuilt)
+        )
+
+        index = load_command_index("foo")
+        assert index is not None
+        assert "paint" in index["commands"]
+
+    def test_requires_command_or_prebuilt_directory(self, home):
+        with pytest.raises(ValueError):
+            enable_click_shell_completion(
+                "foo", {ShellType.BASH}, strategy=InstallStrategy.STATIC
+            )
+
+
+class TestBuildPyCommand:
+    def test_writes_artifacts_in_build_directory(self, tmp_path, monkeypatch):
+        dist_module = pytest.importorskip("setuptools.dist")
+
+        package = tmp_path / "src" / "example_pkg"
+        package.mkdir(parents=True)
+        (package / "__init__.py").write_text("")
+        (package / "cli.py").write_text(
+            "import click\n\n\n@click.command()\n@click.option('--name')\n"
+            "def main(name):\n    pass\n"
+        )
+        monkeypatch.chdir(tmp_path / "src")
+        monkeypatch.setattr(sys, "dont_write_bytecode", True)
+
+        distribution = dist_module.Distribution(
+            {"name": "example-pkg", "packages": ["example_pkg"]}
+        )
+        distribution.script_name = "setup.py"
+        command = get_build_py_command(
+            "example", "example_pkg.cli:main", "example_pkg/completions"
+        )(distribution)
+        command.build_lib = str(tmp_path / "build")
+        command.ensure_finalized()
+        command.run()
+
+        completions = tmp_path / "build" / "example_pkg" / "completions"
+        assert "--name" in (completions / "example.bash").read_text()
+        assert (completions / "example.index.json").exists()
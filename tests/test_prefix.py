@@ -0,0 +1,84 @@
+import click
+
+from auto_click_auto.prefix import (
+    MORE_MARKER,
+    PrefixIndexCompletion,
+    build_prefix_index,
+    open_prefix_index,
+)
+
+IDENTIFIERS = [f"job-{number:06d}" for number in range(100000)] + [
+    "job",
+    "jöb-ü",
+    "other",
+]
+
+
+def complete(source, incomplete):
+    command = click.Command("jobs")
+    ctx = click.Context(command, info_name="jobs")
+    param = click.Argument(["job"])
+
+    return source(ctx, param, incomplete)
+
+
+class TestPrefixIndex:
+    def test_finds_candidates_with_prefix(self, tmp_path):
+        index_path = str(tmp_path / "index")
+        assert build_prefix_index(index_path, IDENTIFIERS * 2) == 100003
+
+        with open_prefix_index(index_path) as index:
+            assert list(index.search("job-00001", limit=3)) == [
+                "job-000010",
+                "job-000011",
+                "job-000012",
+            ]
+            assert index.count_prefix("job-0000") == 100
+            assert index.count_prefix("job") == 100001
+            assert list(index.search("jö")) == ["jöb-ü"]
+            assert list(index.search("missing")) == []
+            assert index.count_prefix("") == len(index)
+
+    def test_empty_index(self, tmp_path):
+        index_path = str(tmp_path / "index")
+        build_prefix_index(index_path, [])
+
+        with open_prefix_index(index_path) as index:
+            assert list(index.search("")) == []
+
+
+class TestPrefixIndexCompletion:
+    def test_caps_results_with_marker(self, home):
+        loads = []
+
+        def load_candidates():
+            loads.append(True)
+            return IDENTIFIERS
+
+        source = PrefixIndexCompletion("jobs", load_candidates, limit=5)
+        items = complete(source, "job-01")
+
+        assert [item.value for item in items[:5]] == [
+            f"job-0{number}" for number in range(10000, 10005)
+        ]
+        assert items[5].value == f"job-01{MORE_MARKER}"
+        assert items[5].help == "9995 more"
+
+        assert [item.value for item in complete(source, "jo")] == [
+            "job",
+            "job-000000",
+            "job-000001",
+            "job-000002",
+            "job-000003",
+            f"jo{MORE_MARKER}",
+        ]
+        assert [item.value for item in complete(source, "oth")] == ["other"]
+        assert len(loads) == 1
+
+    def test_rebuilds_corrupted_index(self, home):
+        source = PrefixIndexCompletion("jobs", lambda: IDENTIFIERS)
+        complete(source, "")
+        with open(source.path, "wb") as file:
+            file.write(b"garbage")
+
+        assert [item.value for item in complete(source, "oth")] == ["other"]
@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+from click.testing import CliRunner
+
+from auto_click_auto import provision
+from auto_click_auto.__main__ import main
+from auto_click_auto.constants import InstallStrategy, ShellType
+from auto_click_auto.provision import provision_completions
+
+SOURCE_LINE = (
+    "command -v foo > /dev/null 2>&1 && "
+    '[ -r "$HOME/.cache/auto-click-auto/foo.bash" ] && '
+    '. "$HOME/.cache/auto-click-auto/foo.bash"'
+)
+
+
+@pytest.fixture
+def targets(home):
+    paths = []
+    for name in ("alice", "bob"):
+        target = home / "homes" / name
+        target.mkdir(parents=True)
+        (target / ".bashrc").touch()
+        (target / ".zshrc").touch()
+        paths.append(target)
+
+    return paths
+
+
+class TestProvisionCompletions:
+    def test_provisions_every_target(self, targets):
+        results = provision_completions(
+            [str(target) for target in targets], ["foo", "bar"], processes=2
+        )
+
+        assert [result.target for result in results] == [
+            str(target) for target in targets
+        ]
+        for target, result in zip(targets, results):
+            assert result.error is None
+            assert len(result.results) == 6
+            assert SOURCE_LINE in (target / ".bashrc").read_text()
+            assert (target / ".cache/auto-click-auto/bar.zsh").exists()
+            assert (target / ".config/fish/completions/foo.fish").exists()
+
+    def test_is_idempotent(self, targets):
+        provision_completions([str(targets[0])], ["foo"], {ShellType.BASH})
+        bashrc = (targets[0] / ".bashrc").read_text()
+        script_path = targets[0] / ".cache/auto-click-auto/foo.bash"
+        modified = os.stat(script_path).st_mtime_ns
+
+        (result,) = provision_completions(
+            [str(targets[0])], ["foo"], {ShellType.BASH}
+        )
+
+        assert not any(
+            shell_result.added or shell_result.removed
+            for shell_result in result.results
+        )
+        assert (targets[0] / ".bashrc").read_text() == bashrc
+        assert os.stat(script_path).st_mtime_ns == modified
+
+    def test_fish_script_is_rendered_once(self, targets, monkeypatch):
+        rendered = []
+        render = provision.render_cached_completion_script
+        monkeypatch.setattr(
+            provision,
+            "render_cached_completion_script",
+            lambda *args: rendered.append(args) or render(*args),
+        )
+
+        provision_completions(
+            [str(target) for target in targets],
+            ["foo"],
+            {ShellType.FISH},
+            processes=1,
+        )
+
+        assert rendered == [("foo", ShellType.FISH)]
+        for target in targets:
+            fish_script = (
+                target / ".config/fish/completions/foo.fish"
+            ).read_text()
+            assert "function _foo_completion" in fish_script
+            # The program's path and modification time are those of the
+            # provisioning host.
+            assert "path mtime" not in fish_script
+
+    def test_home_is_restored(self, home, targets):
+        provision_completions(
+            [str(targets[0])], ["foo"], {ShellType.BASH}, processes=1
+        )
+
+        assert os.environ["HOME"] == str(home)
+        assert "command -v foo" not in (home / ".bashrc").read_text()
+
+    def test_reports_errors_per_target(self, targets, tmp_path):
+        missing = tmp_path / "missing"
+        missing.write_text("")
+
+        results = provision_completions(
+            [str(missing), str(targets[0])], ["foo"], {ShellType.FISH}
+        )
+
+        assert results[0].error is not None
+        assert results[1].error is None
+
+    @pytest.mark.skipif(
+        not hasattr(os, "geteuid") or os.geteuid() != 0,
+        reason="provisioning as root only",
+    )
+    def test_provisions_as_owner_of_target(self):
+        # The target must be reachable by its owner.
+        directory = tempfile.mkdtemp(prefix="aca-", dir="/tmp")
+        try:
+            os.chmod(directory, 0o755)
+            secret = os.path.join(directory, "secret")
+            with open(secret, "w") as file:
+                file.write("root only\n")
+            target = os.path.join(directory, "home")
+            os.mkdir(target)
+            os.chown(target, 65534, 65534)
+            os.symlink(secret, os.path.join(target, ".bashrc"))
+
+            (result,) = provision_completions(
+                [target], ["foo"], {ShellType.BASH}
+            )
+
+            assert result.error is not None
+            with open(secret) as file:
+                assert file.read() == "root only\n"
+            script_path = os.path.join(
+                target, ".cache/auto-click-auto/foo.bash"
+            )
+            assert os.stat(script_path).st_uid == 65534
+        finally:
+            shutil.rmtree(directory)
+
+    def test_rejects_strategies_that_need_more_than_files(self, targets):
+        with pytest.raises(ValueError):
+            provision_completions(
+                [str(targets[0])], ["foo"], strategy=InstallStrategy.NATIVE
+            )
+
+
+class TestProvisionCommand:
+    def test_provisions_targets(self, targets):
+        result = CliRunner().invoke(
+            main,
+            ["provision", "-p", "foo", "-s", "bash", "-j", "2"]
+            + [str(target) for target in targets],
+        )
+
+        assert result.exit_code == 0
+        assert f"{targets[1]}: 1 added, 0 removed" in result.output
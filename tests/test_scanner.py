@@ -0,0 +1,55 @@
+from auto_click_auto.scanner import ScanMatch, scan_configuration, scan_file
+
+
+class TestScanConfiguration:
+    def test_matches_blocks_and_strings_in_one_pass(self):
+        data = b"keep\nA\nB\nkeep\nC\nvalue=D;\nA\nB"
+
+        matches = scan_configuration(data, ["A\nB", "C"], ["D"])
+
+        assert matches == [
+            ScanMatch(start=5, end=9, pattern=0),
+            ScanMatch(start=14, end=16, pattern=1),
+            ScanMatch(start=22, end=23, pattern=2),
+            ScanMatch(start=25, end=28, pattern=0),
+        ]
+
+    def test_blocks_match_whole_lines_only(self):
+        data = b"x A\nB\nA\nBx\n"
+
+        assert scan_configuration(data, ["A\nB"], []) == []
+
+    def test_finds_string_hidden_by_misplaced_block(self):
+        data = b"xA\nB\n"
+
+        assert scan_configuration(data, ["A\nB"], ["A"]) == [
+            ScanMatch(start=1, end=2, pattern=1)
+        ]
+
+    def test_blocks_match_windows_line_endings(self):
+        data = b"keep\r\nA\r\nB\r\nkeep\r\n"
+
+        assert scan_configuration(data, ["A\nB"], []) == [
+            ScanMatch(start=6, end=12, pattern=0)
+        ]
+
+    def test_ignores_empty_patterns(self):
+        assert scan_configuration(b"\n\nA\n", ["", "A"], [""]) == [
+            ScanMatch(start=2, end=4, pattern=1)
+        ]
+
+
+class TestScanFile:
+    def test_scans_memory_mapped_file(self, tmp_path):
+        file_path = tmp_path / ".bashrc"
+        file_path.write_bytes(b"line\n" * 100000 + b"A\nB\n")
+
+        assert scan_file(str(file_path), ["A\nB"], ["line"])[-1] == ScanMatch(
+            start=500000, end=500004, pattern=0
+        )
+
+    def test_scans_empty_file(self, tmp_path):
+        file_path = tmp_path / ".bashrc"
+        file_path.touch()
+
+        assert scan_file(str(file_path), ["A"], ["B"]) == []
@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+from auto_click_auto.constants import FINGERPRINT_PREFIX, ShellType
+from auto_click_auto.exceptions import CompletionScriptGenerationError
+from auto_click_auto.scripts import (
+    generate_completion_script,
+    get_cached_script_path,
+    guard_fish_completion_script,
+    read_script_fingerprint,
+    render_lazy_completion_stub,
+    wrap_completion_invocation,
+    write_cached_completion_script,
+)
+
+
+class TestGenerateCompletionScript:
+    def test_renders_click_source_script(self):
+        script = generate_completion_script("foo-bar", ShellType.ZSH)
+
+        assert "#compdef foo-bar" in script
+        assert "_FOO_BAR_COMPLETE=zsh_complete" in script
+
+
+class TestWriteCachedCompletionScript:
+    def test_writes_script_with_fingerprint(self, home, monkeypatch):
+        monkeypatch.setattr(
+            "auto_click_auto.scripts.get_program_fingerprint",
+            lambda program_name: "abc123",
+        )
+
+        script_path = write_cached_completion_script("foo", ShellType.BASH)
+
+        assert script_path == str(home / ".cache/auto-click-auto/foo.bash")
+        with open(script_path) as file:
+            assert file.readline() == f"{FINGERPRINT_PREFIX}abc123\n"
+            assert "_FOO_COMPLETE=bash_complete" in file.read()
+
+    def test_regenerates_only_when_fingerprint_changes(
+        self, home, monkeypatch
+    ):
+        fingerprint = "abc123"
+        monkeypatch.setattr(
+            "auto_click_auto.scripts.get_program_fingerprint",
+            lambda program_name: fingerprint,
+        )
+        script_path = write_cached_completion_script("foo", ShellType.ZSH)
+
+        with open(script_path, "a") as file:
+            file.write("# local edit\n")
+
+        write_cached_completion_script("foo", ShellType.ZSH)
+        with open(script_path) as file:
+            assert "# local edit" in file.read()
+
+        fingerprint = "def456"
+        write_cached_completion_script("foo", ShellType.ZSH)
+        with open(script_path) as file:
+            assert "# local edit" not in file.read()
+        assert read_script_fingerprint(script_path) == "def456"
+
+    def test_missing_script_has_no_fingerprint(self, home):
+        script_path = get_cached_script_path("foo", ShellType.BASH)
+
+        assert read_script_fingerprint(script_path) is None
+
+
+class TestRenderLazyCompletionStub:
+    def test_zsh_stub_calls_real_completion_function(self):
+        stub = render_lazy_completion_stub(
+            "foo-bar", ShellType.ZSH, "$HOME/foo-bar.zsh"
+        )
+
+        assert stub.startswith("_foo_bar_lazy_completion() {")
+        assert '_foo_bar_completion "$@";' in stub
+        assert stub.endswith("compdef _foo_bar_lazy_completion foo-bar")
+
+
+class TestWrapCompletionInvocation:
+    @pytest.mark.parametrize(
+        "shell, wrapped_invocation",
+        [
+            (ShellType.BASH, "_FOO_COMPLETE=bash_complete wrap $1)"),
+            (ShellType.ZSH, "_FOO_COMPLETE=zsh_complete wrap foo)"),
+            (ShellType.FISH, "COMP_CWORD=(commandline -t) wrap foo);"),
+        ],
+    )
+    def test_wraps_program_command(self, shell, wrapped_invocation):
+        script = generate_completion_script("foo", shell)
+
+        wrapped_script = wrap_completion_invocation(
+            script, "foo", shell, "wrap"
+        )
+
+        assert wrapped_invocation in wrapped_script
+
+    def test_unknown_script_raises(self):
+        with pytest.raises(CompletionScriptGenerationError):
+            wrap_completion_invocation("", "foo", ShellType.BASH, "wrap")
+
+
+class TestGuardFishCompletionScript:
+    def test_checks_program_metadata(self, tmp_path, monkeypatch):
+        program_path = tmp_path / "foo"
+        program_path.touch()
+        os.utime(program_path, (1700000000, 1700000000))
+        monkeypatch.setenv("PATH", str(tmp_path))
+        program_path.chmod(0o755)
+
+        script = guard_fish_completion_script("function script; end", "foo")
+
+        assert script.startswith("set -l program_path (command -s foo)\n")
+        assert f"!= '{program_path} 1700000000'\n" in script
+        assert "    _FOO_COMPLETE=fish_source foo | source\n" in script
+        assert script.endswith("else\nfunction script; end\nend")
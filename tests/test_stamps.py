@@ -0,0 +1,61 @@
+import os
+
+from auto_click_auto import enable_click_shell_completion
+from auto_click_auto.constants import ShellType
+from auto_click_auto.stamps import (
+    check_stamp,
+    get_stamp_directory,
+    write_stamp,
+)
+
+
+class TestStamps:
+    def test_stamp_follows_file_state(self, home):
+        file_path = str(home / ".bashrc")
+        write_stamp("foo", [file_path])
+
+        assert check_stamp("foo", [file_path])
+        assert not check_stamp("bar", [file_path])
+
+        (home / ".bashrc").write_text("changed\n")
+
+        assert not check_stamp("foo", [file_path])
+
+    def test_replaces_older_stamps(self, home):
+        file_path = str(home / ".bashrc")
+        write_stamp("foo", [file_path])
+        (home / ".bashrc").write_text("changed\n")
+        write_stamp("foo", [file_path])
+
+        assert len(os.listdir(get_stamp_directory())) == 1
+
+    def test_missing_files_are_not_stamped(self, home):
+        file_path = str(home / "missing")
+        write_stamp("foo", [file_path])
+
+        assert not check_stamp("foo", [file_path])
+
+
+class TestEnableFastPath:
+    def test_skips_unchanged_configuration(self, home, monkeypatch):
+        enable_click_shell_completion("foo", {ShellType.BASH})
+
+        opened = []
+        original_open = open
+
+        def tracking_open(file, *args, **kwargs):
+            opened.append(str(file))
+            return original_open(file, *args, **kwargs)
+
+        monkeypatch.setattr("builtins.open", tracking_open)
+        enable_click_shell_completion("foo", {ShellType.BASH})
+
+        assert str(home / ".bashrc") not in opened
+
+    def test_verifies_changed_configuration(self, home):
+        enable_click_shell_completion("foo", {ShellType.BASH})
+        (home / ".bashrc").write_text("# Removed by the user\n")
+
+        enable_click_shell_completion("foo", {ShellType.BASH})
+
+        assert "_FOO_COMPLETE=bash_source" in (home / ".bashrc").read_text()
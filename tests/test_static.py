@@ -0,0 +1,166 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from auto_click_auto import enable_click_shell_completion
+from auto_click_auto.constants import InstallStrategy, ShellType
+from auto_click_auto.static import compile_static_completion
+from auto_click_auto.tree import CompletionType, walk_command_tree
+
+PROGRAM = '''\
+import click
+
+
+def complete_cluster(ctx, param, incomplete):
+    return [c for c in ["alpha", "beta"] if c.startswith(incomplete)]
+
+
+@click.group()
+@click.option("--verbose", "-v", count=True, help="Verbosity.")
+@click.option("--color", type=click.Choice(["red", "green"]))
+def cli(verbose, color):
+    """Sample program."""
+
+
+@cli.command()
+@click.option("--name", "-n", help="The name.")
+@click.option("--cluster", shell_complete=complete_cluster)
+@click.argument("src", type=click.Path())
+def copy(name, cluster, src):
+    """Copy things."""
+
+
+@cli.group()
+def config():
+    """Program configuration."""
+
+
+@config.command("shell-completion")
+@click.argument("shell", type=click.Choice(["bash", "zsh"]))
+def shell_completion(shell):
+    """Enable completion."""
+
+
+@cli.command(hidden=True)
+def secret():
+    pass
+
+
+if __name__ == "__main__":
+    cli(prog_name="foo")
+'''
+
+
+@pytest.fixture
+def cli(tmp_path, monkeypatch):
+    (tmp_path / "static_tree.py").write_text(PROGRAM)
+    bin_directory = tmp_path / "bin"
+    bin_directory.mkdir()
+    program_path = bin_directory / "foo"
+    program_path.write_text(
+        f"#!/bin/sh\nexec {sys.executable} {tmp_path / 'static_tree.py'}\n"
+    )
+    program_path.chmod(0o755)
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("PATH", f"{bin_directory}:{os.environ['PATH']}")
+
+    import static_tree
+
+    yield static_tree.cli
+    del sys.modules["static_tree"]
+
+
+def complete_bash(script_path, *words):
+    result = subprocess.run(
+        [
+            "bash",
+            "-c",
+            f'source "{script_path}"; COMP_WORDS=("$@"); '
+            "COMP_CWORD=$((${#COMP_WORDS[@]}-1)); "
+            "_foo_static_completion foo; "
+            'printf "%s\\n" "${COMPREPLY[@]}"',
+            "bash",
+            "foo",
+            *words,
+        ],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    return result.stdout.split()
+
+
+class TestCommandTree:
+    def test_describes_visible_commands(self, cli):
+        specs = {spec.path: spec for spec in walk_command_tree(cli, "foo")}
+
+        assert list(specs) == [
+            (),
+            ("config",),
+            ("config", "shell-completion"),
+            ("copy",),
+        ]
+        assert specs[()].subcommands == [
+            ("config", "Program configuration."),
+            ("copy", "Copy things."),
+        ]
+
+        options = {option.name: option for option in specs[("copy",)].options}
+        assert options["name"].opts == ["--name", "-n"]
+        assert options["cluster"].completion_type == CompletionType.DYNAMIC
+        assert specs[("config", "shell-completion")].arguments[0].choices == [
+            "bash",
+            "zsh",
+        ]
+
+
+class TestBashCompletion:
+    @pytest.mark.parametrize(
+        "words, expected",
+        [
+            (("",), ["config", "copy"]),
+            (("--c",), ["--color"]),
+            (("--color", ""), ["red", "green"]),
+            (("-v", "config", ""), ["shell-completion"]),
+            (("config", "shell-completion", "z"), ["zsh"]),
+            (("copy", "--n"), ["--name"]),
+            (("copy", "--cluster", "a"), ["alpha"]),
+        ],
+    )
+    def test_completes_command_tree(self, cli, tmp_path, words, expected):
+        script_path = tmp_path / "foo.bash"
+        script_path.write_text(
+            compile_static_completion(cli, "foo", ShellType.BASH)
+        )
+
+        assert complete_bash(script_path, *words) == expected
+
+
+class TestStaticStrategy:
+    def test_requires_command(self, home):
+        with pytest.raises(ValueError):
+            enable_click_shell_completion(
+                "foo", {ShellType.BASH}, strategy=InstallStrategy.STATIC
+            )
+
+    def test_writes_compiled_scripts(self, home, cli):
+        enable_click_shell_completion(
+            "foo",
+            {ShellType.ZSH, ShellType.FISH},
+            strategy=InstallStrategy.STATIC,
+            command=cli,
+        )
+
+        zsh_script = (home / ".cache/auto-click-auto/foo.zsh").read_text()
+        assert "'1:shell:(bash zsh)'" in zsh_script
+        assert "secret" not in zsh_script
+
+        fish_script = (
+            home / ".config/fish/completions/foo.fish"
+        ).read_text()
+        assert "-l 'color' -r -f -a 'red green'" in fish_script
+        assert "__foo_static_dynamic" in fish_script
@@ -0,0 +1,152 @@
+import os
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from auto_click_auto import stats
+from auto_click_auto.__main__ import main
+from auto_click_auto.completion import handle_completion_request
+from auto_click_auto.stats import (
+    get_stats_log_path,
+    read_completion_records,
+    record_completion,
+    summarize_completion_records,
+)
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command()
+def hello():
+    pass
+
+
+@cli.command()
+def help_me():
+    pass
+
+
+@pytest.fixture
+def completion_request(home, monkeypatch):
+    monkeypatch.setenv("_FOO_COMPLETE", "bash_complete")
+    monkeypatch.setenv("COMP_WORDS", "foo hel")
+    monkeypatch.setenv("COMP_CWORD", "1")
+
+
+class TestRecordCompletion:
+    def test_records_are_read_back(self, home):
+        record_completion("foo", "bash", "foo deploy", 3, "miss", 0.0125)
+
+        (record,) = read_completion_records()
+
+        assert record.program_name == "foo"
+        assert record.command_path == "foo deploy"
+        assert record.candidates == 3
+        assert record.cache == "miss"
+        assert record.microseconds == 12500
+
+    def test_log_is_rotated(self, home, monkeypatch):
+        monkeypatch.setattr(stats, "STATS_LOG_MAX_SIZE", 100)
+
+        for _ in range(5):
+            record_completion("foo", "bash", "foo", 1, "-", 0.001)
+
+        assert os.path.exists(f"{get_stats_log_path()}.1")
+        assert len(list(read_completion_records())) == 5
+
+    def test_rotated_log_is_not_rotated_again(self, home, monkeypatch):
+        monkeypatch.setattr(stats, "STATS_LOG_MAX_SIZE", 100)
+        for _ in range(5):
+            record_completion("foo", "bash", "foo", 1, "-", 0.001)
+        with open(f"{get_stats_log_path()}.1") as file:
+            rotated = file.read()
+
+        # Another request saw the log over the limit before it was rotated.
+        monkeypatch.setattr(
+            stats.os,
+            "fstat",
+            lambda fd: os.stat_result((0,) * 6 + (1000,) + (0,) * 3),
+        )
+        record_completion("foo", "bash", "foo", 1, "-", 0.001)
+
+        with open(f"{get_stats_log_path()}.1") as file:
+            assert file.read() == rotated
+
+    def test_malformed_records_are_skipped(self, home):
+        record_completion("foo", "bash", "foo", 1, "-", 0.001)
+        with open(get_stats_log_path(), "a") as file:
+            file.write("1700000000\tfoo\tbash\tfoo")
+
+        assert len(list(read_completion_records())) == 1
+
+
+class TestSummarizeCompletionRecords:
+    def test_percentiles_per_command_path(self, home):
+        for milliseconds in range(1, 101):
+            record_completion(
+                "foo", "bash", "foo slow", 1, "miss", milliseconds / 1e3
+            )
+        record_completion("foo", "zsh", "foo fast", 1, "hit", 0.0005)
+        record_completion("bar", "bash", "bar", 1, "-", 1.0)
+
+        slow, fast = summarize_completion_records(
+            read_completion_records(), program_name="foo"
+        )
+
+        assert slow.command_path == "foo slow"
+        assert slow.requests == 100
+        assert slow.percentiles == (0.05, 0.095, 0.099)
+        assert slow.max_seconds == 0.1
+        assert fast.hit_ratio == 1.0
+
+
+class TestCompletionRequestStats:
+    def test_records_misses_and_hits(self, completion_request, capsys):
+        for _ in range(2):
+            with pytest.raises(SystemExit):
+                handle_completion_request(
+                    "foo", lambda: cli, cache_ttl=60, record_stats=True
+                )
+
+            assert capsys.readouterr().out == (
+                "plain,hello\nplain,help-me\n"
+            )
+
+        miss, hit = read_completion_records()
+
+        assert (miss.command_path, miss.candidates, miss.cache) == (
+            "foo",
+            2,
+            "miss",
+        )
+        assert (hit.command_path, hit.candidates, hit.cache) == (
+            "foo",
+            2,
+            "hit",
+        )
+
+    def test_nothing_is_recorded_by_default(self, completion_request):
+        with pytest.raises(SystemExit):
+            handle_completion_request("foo", lambda: cli)
+
+        assert list(read_completion_records()) == []
+
+
+class TestStatsCommand:
+    def test_prints_report(self, home):
+        record_completion("foo", "bash", "foo deploy", 3, "miss", 0.02)
+
+        result = CliRunner().invoke(main, ["stats", "foo"])
+
+        assert result.exit_code == 0
+        assert "foo deploy" in result.output
+        assert "P95 MS" in result.output
+
+    def test_reports_no_records(self, home):
+        result = CliRunner().invoke(main, ["stats"])
+
+        assert "No completion requests were recorded." in result.output
@@ -1,8 +1,15 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 import pytest
 
-from auto_click_auto.utils import remove_shell_configuration
+from auto_click_auto.constants import SHELL_CONFIGURATION_COMMENT
+from auto_click_auto.utils import (
+    ConfigurationEdit,
+    add_shell_configuration,
+    edit_shell_configuration,
+    remove_shell_configuration,
+)
 
 
 @pytest.fixture
@@ -80,3 +87,93 @@ class TestRemoveShellConfiguration:
 
         with open(shell_config_file) as file:
             assert file.read() == "before\nafter\n"
+
+
+def add_program_configuration(shell_config_file, index):
+    # The names must not contain each other, since additions are found by
+    # substring.
+    add_shell_configuration(shell_config_file, f"program-{index % 20:02d}-")
+
+
+class TestEditShellConfiguration:
+    def test_applies_edits_in_one_pass(self, shell_config_file):
+        with open(shell_config_file, "w") as file:
+            file.write(f"keep\n{SHELL_CONFIGURATION_COMMENT}\nOLD\n")
+
+        results = edit_shell_configuration(
+            shell_config_file,
+            [
+                ConfigurationEdit(
+                    removals=[f"{SHELL_CONFIGURATION_COMMENT}\nOLD"],
+                    addition="NEW",
+                ),
+                ConfigurationEdit(removals=[], addition="NEW"),
+            ],
+        )
+
+        assert results == [(1, True), (0, False)]
+        with open(shell_config_file) as file:
+            assert file.read() == (
+                f"keep\n\n\n{SHELL_CONFIGURATION_COMMENT}\nNEW"
+            )
+
+    def test_switching_configurations_leaves_file_unchanged(
+        self, shell_config_file
+    ):
+        with open(shell_config_file, "w") as file:
+            file.write("keep\n")
+
+        for old, new in [(None, "A"), ("A", "B"), ("B", "A")]:
+            edit_shell_configuration(
+                shell_config_file,
+                [
+                    ConfigurationEdit(
+                        removals=(
+                            [f"{SHELL_CONFIGURATION_COMMENT}\n{old}"]
+                            if old is not None
+                            else []
+                        ),
+                        addition=new,
+                    )
+                ],
+            )
+            with open(shell_config_file) as file:
+                content = file.read()
+            if old is None:
+                first_content = content
+
+        assert content == first_content == (
+            f"keep\n\n\n{SHELL_CONFIGURATION_COMMENT}\nA"
+        )
+
+    def test_keeps_symbolic_link_and_permissions(self, home, tmp_path):
+        target = tmp_path / "dotfiles" / "bashrc"
+        target.parent.mkdir()
+        target.write_text("keep\n")
+        target.chmod(0o640)
+        link = tmp_path / ".bashrc-link"
+        link.symlink_to(target)
+
+        add_shell_configuration(str(link), "NEW")
+
+        assert link.is_symlink()
+        assert target.read_text().endswith("\nNEW")
+        assert target.stat().st_mode & 0o777 == 0o640
+
+    def test_parallel_writers_do_not_lose_updates(self, home):
+        shell_config_file = str(home / ".bashrc")
+
+        with ProcessPoolExecutor(max_workers=8) as executor:
+            list(
+                executor.map(
+                    add_program_configuration,
+                    [shell_config_file] * 200,
+                    range(200),
+                )
+            )
+
+        with open(shell_config_file) as file:
+            lines = file.read().splitlines()
+        for index in range(20):
+            assert lines.count(f"program-{index:02d}-") == 1
+        assert lines.count(SHELL_CONFIGURATION_COMMENT) == 20